@@ -1,83 +1,164 @@
 """
 CodeGraph Backend - Graph Visualization Routes
 """
-from fastapi import APIRouter, HTTPException
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import threading
+
+from cachetools import TTLCache, cached
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Response
 from app.models.schemas import (
     GraphData,
     GraphNode,
     GraphEdge,
     GraphQuery,
+    GraphBatchQuery,
     NodeType,
     EdgeType,
+    GRAPH_DATA_LIST_ADAPTER,
 )
-from app.core.graph.builder import GraphBuilder
+from app.models.fast_schemas import MSGSPEC_AVAILABLE, encode_json, json_response, stream_graph_response
+from app.core.graph.builder import LoadedGraph, get_graph_builder
+from app.core.graph.csr import CSRAdjacency, build_csr, induced_edge_ids
+from app.core.graph.bfs_jit import bfs_csr, multi_source_bfs, lane_members
+from app.config import settings
 
 router = APIRouter()
 
+# Response bodies use the same model family the builder loaded graphs with
+if MSGSPEC_AVAILABLE:
+    from app.models.fast_schemas import GraphDataMsg as _graph_data
+else:
+    _graph_data = GraphData.model_construct
+
 # In-memory graph store (will be replaced with persistent storage)
-_graphs: dict[str, GraphData] = {}
+_graphs: dict[str, LoadedGraph] = {}
+
+# Graphs are immutable between re-indexes, so identical queries can be reused;
+# results are cached as encoded JSON, which no caller can mutate
+_query_cache: TTLCache = TTLCache(
+    maxsize=settings.graph_query_cache_size,
+    ttl=settings.graph_query_cache_ttl,
+)
+# Guards _query_cache, which pool threads fill while re-indexes invalidate it
+_query_cache_lock = threading.Lock()
+
+
+# BFS kernels release the GIL, so traversals run on a shared thread pool
+# against the same read-only CSR arrays instead of blocking the event loop
+_bfs_pool = ThreadPoolExecutor(
+    max_workers=settings.graph_bfs_workers or os.cpu_count(),
+    thread_name_prefix="graph-bfs",
+)
+
+
+async def _run_in_pool(fn, *args):
+    """Run a CPU-bound graph function on the BFS thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bfs_pool, fn, *args)
+
+
+def invalidate_graph(repository_id: str):
+    """Drop the loaded graph and cached query results for a repository."""
+    _graphs.pop(repository_id, None)
+    with _query_cache_lock:
+        for key in [k for k in _query_cache.keys() if k[0] == repository_id]:
+            _query_cache.pop(key, None)
+
+
+def _loaded_graph(repository_id: str, detail: str = "Repository not found") -> LoadedGraph:
+    """Get a loaded graph once, so later work is unaffected by invalidation."""
+    loaded = _graphs.get(repository_id)
+    if loaded is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return loaded
 
 
 @router.get("/{repository_id}", response_model=GraphData)
 async def get_graph(repository_id: str):
     """Get the full code graph for a repository."""
-    if repository_id not in _graphs:
+    loaded = _graphs.get(repository_id)
+    if loaded is None:
         # Try to load from builder
         try:
-            builder = GraphBuilder()
-            graph_data = await builder.load_graph(repository_id)
-            _graphs[repository_id] = graph_data
+            builder = get_graph_builder()
+            loaded = _graphs[repository_id] = await builder.load_graph(repository_id)
         except Exception as e:
             raise HTTPException(
                 status_code=404,
                 detail=f"Graph not found for repository: {repository_id}"
             )
     
-    return _graphs[repository_id]
+    # The full graph is the largest payload, so it is streamed
+    return stream_graph_response(loaded.data, settings.graph_stream_chunk_size)
 
 
 @router.post("/query", response_model=GraphData)
 async def query_graph(query: GraphQuery):
     """Query the graph with filters."""
-    if query.repository_id not in _graphs:
-        raise HTTPException(
-            status_code=404,
-            detail="Repository graph not found"
-        )
-    
-    graph = _graphs[query.repository_id]
+    loaded = _loaded_graph(query.repository_id, "Repository graph not found")
+    body = await _run_in_pool(_run_graph_query, loaded, query)
+    return Response(content=body, media_type="application/json")
+
+
+def _query_cache_key(loaded: LoadedGraph, query: GraphQuery) -> tuple:
+    """Build the result cache key for a graph query on one loaded graph."""
+    return (
+        query.repository_id,
+        loaded.generation,
+        frozenset(query.node_types or ()),
+        frozenset(query.edge_types or ()),
+        query.start_node,
+        query.max_depth,
+        query.max_nodes,
+    )
+
+
+@cached(_query_cache, key=_query_cache_key, lock=_query_cache_lock)
+def _run_graph_query(loaded: LoadedGraph, query: GraphQuery) -> bytes:
+    """Run a graph query and encode its result."""
+    return encode_json(_graph_query(loaded, query))
+
+
+def _graph_query(loaded: LoadedGraph, query: GraphQuery):
+    """Filter and traverse a loaded graph."""
+    graph = loaded.data
     
     # Filter nodes
     filtered_nodes = graph.nodes
     if query.node_types:
-        filtered_nodes = [
-            n for n in filtered_nodes 
-            if n.type in query.node_types
-        ]
+        mask = loaded.node_type_mask(query.node_types)
+        filtered_nodes = [graph.nodes[i] for i in np.flatnonzero(mask).tolist()]
     
     # Filter edges
     filtered_edges = graph.edges
     if query.edge_types:
-        filtered_edges = [
-            e for e in filtered_edges 
-            if e.type in query.edge_types
-        ]
+        mask = loaded.edge_type_mask(query.edge_types)
+        filtered_edges = [graph.edges[i] for i in np.flatnonzero(mask).tolist()]
     
     # If start_node specified, do BFS traversal
+    stats = {}
     if query.start_node:
-        filtered_nodes, filtered_edges = _bfs_subgraph(
+        filtered_nodes, filtered_edges, truncated = _bfs_subgraph(
             nodes=filtered_nodes,
             edges=filtered_edges,
             start_node=query.start_node,
             max_depth=query.max_depth,
+            max_nodes=query.max_nodes,
+            # The cached index only covers the unfiltered graph
+            csr=None if query.node_types or query.edge_types else loaded.csr,
         )
+        stats["truncated"] = int(truncated)
     
-    return GraphData(
+    return _graph_data(
         nodes=filtered_nodes,
         edges=filtered_edges,
         stats={
             "node_count": len(filtered_nodes),
             "edge_count": len(filtered_edges),
+            **stats,
         }
     )
 
@@ -85,81 +166,127 @@ async def query_graph(query: GraphQuery):
 @router.get("/{repository_id}/node/{node_id}")
 async def get_node(repository_id: str, node_id: str):
     """Get details for a specific node."""
-    if repository_id not in _graphs:
-        raise HTTPException(status_code=404, detail="Repository not found")
-    
-    graph = _graphs[repository_id]
-    for node in graph.nodes:
-        if node.id == node_id:
-            return node
+    node = _loaded_graph(repository_id).id_index.get(node_id)
+    if node is None:
+        raise HTTPException(status_code=404, detail="Node not found")
     
-    raise HTTPException(status_code=404, detail="Node not found")
+    return json_response(node)
 
 
 @router.get("/{repository_id}/neighbors/{node_id}")
-async def get_neighbors(repository_id: str, node_id: str, depth: int = 1):
+async def get_neighbors(
+    repository_id: str,
+    node_id: str,
+    depth: int = 1,
+    max_nodes: int = Query(default=500, ge=1),
+):
     """Get neighboring nodes within specified depth."""
-    if repository_id not in _graphs:
-        raise HTTPException(status_code=404, detail="Repository not found")
-    
-    graph = _graphs[repository_id]
-    nodes, edges = _bfs_subgraph(
-        nodes=graph.nodes,
-        edges=graph.edges,
-        start_node=node_id,
-        max_depth=depth,
+    loaded = _loaded_graph(repository_id)
+    nodes, edges, truncated = await _run_in_pool(
+        _bfs_subgraph,
+        loaded.data.nodes,
+        loaded.data.edges,
+        node_id,
+        depth,
+        max_nodes,
+        loaded.csr,
     )
     
-    return GraphData(
+    return json_response(_graph_data(
         nodes=nodes,
         edges=edges,
-        stats={"node_count": len(nodes), "edge_count": len(edges)}
+        stats={
+            "node_count": len(nodes),
+            "edge_count": len(edges),
+            "truncated": int(truncated),
+        }
+    ))
+
+
+@router.post("/{repository_id}/bfs/batch", response_model=list[GraphData])
+async def batch_bfs(repository_id: str, query: GraphBatchQuery):
+    """Get the neighborhoods of several nodes in one multi-source BFS."""
+    loaded = _loaded_graph(repository_id)
+    return json_response(
+        await _run_in_pool(_batch_subgraphs, loaded, query),
+        GRAPH_DATA_LIST_ADAPTER,
     )
 
 
+def _batch_subgraphs(loaded: LoadedGraph, query: GraphBatchQuery) -> list:
+    """Extract one BFS subgraph per start node with a multi-source BFS."""
+    csr = loaded.csr
+    starts = [csr.node_index.get(node_id) for node_id in query.start_nodes]
+    sources = np.asarray([i for i in starts if i is not None], dtype=np.int32)
+    
+    visited = None
+    if len(sources):
+        visited = multi_source_bfs(*csr.arrays, sources, query.max_depth)
+    
+    results = []
+    lane = 0
+    for start in starts:
+        if start is None:
+            results.append(_graph_data(
+                nodes=[], edges=[], stats={"node_count": 0, "edge_count": 0, "truncated": 0},
+            ))
+            continue
+        
+        members = lane_members(visited, lane)
+        lane += 1
+        truncated = False
+        if len(members) > query.max_nodes:
+            # Too big for the cap: redo this start alone so the nearest
+            # max_nodes nodes are kept, as _bfs_subgraph does
+            members, _, truncated = bfs_csr(*csr.arrays, start, query.max_depth, query.max_nodes)
+        
+        nodes, edges = _induced_subgraph(loaded.data.nodes, loaded.data.edges, csr, members)
+        results.append(_graph_data(
+            nodes=nodes,
+            edges=edges,
+            stats={"node_count": len(nodes), "edge_count": len(edges), "truncated": int(truncated)}
+        ))
+    
+    return results
+
+
 def _bfs_subgraph(
     nodes: list[GraphNode],
     edges: list[GraphEdge],
     start_node: str,
-    max_depth: int
-) -> tuple[list[GraphNode], list[GraphEdge]]:
-    """Extract subgraph using BFS from start node."""
-    node_map = {n.id: n for n in nodes}
-    
-    if start_node not in node_map:
-        return [], []
-    
-    # Build adjacency list
-    adj = {}
-    for edge in edges:
-        if edge.source not in adj:
-            adj[edge.source] = []
-        adj[edge.source].append(edge.target)
-        # Also add reverse for undirected traversal
-        if edge.target not in adj:
-            adj[edge.target] = []
-        adj[edge.target].append(edge.source)
+    max_depth: int,
+    max_nodes: int,
+    csr: CSRAdjacency | None = None,
+) -> tuple[list[GraphNode], list[GraphEdge], bool]:
+    """Extract subgraph using BFS from start node.
     
-    # BFS
-    visited = {start_node}
-    queue = [(start_node, 0)]
-    result_nodes = [node_map[start_node]]
-    
-    while queue:
-        current, depth = queue.pop(0)
-        if depth >= max_depth:
-            continue
-        
-        for neighbor in adj.get(current, []):
-            if neighbor not in visited and neighbor in node_map:
-                visited.add(neighbor)
-                result_nodes.append(node_map[neighbor])
-                queue.append((neighbor, depth + 1))
+    ``csr`` must index exactly ``nodes`` and ``edges``; without one, an
+    adjacency is built for this call only. The returned flag tells whether
+    the search stopped early at ``max_nodes``.
+    """
+    if csr is None:
+        csr = build_csr(
+            (n.id for n in nodes),
+            ((e.source, e.target) for e in edges),
+        )
     
-    # Get edges within visited nodes
-    result_edges = [
-        e for e in edges
-        if e.source in visited and e.target in visited
-    ]
+    start = csr.node_index.get(start_node)
+    if start is None:
+        return [], [], False
     
+    # BFS (undirected)
+    visited, _, truncated = bfs_csr(*csr.arrays, start, max_depth, max_nodes)
+    result_nodes, result_edges = _induced_subgraph(nodes, edges, csr, visited)
+    return result_nodes, result_edges, truncated
+
+
+def _induced_subgraph(
+    nodes: list[GraphNode],
+    edges: list[GraphEdge],
+    csr: CSRAdjacency,
+    node_idx: np.ndarray,
+) -> tuple[list[GraphNode], list[GraphEdge]]:
+    """Select nodes by CSR index plus the edges between them."""
+    result_nodes = [nodes[i] for i in node_idx.tolist()]
+    result_edges = [edges[i] for i in induced_edge_ids(csr, node_idx).tolist()]
     return result_nodes, result_edges
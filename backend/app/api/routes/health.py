@@ -13,7 +13,7 @@ async def health_check():
     return {
         "status": "healthy",
         "app": settings.app_name,
-        "providers": settings.get_available_providers(),
+        "providers": settings.available_providers,
     }
 
 
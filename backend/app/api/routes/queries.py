@@ -18,7 +18,7 @@ router = APIRouter()
 @router.post("", response_model=QueryResponse)
 async def ask_question(query: QueryRequest):
     """Ask a question about the code in a repository."""
-    start_time = time.time()
+    start_ns = time.monotonic_ns()
     
     try:
         # Initialize query service
@@ -33,9 +33,10 @@ async def ask_question(query: QueryRequest):
             question=query.question,
         )
         
-        processing_time_ms = int((time.time() - start_time) * 1000)
+        processing_time_ms = (time.monotonic_ns() - start_ns) // 1_000_000
         
-        return QueryResponse(
+        # Built from agent output, not request input, so it is not re-validated
+        return QueryResponse.model_construct(
             answer=result["answer"],
             citations=result.get("citations", []),
             reasoning_steps=result.get("reasoning_steps", []),
@@ -1,17 +1,24 @@
 """
 CodeGraph Backend - Repository Management Routes
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Response
 from app.models.schemas import (
     RepositoryCreate,
     RepositoryResponse,
     RepositoryList,
     RepositoryStatus,
+    from_orm_trusted,
+    REPO_LIST_ADAPTER,
 )
+from app.models.fast_schemas import MSGSPEC_AVAILABLE, json_response
 from app.services.repository import RepositoryService
 from app.services.indexing import IndexingService
+from app.api.routes.graph import invalidate_graph
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
+
+if MSGSPEC_AVAILABLE:
+    from app.models.fast_schemas import RepositoryListMsg, RepositoryMsg
 
 router = APIRouter()
 
@@ -39,7 +46,7 @@ async def create_repository(
         "status": RepositoryStatus.PENDING,
         "file_count": None,
         "node_count": None,
-        "created_at": datetime.utcnow(),
+        "created_at": datetime.now(timezone.utc),
         "indexed_at": None,
         "error_message": None,
     }
@@ -54,14 +61,19 @@ async def create_repository(
         repo.branch
     )
     
-    return RepositoryResponse(**repo_data)
+    return from_orm_trusted(RepositoryResponse, repo_data)
 
 
 @router.get("", response_model=RepositoryList)
 async def list_repositories():
     """List all repositories."""
-    repos = [RepositoryResponse(**r) for r in _repositories.values()]
-    return RepositoryList(repositories=repos, total=len(repos))
+    if MSGSPEC_AVAILABLE:
+        repos = [RepositoryMsg(**r) for r in _repositories.values()]
+        return json_response(RepositoryListMsg(repositories=repos, total=len(repos)))
+    
+    repos = [from_orm_trusted(RepositoryResponse, r) for r in _repositories.values()]
+    body = b'{"repositories":%b,"total":%d}' % (REPO_LIST_ADAPTER.dump_json(repos), len(repos))
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{repo_id}", response_model=RepositoryResponse)
@@ -69,7 +81,7 @@ async def get_repository(repo_id: str):
     """Get repository details."""
     if repo_id not in _repositories:
         raise HTTPException(status_code=404, detail="Repository not found")
-    return RepositoryResponse(**_repositories[repo_id])
+    return from_orm_trusted(RepositoryResponse, _repositories[repo_id])
 
 
 @router.delete("/{repo_id}")
@@ -80,6 +92,7 @@ async def delete_repository(repo_id: str):
     
     # TODO: Clean up files and index
     del _repositories[repo_id]
+    invalidate_graph(repo_id)
     return {"status": "deleted", "id": repo_id}
 
 
@@ -99,13 +112,14 @@ async def _process_repository(repo_id: str, url: str, branch: str):
         # Index the repository
         indexing_service = IndexingService()
         stats = await indexing_service.index_repository(repo_id, local_path)
+        invalidate_graph(repo_id)
         
         # Update with results
         _repositories[repo_id].update({
             "status": RepositoryStatus.READY,
             "file_count": stats.get("file_count", 0),
             "node_count": stats.get("node_count", 0),
-            "indexed_at": datetime.utcnow(),
+            "indexed_at": datetime.now(timezone.utc),
         })
         
     except Exception as e:
@@ -2,19 +2,25 @@
 CodeGraph Backend - LangGraph Agent Orchestrator
 """
 from typing import TypedDict, Annotated, Literal
+import asyncio
 import operator
 import logging
+import re
 
+from app.config import settings
 from app.llm.factory import get_provider
 from app.llm.base import Message, MessageRole, LLMResponse
 from app.core.graph.builder import get_graph_builder
 from app.core.graph.traversal import GraphTraversal
 from app.core.embeddings.vectorstore import get_vectorstore
 from app.core.embeddings.encoder import get_encoder
-from app.models.schemas import Citation, ReasoningStep
+from app.models.schemas import Citation, ReasoningStep, NodeType
 
 logger = logging.getLogger(__name__)
 
+# First agent directive in an LLM reply, e.g. "NAVIGATE: parse_file"
+_NAV_RE = re.compile(r"\b(ANSWER|NAVIGATE|DONE)\s*:\s*(.*)", re.IGNORECASE | re.DOTALL)
+
 
 # Agent State
 class AgentState(TypedDict):
@@ -26,11 +32,37 @@ class AgentState(TypedDict):
     citations: Annotated[list[Citation], operator.add]
     current_node: str | None
     visited_nodes: list[str]
+    speculated: dict[str, tuple[tuple, dict]]
     answer: str | None
     confidence: float
     iterations: int
 
 
+def _state_key(state: "AgentState") -> tuple:
+    """Snapshot of the agent state a navigation decision was made against."""
+    return tuple(state["visited_nodes"]), len(state["citations"])
+
+
+def _build_name_index(context: dict) -> dict[str, str]:
+    """Map lowercased neighbor names to node IDs, successors first."""
+    index = {}
+    for neighbor in context.get("successors", []) + context.get("predecessors", []):
+        name = neighbor["node_data"].get("name", "").lower()
+        index.setdefault(name, neighbor["node_id"])
+    return index
+
+
+def _match_name(target: str, name_index: dict[str, str]) -> str | None:
+    """Find the node ID named exactly the lowercased target, else the first containing it."""
+    if target in name_index:
+        return name_index[target]
+    
+    for name, node_id in name_index.items():
+        if target in name:
+            return node_id
+    return None
+
+
 class CodeGraphAgent:
     """LangGraph-style agent for code understanding with multi-hop reasoning."""
     
@@ -44,6 +76,19 @@ class CodeGraphAgent:
         self.max_iterations = max_iterations
         self.graph_builder = get_graph_builder()
     
+    def _make_citation(self, repository_id: str, node_id: str, node_data: dict) -> Citation:
+        """Cite a graph node with its source, read from disk, without re-validating it."""
+        node_type = node_data.get("type")
+        source = self.graph_builder.get_source(repository_id, node_id)
+        return Citation.model_construct(
+            file_path=node_data.get("file_path", ""),
+            start_line=node_data.get("start_line", 0),
+            end_line=node_data.get("end_line", 0),
+            content=source if source is not None else node_data.get("signature", ""),
+            node_type=NodeType(node_type) if node_type else None,
+            node_name=node_data.get("name"),
+        )
+    
     async def run(
         self,
         question: str,
@@ -60,6 +105,7 @@ class CodeGraphAgent:
             "citations": [],
             "current_node": None,
             "visited_nodes": [],
+            "speculated": {},
             "answer": None,
             "confidence": 0.0,
             "iterations": 0,
@@ -110,7 +156,7 @@ class CodeGraphAgent:
             limit=10,
         )
         
-        state["reasoning_steps"].append(ReasoningStep(
+        state["reasoning_steps"].append(ReasoningStep.model_construct(
             step_number=len(state["reasoning_steps"]) + 1,
             action="search",
             observation=f"Found {len(search_results)} potentially relevant code elements",
@@ -123,14 +169,8 @@ class CodeGraphAgent:
             state["visited_nodes"].append(best_match["node_id"])
             
             # Add citation
-            node_data = best_match["data"]
-            state["citations"].append(Citation(
-                file_path=node_data.get("file_path", ""),
-                start_line=node_data.get("start_line", 0),
-                end_line=node_data.get("end_line", 0),
-                content=node_data.get("source_code", node_data.get("signature", "")),
-                node_type=node_data.get("type"),
-                node_name=node_data.get("name"),
+            state["citations"].append(self._make_citation(
+                state["repository_id"], best_match["node_id"], best_match["data"]
             ))
         
         return state
@@ -147,21 +187,13 @@ class CodeGraphAgent:
             state = await self._answer_step(state)
             return state
         
-        # Get context for current node
-        context = traversal.get_node_context(state["current_node"])
+        # Reuse a decision made speculatively on an earlier step, unless the
+        # state it was made against has since changed
+        key, action = state["speculated"].pop(state["current_node"], (None, None))
+        if action is None or key != _state_key(state):
+            action = await self._decide_with_speculation(state, traversal)
         
-        # Decide what to do based on question and context
-        prompt = self._build_navigation_prompt(state, context)
-        
-        response = await self.llm.chat([
-            Message(role=MessageRole.SYSTEM, content=self._get_system_prompt()),
-            Message(role=MessageRole.USER, content=prompt),
-        ])
-        
-        # Parse response to determine next action
-        action = self._parse_navigation_response(response.content, context)
-        
-        state["reasoning_steps"].append(ReasoningStep(
+        state["reasoning_steps"].append(ReasoningStep.model_construct(
             step_number=len(state["reasoning_steps"]) + 1,
             action=action["type"],
             node_visited=state["current_node"],
@@ -179,14 +211,7 @@ class CodeGraphAgent:
                 
                 # Add citation for new node
                 node_data = traversal.graph.nodes[next_node].get("data", {})
-                state["citations"].append(Citation(
-                    file_path=node_data.get("file_path", ""),
-                    start_line=node_data.get("start_line", 0),
-                    end_line=node_data.get("end_line", 0),
-                    content=node_data.get("source_code", node_data.get("signature", "")),
-                    node_type=node_data.get("type"),
-                    node_name=node_data.get("name"),
-                ))
+                state["citations"].append(self._make_citation(state["repository_id"], next_node, node_data))
             else:
                 state["current_node"] = None
         else:
@@ -194,6 +219,49 @@ class CodeGraphAgent:
         
         return state
     
+    async def _decide_with_speculation(
+        self,
+        state: AgentState,
+        traversal: GraphTraversal,
+    ) -> dict:
+        """Decide the next action, asking about likely next nodes concurrently."""
+        current = state["current_node"]
+        context = traversal.get_node_context(current)
+        
+        # Successors are what the model is most likely to navigate to
+        candidates = []
+        for succ in context.get("successors", []):
+            if len(candidates) >= settings.agent_speculative_branches:
+                break
+            node_id = succ["node_id"]
+            if node_id not in state["visited_nodes"] and node_id not in state["speculated"]:
+                candidates.append(node_id)
+        
+        actions = await asyncio.gather(
+            self._decide(state, context),
+            *(self._decide(state, traversal.get_node_context(n)) for n in candidates),
+        )
+        
+        # Each speculation is only valid for the state reached by navigating
+        # straight to its node from here, which the replay checks
+        visited, cited = _state_key(state)
+        for node_id, speculated in zip(candidates, actions[1:]):
+            state["speculated"][node_id] = ((visited + (node_id,), cited + 1), speculated)
+        
+        # The current node's own decision always wins
+        return actions[0]
+    
+    async def _decide(self, state: AgentState, context: dict) -> dict:
+        """Ask the LLM what to do next given a node's context."""
+        prompt = self._build_navigation_prompt(state, context)
+        
+        response = await self.llm.chat([
+            Message(role=MessageRole.SYSTEM, content=self._get_system_prompt()),
+            Message(role=MessageRole.USER, content=prompt),
+        ])
+        
+        return self._parse_navigation_response(response.content, context)
+    
     async def _answer_step(self, state: AgentState) -> AgentState:
         """Generate the final answer based on gathered context."""
         
@@ -220,7 +288,7 @@ Provide a clear, detailed answer that references the specific code shown. If you
         state["answer"] = response.content
         state["confidence"] = 0.85 if state["citations"] else 0.5
         
-        state["reasoning_steps"].append(ReasoningStep(
+        state["reasoning_steps"].append(ReasoningStep.model_construct(
             step_number=len(state["reasoning_steps"]) + 1,
             action="answer",
             observation="Generated final answer from gathered context",
@@ -241,6 +309,7 @@ Always base your answers on the actual code provided. Cite specific files and li
     
     def _build_navigation_prompt(self, state: AgentState, context: dict) -> str:
         node_data = context.get("node", {})
+        context["_name_index"] = _build_name_index(context)
         
         # Format predecessor/successor info
         related = []
@@ -268,35 +337,29 @@ Based on this context, decide:
 What is your decision?"""
     
     def _parse_navigation_response(self, response: str, context: dict) -> dict:
-        response_upper = response.upper()
+        match = _NAV_RE.search(response)
+        directive = match.group(1).lower() if match else None
         
-        if "ANSWER:" in response_upper:
-            answer_start = response.find("ANSWER:") + 7
+        if directive == "answer":
             return {
                 "type": "answer",
-                "answer": response[answer_start:].strip(),
+                "answer": match.group(2).strip(),
                 "confidence": 0.85,
             }
-        elif "NAVIGATE:" in response_upper:
-            nav_start = response.find("NAVIGATE:") + 9
-            target_name = response[nav_start:].strip().split()[0]
+        elif directive == "navigate" and match.group(2).split():
+            target_name = match.group(2).split()[0]
             
             # Find the node ID for this name
-            for succ in context.get("successors", []):
-                if target_name.lower() in succ["node_data"].get("name", "").lower():
-                    return {
-                        "type": "navigate",
-                        "next_node": succ["node_id"],
-                        "observation": f"Navigating to {target_name}",
-                    }
-            
-            for pred in context.get("predecessors", []):
-                if target_name.lower() in pred["node_data"].get("name", "").lower():
-                    return {
-                        "type": "navigate",
-                        "next_node": pred["node_id"],
-                        "observation": f"Navigating to {target_name}",
-                    }
+            name_index = context.get("_name_index")
+            if name_index is None:
+                name_index = _build_name_index(context)
+            next_node = _match_name(target_name.lower(), name_index)
+            if next_node is not None:
+                return {
+                    "type": "navigate",
+                    "next_node": next_node,
+                    "observation": f"Navigating to {target_name}",
+                }
             
             return {"type": "done", "observation": f"Could not find node: {target_name}"}
         
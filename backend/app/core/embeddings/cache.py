@@ -0,0 +1,67 @@
+"""
+CodeGraph Backend - Persistent Embedding Cache
+"""
+from pathlib import Path
+import hashlib
+import logging
+import sqlite3
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on bound parameters per statement
+_MAX_PARAMS = 900
+
+
+def content_key(model_name: str, text: str) -> bytes:
+    """Hash a model/text pair into a 16-byte cache key."""
+    return hashlib.blake2b(f"{model_name}\0{text}".encode(), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """SQLite-backed store of float32 embeddings keyed by content hash."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Lazy initialization of the SQLite connection."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings_cache "
+                "(hash BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+            )
+        return self._conn
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """Look up cached embeddings, returning only the keys that hit."""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(unique), _MAX_PARAMS):
+                batch = unique[i:i + _MAX_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT hash, vec FROM embeddings_cache WHERE hash IN ({placeholders})",
+                    batch,
+                )
+                for key, vec in rows:
+                    found[key] = np.frombuffer(vec, dtype=np.float32)
+        return found
+
+    def put_many(self, items: list[tuple[bytes, np.ndarray]]):
+        """Store embeddings under their content keys."""
+        rows = [(key, np.asarray(vec, dtype=np.float32).tobytes()) for key, vec in items]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings_cache (hash, vec) VALUES (?, ?)",
+                rows,
+            )
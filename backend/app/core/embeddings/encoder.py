@@ -1,16 +1,23 @@
 """
 CodeGraph Backend - Sentence Transformer Encoder
 """
+from pathlib import Path
 from typing import Any
 import logging
+import threading
+
+from cachetools import LRUCache
+import numpy as np
 
 try:
+    import torch
     from sentence_transformers import SentenceTransformer
     SENTENCE_TRANSFORMERS_AVAILABLE = True
 except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
 
 from app.config import settings
+from app.core.embeddings.cache import EmbeddingCache, content_key
 
 logger = logging.getLogger(__name__)
 
@@ -21,43 +28,95 @@ class EmbeddingEncoder:
     def __init__(self, model_name: str | None = None):
         self.model_name = model_name or settings.embedding_model
         self._model = None
+        self._query_cache: LRUCache = LRUCache(maxsize=8192)
+        self._cache: EmbeddingCache | None = None
+        self._model_lock = threading.Lock()
     
     @property
     def model(self):
-        """Lazy load the model."""
+        """Lazy load the model, once even when first used from several threads."""
         if self._model is None:
-            if not SENTENCE_TRANSFORMERS_AVAILABLE:
-                raise RuntimeError("sentence-transformers not installed")
-            
-            logger.info(f"Loading embedding model: {self.model_name}")
-            self._model = SentenceTransformer(self.model_name)
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._load_model()
         return self._model
     
+    def _load_model(self):
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("sentence-transformers not installed")
+        
+        logger.info(f"Loading embedding model: {self.model_name}")
+        if settings.embedding_torch_threads:
+            torch.set_num_threads(settings.embedding_torch_threads)
+        model = SentenceTransformer(self.model_name)
+        model.eval()
+        
+        # Half precision only pays off on GPU; CPU kernels are FP32
+        if settings.embedding_half_precision and model.device.type == "cuda":
+            model.half()
+        return model
+    
+    @property
+    def cache(self) -> EmbeddingCache:
+        """Lazy initialization of the persistent embedding cache."""
+        if self._cache is None:
+            self._cache = EmbeddingCache(
+                Path(settings.chroma_persist_dir) / "embeddings_cache.sqlite3"
+            )
+        return self._cache
+    
     def encode(
         self,
         texts: str | list[str],
         batch_size: int = 32,
         show_progress: bool = False,
-    ) -> list[list[float]]:
-        """Encode text(s) into embeddings."""
+    ) -> np.ndarray:
+        """Encode text(s) into an ``(n, dimension)`` embedding matrix."""
         if isinstance(texts, str):
             texts = [texts]
         
-        embeddings = self.model.encode(
-            texts,
-            batch_size=batch_size,
-            show_progress_bar=show_progress,
-            convert_to_numpy=True,
-        )
+        model = self.model
+        with torch.inference_mode():
+            embeddings = model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=show_progress,
+                convert_to_numpy=True,
+            )
+        
+        return embeddings
+    
+    def encode_cached(
+        self,
+        texts: list[str],
+        batch_size: int = 32,
+        show_progress: bool = False,
+    ) -> np.ndarray:
+        """Encode texts, reusing persisted embeddings for content seen before."""
+        keys = [content_key(self.model_name, text) for text in texts]
+        found = self.cache.get_many(keys)
         
-        # Convert to list of lists for JSON serialization
-        return embeddings.tolist()
+        # First position of each distinct uncached text
+        missing = list({key: i for i, key in enumerate(keys) if key not in found}.values())
+        if missing:
+            fresh = self.encode(
+                [texts[i] for i in missing],
+                batch_size=batch_size,
+                show_progress=show_progress,
+            )
+            items = [(keys[i], fresh[j]) for j, i in enumerate(missing)]
+            self.cache.put_many(items)
+            found.update(items)
+        
+        if not keys:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
     
     def encode_code(
         self,
         code: str,
         context: str | None = None,
-    ) -> list[float]:
+    ) -> np.ndarray:
         """Encode code with optional context."""
         # Combine code with context if provided
         if context:
@@ -65,14 +124,23 @@ class EmbeddingEncoder:
         else:
             text = code
         
-        embeddings = self.encode(text)
+        embeddings = self.encode_cached([text])
         return embeddings[0]
     
-    def encode_query(self, query: str) -> list[float]:
+    def encode_query(self, query: str) -> np.ndarray:
         """Encode a natural language query."""
-        # Could add query-specific formatting here
-        embeddings = self.encode(query)
-        return embeddings[0]
+        key = content_key(self.model_name, query)
+        embedding = self._query_cache.get(key)
+        if embedding is None:
+            # Could add query-specific formatting here
+            embedding = self.encode(query)[0]
+            embedding.setflags(write=False)  # shared between callers
+            self._query_cache[key] = embedding
+        return embedding
+    
+    def warmup(self):
+        """Load the model and run one encode so the first request is not cold."""
+        self.encode("warmup")
     
     @property
     def dimension(self) -> int:
@@ -82,11 +150,14 @@ class EmbeddingEncoder:
 
 # Singleton instance
 _encoder: EmbeddingEncoder | None = None
+_encoder_lock = threading.Lock()
 
 
 def get_encoder() -> EmbeddingEncoder:
     """Get the global encoder instance."""
     global _encoder
     if _encoder is None:
-        _encoder = EmbeddingEncoder()
+        with _encoder_lock:
+            if _encoder is None:
+                _encoder = EmbeddingEncoder()
     return _encoder
@@ -1,9 +1,13 @@
 """
 CodeGraph Backend - ChromaDB Vector Store
 """
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
 import logging
+import threading
+
+import numpy as np
 
 try:
     import chromadb
@@ -24,22 +28,28 @@ class VectorStore:
         self.persist_dir = persist_dir or settings.chroma_persist_dir
         self._client = None
         self._collections: dict[str, Any] = {}
+        self._client_lock = threading.Lock()
     
     @property
     def client(self):
         """Lazy initialization of ChromaDB client."""
         if self._client is None:
-            if not CHROMADB_AVAILABLE:
-                raise RuntimeError("ChromaDB not installed")
-            
-            Path(self.persist_dir).mkdir(parents=True, exist_ok=True)
-            
-            self._client = chromadb.PersistentClient(
-                path=self.persist_dir,
-                settings=ChromaSettings(anonymized_telemetry=False),
-            )
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._connect()
         return self._client
     
+    def _connect(self):
+        if not CHROMADB_AVAILABLE:
+            raise RuntimeError("ChromaDB not installed")
+        
+        Path(self.persist_dir).mkdir(parents=True, exist_ok=True)
+        
+        return chromadb.PersistentClient(
+            path=self.persist_dir,
+            settings=ChromaSettings(anonymized_telemetry=False),
+        )
+    
     def get_collection(self, repo_id: str):
         """Get or create a collection for a repository."""
         if repo_id not in self._collections:
@@ -53,28 +63,41 @@ class VectorStore:
         self,
         repo_id: str,
         documents: list[str],
-        embeddings: list[list[float]],
+        embeddings: np.ndarray | list[list[float]],
         metadatas: list[dict],
         ids: list[str],
+        batch_size: int | None = None,
+        concurrency: int | None = None,
     ):
-        """Add documents with embeddings to the collection."""
+        """Add documents with embeddings to the collection, several batches at a time."""
         collection = self.get_collection(repo_id)
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        batch_size = batch_size or settings.chroma_batch_size
+        concurrency = concurrency or settings.chroma_write_concurrency
         
-        # ChromaDB has batch size limits
-        batch_size = 100
-        for i in range(0, len(documents), batch_size):
-            batch_end = min(i + batch_size, len(documents))
+        def add_batch(start: int):
+            end = min(start + batch_size, len(documents))
             collection.add(
-                documents=documents[i:batch_end],
-                embeddings=embeddings[i:batch_end],
-                metadatas=metadatas[i:batch_end],
-                ids=ids[i:batch_end],
+                documents=documents[start:end],
+                embeddings=_to_list(embeddings[start:end]),
+                metadatas=metadatas[start:end],
+                ids=ids[start:end],
             )
+        
+        starts = range(0, len(documents), batch_size)
+        if len(starts) <= 1 or concurrency <= 1:
+            for start in starts:
+                add_batch(start)
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(starts))) as pool:
+            for future in as_completed([pool.submit(add_batch, start) for start in starts]):
+                future.result()
     
     def query(
         self,
         repo_id: str,
-        query_embedding: list[float],
+        query_embedding: np.ndarray | list[float],
         n_results: int = 10,
         where: dict | None = None,
     ) -> dict:
@@ -82,7 +105,7 @@ class VectorStore:
         collection = self.get_collection(repo_id)
         
         results = collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=_to_list(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)),
             n_results=n_results,
             where=where,
             include=["documents", "metadatas", "distances"],
@@ -123,13 +146,21 @@ class VectorStore:
         return collection.count()
 
 
+def _to_list(embeddings: np.ndarray) -> list:
+    """Convert float32 embeddings to the nested lists ChromaDB 0.4 validates against."""
+    return embeddings.tolist()
+
+
 # Singleton instance
 _vectorstore: VectorStore | None = None
+_vectorstore_lock = threading.Lock()
 
 
 def get_vectorstore() -> VectorStore:
     """Get the global vector store instance."""
     global _vectorstore
     if _vectorstore is None:
-        _vectorstore = VectorStore()
+        with _vectorstore_lock:
+            if _vectorstore is None:
+                _vectorstore = VectorStore()
     return _vectorstore
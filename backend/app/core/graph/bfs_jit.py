@@ -0,0 +1,320 @@
+"""
+CodeGraph Backend - JIT-compiled BFS over CSR Adjacency
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Direction-optimizing switch thresholds (Beamer et al. defaults)
+ALPHA = 14
+BETA = 24
+
+
+def _bfs_kernel(out_indptr, out_indices, in_indptr, in_indices, src, max_depth, max_nodes, alpha, beta):
+    """Level-synchronous, direction-optimizing BFS from ``src``.
+    
+    Edges are followed both ways, reading each node's successors from the
+    ``out_`` CSR and its predecessors from the ``in_`` CSR. A level is
+    expanded top-down (frontier -> neighbors) until the edges leaving the
+    frontier outnumber the unexplored edges by ``alpha``, then bottom-up
+    (each unvisited node looks for a parent in the frontier) until the
+    frontier drops below ``num_nodes / beta``. Visited and frontier sets
+    are uint64 bitmaps.
+    
+    Discovered nodes are appended to a preallocated int32 buffer that never
+    wraps, so its filled prefix is the visit order. The search stops once
+    ``max_nodes`` nodes are found. Returns ``(order, depth, truncated)``
+    where ``depth`` is -1 for unvisited nodes and ``truncated`` tells
+    whether the cap cut the search short.
+    """
+    num_nodes = out_indptr.shape[0] - 1
+    words = (num_nodes + 63) >> 6
+    one = np.uint64(1)
+    visited = np.zeros(words, dtype=np.uint64)
+    frontier = np.zeros(words, dtype=np.uint64)
+    depth = np.full(num_nodes, -1, dtype=np.int32)
+    order = np.empty(num_nodes, dtype=np.int32)
+    
+    depth[src] = 0
+    order[0] = src
+    visited[src >> 6] |= one << np.uint64(src & 63)
+    unvisited_edges = (
+        out_indptr[num_nodes] + in_indptr[num_nodes]
+        - (out_indptr[src + 1] - out_indptr[src])
+        - (in_indptr[src + 1] - in_indptr[src])
+    )
+    
+    level = 0
+    level_start = 0
+    tail = 1
+    bottom_up = False
+    truncated = False
+    
+    while level < max_depth and level_start < tail and not truncated:
+        level_end = tail
+        frontier_edges = 0
+        for i in range(level_start, level_end):
+            node = order[i]
+            frontier_edges += out_indptr[node + 1] - out_indptr[node]
+            frontier_edges += in_indptr[node + 1] - in_indptr[node]
+        
+        if bottom_up:
+            bottom_up = (level_end - level_start) * beta >= num_nodes
+        else:
+            bottom_up = frontier_edges * alpha > unvisited_edges
+        
+        if bottom_up:
+            frontier[:] = 0
+            for i in range(level_start, level_end):
+                node = order[i]
+                frontier[node >> 6] |= one << np.uint64(node & 63)
+            
+            for node in range(num_nodes):
+                if (visited[node >> 6] >> np.uint64(node & 63)) & one:
+                    continue
+                found = False
+                for side in range(2):
+                    indptr = out_indptr if side == 0 else in_indptr
+                    indices = out_indices if side == 0 else in_indices
+                    for j in range(indptr[node], indptr[node + 1]):
+                        parent = indices[j]
+                        if (frontier[parent >> 6] >> np.uint64(parent & 63)) & one:
+                            found = True
+                            break
+                    if found:
+                        break
+                if not found:
+                    continue
+                if tail == max_nodes:
+                    truncated = True
+                    break
+                visited[node >> 6] |= one << np.uint64(node & 63)
+                depth[node] = level + 1
+                order[tail] = node
+                tail += 1
+                unvisited_edges -= out_indptr[node + 1] - out_indptr[node]
+                unvisited_edges -= in_indptr[node + 1] - in_indptr[node]
+        else:
+            for i in range(level_start, level_end):
+                current = order[i]
+                for side in range(2):
+                    indptr = out_indptr if side == 0 else in_indptr
+                    indices = out_indices if side == 0 else in_indices
+                    for j in range(indptr[current], indptr[current + 1]):
+                        neighbor = indices[j]
+                        if (visited[neighbor >> 6] >> np.uint64(neighbor & 63)) & one:
+                            continue
+                        if tail == max_nodes:
+                            truncated = True
+                            break
+                        visited[neighbor >> 6] |= one << np.uint64(neighbor & 63)
+                        depth[neighbor] = level + 1
+                        order[tail] = neighbor
+                        tail += 1
+                        unvisited_edges -= out_indptr[neighbor + 1] - out_indptr[neighbor]
+                        unvisited_edges -= in_indptr[neighbor + 1] - in_indptr[neighbor]
+                    if truncated:
+                        break
+                if truncated:
+                    break
+        
+        level_start = level_end
+        level += 1
+    
+    return order[:tail], depth, truncated
+
+
+def _bfs_python(
+    out_indptr: np.ndarray,
+    out_indices: np.ndarray,
+    in_indptr: np.ndarray,
+    in_indices: np.ndarray,
+    src: int,
+    max_depth: int,
+    max_nodes: int,
+) -> tuple[np.ndarray, np.ndarray, bool]:
+    """Pure-Python top-down BFS, used without Numba."""
+    depth = [-1] * (len(out_indptr) - 1)
+    depth[src] = 0
+    order = [src]
+    head = 0
+
+    while head < len(order):
+        current = order[head]
+        head += 1
+        current_depth = depth[current]
+        if current_depth >= max_depth:
+            continue
+
+        neighbors = (
+            out_indices[out_indptr[current]:out_indptr[current + 1]].tolist()
+            + in_indices[in_indptr[current]:in_indptr[current + 1]].tolist()
+        )
+        for neighbor in neighbors:
+            if depth[neighbor] < 0:
+                if len(order) == max_nodes:
+                    return _bfs_result(order, depth, True)
+                depth[neighbor] = current_depth + 1
+                order.append(neighbor)
+
+    return _bfs_result(order, depth, False)
+
+
+def _bfs_result(order: list[int], depth: list[int], truncated: bool):
+    return np.asarray(order, dtype=np.int32), np.asarray(depth, dtype=np.int32), truncated
+
+
+def _multi_source_kernel(out_indptr, out_indices, in_indptr, in_indices, sources, max_depth):
+    """Bit-parallel BFS from many sources at once, following edges both ways.
+    
+    Source ``b`` owns bit ``b & 63`` of lane word ``b >> 6``, so one OR of a
+    uint64 word pushes the frontiers of 64 traversals across an edge.
+    Returns the ``(num_nodes, lanes)`` visited bitsets.
+    """
+    num_nodes = out_indptr.shape[0] - 1
+    lanes = (sources.shape[0] + 63) >> 6
+    one = np.uint64(1)
+    visited = np.zeros((num_nodes, lanes), dtype=np.uint64)
+    frontier = np.zeros((num_nodes, lanes), dtype=np.uint64)
+    
+    for b in range(sources.shape[0]):
+        bit = one << np.uint64(b & 63)
+        visited[sources[b], b >> 6] |= bit
+        frontier[sources[b], b >> 6] |= bit
+    
+    for _ in range(max_depth):
+        next_frontier = np.zeros((num_nodes, lanes), dtype=np.uint64)
+        for node in range(num_nodes):
+            active = False
+            for lane in range(lanes):
+                if frontier[node, lane]:
+                    active = True
+                    break
+            if not active:
+                continue
+            for side in range(2):
+                indptr = out_indptr if side == 0 else in_indptr
+                indices = out_indices if side == 0 else in_indices
+                for j in range(indptr[node], indptr[node + 1]):
+                    neighbor = indices[j]
+                    for lane in range(lanes):
+                        next_frontier[neighbor, lane] |= frontier[node, lane]
+        
+        grew = False
+        for node in range(num_nodes):
+            for lane in range(lanes):
+                fresh = next_frontier[node, lane] & ~visited[node, lane]
+                next_frontier[node, lane] = fresh
+                if fresh:
+                    visited[node, lane] |= fresh
+                    grew = True
+        
+        if not grew:
+            break
+        frontier = next_frontier
+    
+    return visited
+
+
+def _multi_source_python(
+    out_indptr: np.ndarray,
+    out_indices: np.ndarray,
+    in_indptr: np.ndarray,
+    in_indices: np.ndarray,
+    sources: np.ndarray,
+    max_depth: int,
+) -> np.ndarray:
+    """Run one BFS per source and pack the results into lane bitsets."""
+    num_nodes = len(out_indptr) - 1
+    visited = np.zeros((num_nodes, (len(sources) + 63) >> 6), dtype=np.uint64)
+    for b, src in enumerate(sources.tolist()):
+        order, _, _ = _bfs_python(
+            out_indptr, out_indices, in_indptr, in_indices, src, max_depth, num_nodes,
+        )
+        visited[order, b >> 6] |= np.uint64(1) << np.uint64(b & 63)
+    return visited
+
+
+def _directed_bfs_kernel(indptr, indices, edge_codes, node_codes, src, max_depth, edge_allowed, node_allowed):
+    """BFS along out-edges with the type filters of ``GraphTraversal.bfs``.
+    
+    A node is enqueued when first reached over an edge whose type code is
+    allowed; on dequeue, nodes of a disallowed type are neither emitted nor
+    expanded. Returns ``(emitted, depth, parent, via)`` where ``via`` is the
+    type code of the edge each node was reached by (-1 for the source).
+    """
+    num_nodes = indptr.shape[0] - 1
+    depth = np.full(num_nodes, -1, dtype=np.int32)
+    parent = np.full(num_nodes, -1, dtype=np.int32)
+    via = np.full(num_nodes, -1, dtype=np.int32)
+    queue = np.empty(num_nodes, dtype=np.int32)
+    emitted = np.empty(num_nodes, dtype=np.int32)
+    
+    depth[src] = 0
+    queue[0] = src
+    head = 0
+    tail = 1
+    count = 0
+    
+    while head < tail:
+        node = queue[head]
+        head += 1
+        if not node_allowed[node_codes[node]]:
+            continue
+        
+        emitted[count] = node
+        count += 1
+        if depth[node] >= max_depth:
+            continue
+        
+        for j in range(indptr[node], indptr[node + 1]):
+            neighbor = indices[j]
+            if depth[neighbor] >= 0:
+                continue
+            code = edge_codes[j]
+            if not edge_allowed[code]:
+                continue
+            depth[neighbor] = depth[node] + 1
+            parent[neighbor] = node
+            via[neighbor] = code
+            queue[tail] = neighbor
+            tail += 1
+    
+    return emitted[:count], depth, parent, via
+
+
+def lane_members(visited: np.ndarray, b: int) -> np.ndarray:
+    """Get the node indices visited by source ``b`` of a multi-source BFS."""
+    bits = visited[:, b >> 6] >> np.uint64(b & 63)
+    return np.flatnonzero(bits & np.uint64(1))
+
+
+if NUMBA_AVAILABLE:
+    _bfs_kernel_jit = njit(cache=True, nogil=True)(_bfs_kernel)
+    
+    def bfs_csr(
+        out_indptr: np.ndarray,
+        out_indices: np.ndarray,
+        in_indptr: np.ndarray,
+        in_indices: np.ndarray,
+        src: int,
+        max_depth: int,
+        max_nodes: int,
+    ) -> tuple[np.ndarray, np.ndarray, bool]:
+        """BFS over forward/reverse CSR arrays, returning ``(order, depth, truncated)``."""
+        return _bfs_kernel_jit(
+            out_indptr, out_indices, in_indptr, in_indices,
+            src, max_depth, max_nodes, ALPHA, BETA,
+        )
+    
+    multi_source_bfs = njit(cache=True, nogil=True)(_multi_source_kernel)
+    directed_bfs = njit(cache=True, nogil=True)(_directed_bfs_kernel)
+else:
+    bfs_csr = _bfs_python
+    multi_source_bfs = _multi_source_python
+    directed_bfs = _directed_bfs_kernel
@@ -1,46 +1,136 @@
 """
 CodeGraph Backend - NetworkX Graph Builder
 """
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 import logging
+import mmap
+import os
+import pickle
+import itertools
+import re
+import sys
 import networkx as nx
+import numpy as np
 
+from app.config import settings
 from app.core.parsing.tree_sitter import get_parser, ParsedNode
 from app.core.graph.schema import (
     NodeType,
     EdgeType,
-    GraphNodeData,
-    GraphEdgeData,
+    graph_node_data,
+    graph_edge_data,
     make_node_id,
     make_module_id,
 )
-from app.models.schemas import GraphData, GraphNode, GraphEdge
+from app.core.graph.csr import CSRAdjacency, build_csr
+from app.core.graph.store import GraphStore
+from app.models.schemas import (
+    GraphData,
+    GraphNode,
+    GraphEdge,
+    NodeType as ApiNodeType,
+    EdgeType as ApiEdgeType,
+)
+from app.models.fast_schemas import MSGSPEC_AVAILABLE
+
+if MSGSPEC_AVAILABLE:
+    from app.models.fast_schemas import GraphDataMsg, GraphEdgeMsg, GraphNodeMsg, raw_json
 
 logger = logging.getLogger(__name__)
 
+# First name after each from/import keyword in an import statement
+_IMPORT_RE = re.compile(r"(?:from|import)\s+(\w+)")
+
+# Bytes of a memory-mapped file scanned per slice when counting lines
+_LINE_COUNT_BLOCK = 1 << 20
+
+# Bumped when the pickled graph or parse snapshot layout changes
+_SNAPSHOT_VERSION = 3
+
+_generations = itertools.count()
+
+
+@dataclass
+class LoadedGraph:
+    """A graph in API response format with its lookup indexes.
+    
+    With msgspec installed ``data`` and its nodes and edges are the msgspec
+    mirrors from fast_schemas, otherwise the Pydantic models.
+    """
+    data: Any
+    id_index: dict[str, Any]
+    csr: CSRAdjacency
+    
+    # Columnar type codes, parallel to data.nodes / data.edges
+    node_types: np.ndarray
+    node_type_codes: dict[str, int]
+    edge_types: np.ndarray
+    edge_type_codes: dict[str, int]
+    
+    # Unique per load, so results computed from a replaced graph never match
+    generation: int = field(default_factory=lambda: next(_generations))
+    
+    def node_type_mask(self, types: list) -> np.ndarray:
+        """Boolean mask over data.nodes selecting the given node types."""
+        return _type_mask(self.node_types, self.node_type_codes, types)
+    
+    def edge_type_mask(self, types: list) -> np.ndarray:
+        """Boolean mask over data.edges selecting the given edge types."""
+        return _type_mask(self.edge_types, self.edge_type_codes, types)
+
+
+def _encode_types(values: list[str]) -> tuple[np.ndarray, dict[str, int]]:
+    """Dictionary-encode type names into an int8 column."""
+    codes: dict[str, int] = {}
+    column = np.fromiter(
+        (codes.setdefault(v, len(codes)) for v in values),
+        dtype=np.int8,
+        count=len(values),
+    )
+    return column, codes
+
+
+def _metadata_dict(value: dict | None) -> dict:
+    return value or {}
+
+
+def _type_mask(column: np.ndarray, codes: dict[str, int], types: list) -> np.ndarray:
+    wanted = [codes[t.value] for t in types if t.value in codes]
+    return np.isin(column, wanted)
+
 
 class GraphBuilder:
     """Builds and manages code graphs using NetworkX."""
     
     def __init__(self):
-        self._graphs: dict[str, nx.DiGraph] = {}
+        self._graphs: dict[str, nx.DiGraph | GraphStore] = {}
+        self._repo_paths: dict[str, Path] = {}
     
     def build_graph(self, repo_id: str, repo_path: Path) -> nx.DiGraph:
         """Build a complete code graph from a repository."""
         logger.info(f"Building graph for repository: {repo_id}")
         
         graph = nx.DiGraph()
-        parser = get_parser()
         
-        # Parse all files
+        # Parse all files, reusing the previous parse of unchanged ones
+        snapshot = self._load_snapshot(repo_id, "parse") or {}
+        file_index, parsed_by_file = self._parse_files(
+            repo_path, snapshot.get("files", {}), snapshot.get("parsed", {})
+        )
         nodes_by_file: dict[str, list[ParsedNode]] = {}
         
-        for parsed_node in parser.parse_directory(repo_path):
-            file_path = parsed_node.file_path
-            if file_path not in nodes_by_file:
-                nodes_by_file[file_path] = []
-            nodes_by_file[file_path].append(parsed_node)
+        for parsed_nodes in parsed_by_file.values():
+            for parsed_node in parsed_nodes:
+                file_path = parsed_node.file_path
+                if file_path not in nodes_by_file:
+                    nodes_by_file[file_path] = []
+                nodes_by_file[file_path].append(parsed_node)
+        
+        # Call sites found by the parser, keyed by caller node ID
+        calls_by_node: dict[str, list[str]] = {}
         
         # Create module nodes and code nodes
         for file_path, nodes in nodes_by_file.items():
@@ -50,7 +140,7 @@ class GraphBuilder:
             
             graph.add_node(
                 module_id,
-                data=GraphNodeData(
+                data=graph_node_data(
                     id=module_id,
                     type=NodeType.MODULE,
                     name=Path(file_path).stem,
@@ -58,7 +148,7 @@ class GraphBuilder:
                     file_path=rel_path,
                     start_line=1,
                     end_line=self._count_lines(file_path),
-                ).to_dict()
+                )
             )
             
             # Create nodes for code elements
@@ -68,7 +158,7 @@ class GraphBuilder:
                 
                 graph.add_node(
                     node_id,
-                    data=GraphNodeData(
+                    data=graph_node_data(
                         id=node_id,
                         type=node_type,
                         name=parsed.name,
@@ -78,19 +168,22 @@ class GraphBuilder:
                         end_line=parsed.end_line,
                         signature=parsed.signature,
                         docstring=parsed.docstring,
-                        source_code=parsed.source_code,
-                    ).to_dict()
+                        start_byte=parsed.start_byte,
+                        end_byte=parsed.end_byte,
+                    )
                 )
+                if parsed.calls:
+                    calls_by_node[node_id] = parsed.calls
                 
                 # Add CONTAINS edge from module
                 graph.add_edge(
                     module_id,
                     node_id,
-                    data=GraphEdgeData(
+                    data=graph_edge_data(
                         source=module_id,
                         target=node_id,
                         type=EdgeType.CONTAINS,
-                    ).to_dict()
+                    )
                 )
                 
                 # Add CONTAINS edge from parent class if applicable
@@ -100,73 +193,221 @@ class GraphBuilder:
                         graph.add_edge(
                             parent_id,
                             node_id,
-                            data=GraphEdgeData(
+                            data=graph_edge_data(
                                 source=parent_id,
                                 target=node_id,
                                 type=EdgeType.CONTAINS,
-                            ).to_dict()
+                            )
                         )
         
         # Analyze call relationships
-        self._analyze_calls(graph, repo_path)
+        self._analyze_calls(graph, calls_by_node)
         
         # Analyze imports
         self._analyze_imports(graph)
         
         # Store the graph
-        self._graphs[repo_id] = graph
+        self._repo_paths[repo_id] = repo_path
+        if settings.graph_store_enabled:
+            store = self._open_store(repo_id)
+            store.save(graph)
+            self._graphs[repo_id] = store
+        else:
+            self._graphs[repo_id] = graph
+        
+        if settings.graph_persist_enabled:
+            self._save_snapshot(repo_id, "parse", {"files": file_index, "parsed": parsed_by_file})
+            if not settings.graph_store_enabled:
+                self._save_snapshot(repo_id, "graph", {"repo_path": str(repo_path), "graph": graph})
         
         logger.info(f"Built graph with {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
         return graph
     
-    def get_graph(self, repo_id: str) -> nx.DiGraph | None:
-        """Get an existing graph by repository ID."""
-        return self._graphs.get(repo_id)
+    def _parse_files(
+        self,
+        repo_path: Path,
+        cached_files: dict[str, tuple[int, int]],
+        cached_parsed: dict[str, list[ParsedNode]],
+    ) -> tuple[dict[str, tuple[int, int] | None], dict[str, list[ParsedNode]]]:
+        """Parse supported files whose (mtime, size) changed since the cached parse.
+        
+        Returns the new file index and the parsed nodes of every file, in
+        directory order.
+        """
+        parser = get_parser()
+        files = [str(path) for path in parser.iter_files(repo_path)]
+        
+        file_index: dict[str, tuple[int, int] | None] = {}
+        for path in files:
+            try:
+                stat = os.stat(path)
+                file_index[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                file_index[path] = None  # Always re-parsed
+        
+        changed = [
+            path for path in files
+            if file_index[path] is None or path not in cached_parsed or cached_files.get(path) != file_index[path]
+        ]
+        if len(changed) < len(files):
+            logger.info(f"Re-parsing {len(changed)} of {len(files)} files")
+        
+        results = list(parser.parse_files([Path(path) for path in changed]))
+        for nodes in results:
+            # Source is read back by byte range, so don't keep it around
+            for node in nodes:
+                node.source_code = None
+        
+        parsed = dict(zip(changed, results))
+        return file_index, {path: parsed[path] if path in parsed else cached_parsed[path] for path in files}
     
-    async def load_graph(self, repo_id: str) -> GraphData:
-        """Load graph and convert to API response format."""
+    def get_graph(self, repo_id: str) -> nx.DiGraph | GraphStore | None:
+        """Get an existing graph by repository ID."""
         graph = self._graphs.get(repo_id)
+        if graph is None and settings.graph_store_enabled and self._store_path(repo_id).exists():
+            # Graph persisted by an earlier process
+            graph = self._graphs[repo_id] = self._open_store(repo_id)
+        elif graph is None:
+            snapshot = self._load_snapshot(repo_id, "graph")
+            if snapshot is not None:
+                graph = self._graphs[repo_id] = snapshot["graph"]
+                self._repo_paths[repo_id] = Path(snapshot["repo_path"])
+        return graph
+    
+    def _store_path(self, repo_id: str) -> Path:
+        return Path(settings.graph_store_dir) / f"{repo_id}.sqlite3"
+    
+    def _snapshot_path(self, repo_id: str, kind: str) -> Path:
+        return Path(settings.graph_store_dir) / f"{repo_id}.{kind}.pkl"
+    
+    def _save_snapshot(self, repo_id: str, kind: str, payload: dict):
+        """Atomically write a pickled snapshot, replacing any earlier one."""
+        path = self._snapshot_path(repo_id, kind)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"version": _SNAPSHOT_VERSION, **payload}, f, protocol=5)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not save {kind} snapshot for {repo_id}: {e}")
+    
+    def _load_snapshot(self, repo_id: str, kind: str) -> dict | None:
+        """Read a pickled snapshot, or None if missing, unreadable or outdated."""
+        path = self._snapshot_path(repo_id, kind)
+        if not settings.graph_persist_enabled or not path.exists():
+            return None
+        
+        try:
+            with open(path, "rb") as f:
+                snapshot = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load {kind} snapshot for {repo_id}: {e}")
+            return None
+        return snapshot if snapshot.get("version") == _SNAPSHOT_VERSION else None
+    
+    def _open_store(self, repo_id: str) -> GraphStore:
+        return GraphStore(self._store_path(repo_id), cache_size=settings.graph_store_cache_size)
+    
+    def get_source(self, repo_id: str, node_id: str) -> str | None:
+        """Read a node's source code from its file by byte range."""
+        graph = self.get_graph(repo_id)
+        repo_path = self._repo_paths.get(repo_id)
+        if graph is None or repo_path is None or node_id not in graph:
+            return None
+        
+        data = graph.nodes[node_id].get("data", {})
+        start, end = data.get("start_byte", 0), data.get("end_byte", 0)
+        if end <= start:
+            return None
+        
+        try:
+            with open(repo_path / data["file_path"], "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return mm[start:end].decode("utf-8", errors="replace")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read source for {node_id}: {e}")
+            return None
+    
+    async def load_graph(self, repo_id: str) -> LoadedGraph:
+        """Load graph, convert to API response format and index it."""
+        graph = self.get_graph(repo_id)
         if not graph:
             raise ValueError(f"Graph not found: {repo_id}")
         
-        return self._convert_to_response(graph)
+        graph_data = self._convert_to_response(graph)
+        node_types, node_type_codes = _encode_types([n.type.value for n in graph_data.nodes])
+        edge_types, edge_type_codes = _encode_types([e.type.value for e in graph_data.edges])
+        
+        return LoadedGraph(
+            data=graph_data,
+            id_index={n.id: n for n in graph_data.nodes},
+            csr=build_csr(
+                (n.id for n in graph_data.nodes),
+                ((e.source, e.target) for e in graph_data.edges),
+            ),
+            node_types=node_types,
+            node_type_codes=node_type_codes,
+            edge_types=edge_types,
+            edge_type_codes=edge_type_codes,
+        )
     
-    def _convert_to_response(self, graph: nx.DiGraph) -> GraphData:
-        """Convert NetworkX graph to API response format."""
-        nodes = []
-        for node_id, attrs in graph.nodes(data=True):
-            data = attrs.get("data", {})
-            nodes.append(GraphNode(
-                id=node_id,
-                type=data.get("type", "unknown"),
+    def _convert_to_response(self, graph: nx.DiGraph | GraphStore) -> Any:
+        """Convert NetworkX graph to API response format.
+        
+        Node IDs are interned so every node, edge endpoint and index key
+        shares one string object per ID. The response is built from msgspec
+        structs when available, skipping Pydantic entirely.
+        """
+        intern = sys.intern
+        node_type, edge_type = ApiNodeType, ApiEdgeType
+        if MSGSPEC_AVAILABLE:
+            construct_node, construct_edge, construct_data = GraphNodeMsg, GraphEdgeMsg, GraphDataMsg
+            # Metadata is encoded to JSON here, once per graph load
+            metadata_of = raw_json
+        else:
+            construct_node, construct_edge = GraphNode.model_construct, GraphEdge.model_construct
+            construct_data = GraphData.model_construct
+            metadata_of = _metadata_dict
+        
+        # Node data comes from graph_node_data, so fields are trusted
+        nodes = [
+            construct_node(
+                id=intern(node_id),
+                type=node_type(data.get("type", "unknown")),
                 name=data.get("name", ""),
                 file_path=data.get("file_path", ""),
                 start_line=data.get("start_line", 0),
                 end_line=data.get("end_line", 0),
                 signature=data.get("signature"),
                 docstring=data.get("docstring"),
-                metadata=data.get("metadata", {}),
-            ))
+                metadata=metadata_of(data.get("metadata")),
+            )
+            for node_id, attrs in graph.nodes(data=True)
+            for data in (attrs.get("data", {}),)
+        ]
         
-        edges = []
-        for source, target, attrs in graph.edges(data=True):
-            data = attrs.get("data", {})
-            edges.append(GraphEdge(
-                source=source,
-                target=target,
-                type=data.get("type", "references"),
-                metadata=data.get("metadata", {}),
-            ))
+        edges = [
+            construct_edge(
+                source=intern(source),
+                target=intern(target),
+                type=edge_type(data.get("type", "references")),
+                metadata=metadata_of(data.get("metadata")),
+            )
+            for source, target, attrs in graph.edges(data=True)
+            for data in (attrs.get("data", {}),)
+        ]
         
-        return GraphData(
+        type_counts = Counter(n.type for n in nodes)
+        return construct_data(
             nodes=nodes,
             edges=edges,
             stats={
                 "node_count": len(nodes),
                 "edge_count": len(edges),
-                "module_count": sum(1 for n in nodes if n.type == "module"),
-                "function_count": sum(1 for n in nodes if n.type in ["function", "method"]),
-                "class_count": sum(1 for n in nodes if n.type == "class"),
+                "module_count": type_counts[ApiNodeType.MODULE],
+                "function_count": type_counts[ApiNodeType.FUNCTION] + type_counts[ApiNodeType.METHOD],
+                "class_count": type_counts[ApiNodeType.CLASS],
             }
         )
     
@@ -189,46 +430,60 @@ class GraphBuilder:
             return file_path
     
     def _count_lines(self, file_path: str) -> int:
-        """Count lines in a file."""
+        """Count lines in a file by scanning its bytes for newlines."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return sum(1 for _ in f)
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return 0
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Sliced so that only one block is ever copied out of the map
+                    newlines = sum(
+                        mm[i:i + _LINE_COUNT_BLOCK].count(b"\n")
+                        for i in range(0, len(mm), _LINE_COUNT_BLOCK)
+                    )
+                    # A final line without a trailing newline still counts
+                    return newlines + (mm[-1:] != b"\n")
         except Exception:
             return 0
     
-    def _analyze_calls(self, graph: nx.DiGraph, repo_path: Path):
-        """Analyze function call relationships."""
-        # Get all function/method nodes
-        function_nodes = {}
-        for node_id, attrs in graph.nodes(data=True):
-            data = attrs.get("data", {})
-            if data.get("type") in [NodeType.FUNCTION.value, NodeType.METHOD.value, "function", "method"]:
-                function_nodes[data.get("name")] = node_id
+    def _analyze_calls(self, graph: nx.DiGraph, calls_by_node: dict[str, list[str]]):
+        """Add CALLS edges from parsed call sites to known functions.
         
-        # Look for calls in source code
+        A name defined more than once resolves to the definitions in the
+        caller's own file when there are any, otherwise to all of them.
+        """
+        callable_types = (NodeType.FUNCTION.value, NodeType.METHOD.value)
+        function_nodes: dict[str, list[str]] = defaultdict(list)
         for node_id, attrs in graph.nodes(data=True):
             data = attrs.get("data", {})
-            source = data.get("source_code", "")
-            if not source:
-                continue
-            
-            # Simple pattern matching for function calls
-            import re
-            call_pattern = r'(\w+)\s*\('
-            for match in re.finditer(call_pattern, source):
-                called_name = match.group(1)
-                if called_name in function_nodes and called_name != data.get("name"):
-                    target_id = function_nodes[called_name]
-                    if not graph.has_edge(node_id, target_id):
-                        graph.add_edge(
-                            node_id,
-                            target_id,
-                            data=GraphEdgeData(
-                                source=node_id,
-                                target=target_id,
-                                type=EdgeType.CALLS,
-                            ).to_dict()
-                        )
+            if data.get("type") in callable_types:
+                function_nodes[data.get("name")].append(node_id)
+        
+        nodes = graph.nodes
+        # Insertion-ordered set of (caller, callee) pairs
+        pairs: dict[tuple[str, str], None] = {}
+        for node_id, calls in calls_by_node.items():
+            file_path = nodes[node_id].get("data", {}).get("file_path")
+            for called_name in calls:
+                candidates = function_nodes.get(called_name)
+                if not candidates:
+                    continue
+                
+                local = [c for c in candidates if nodes[c]["data"].get("file_path") == file_path]
+                pairs.update(
+                    ((node_id, target_id), None) for target_id in local or candidates if target_id != node_id
+                )
+        
+        # Existing CONTAINS edges between the same pair take precedence
+        graph.add_edges_from(
+            (
+                source,
+                target,
+                {"data": graph_edge_data(source=source, target=target, type=EdgeType.CALLS)},
+            )
+            for source, target in pairs
+            if not graph.has_edge(source, target)
+        )
     
     def _analyze_imports(self, graph: nx.DiGraph):
         """Analyze import relationships between modules."""
@@ -245,8 +500,7 @@ class GraphBuilder:
                 # Parse import statement to find target module
                 signature = data.get("signature", "")
                 # Simple extraction - could be improved
-                import re
-                for match in re.finditer(r'(?:from|import)\s+(\w+)', signature):
+                for match in _IMPORT_RE.finditer(signature):
                     imported_name = match.group(1)
                     if imported_name in module_nodes:
                         source_module = self._find_parent_module(graph, node_id)
@@ -254,11 +508,11 @@ class GraphBuilder:
                             graph.add_edge(
                                 source_module,
                                 module_nodes[imported_name],
-                                data=GraphEdgeData(
+                                data=graph_edge_data(
                                     source=source_module,
                                     target=module_nodes[imported_name],
                                     type=EdgeType.IMPORTS,
-                                ).to_dict()
+                                )
                             )
     
     def _find_parent_module(self, graph: nx.DiGraph, node_id: str) -> str | None:
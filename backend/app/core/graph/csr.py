@@ -0,0 +1,113 @@
+"""
+CodeGraph Backend - Compressed Sparse Row Adjacency
+"""
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+
+@dataclass
+class CSRAdjacency:
+    """Directed adjacency of a graph as forward and reverse CSR arrays.
+
+    Successors of node ``i`` are ``out_indices[out_indptr[i]:out_indptr[i + 1]]``
+    and predecessors the matching slice of the ``in_`` arrays; ``*_edge_ids``
+    holds the edge each entry came from. Each edge is stored once per side.
+    """
+    out_indptr: np.ndarray
+    out_indices: np.ndarray
+    out_edge_ids: np.ndarray
+    in_indptr: np.ndarray
+    in_indices: np.ndarray
+    in_edge_ids: np.ndarray
+    node_index: dict[str, int]
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.out_indptr) - 1
+
+    @property
+    def arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """The ``(out_indptr, out_indices, in_indptr, in_indices)`` BFS kernels take."""
+        return self.out_indptr, self.out_indices, self.in_indptr, self.in_indices
+
+    def neighbors(self, idx: int) -> np.ndarray:
+        """Get successor then predecessor indices of a node."""
+        return np.concatenate((
+            self.out_indices[self.out_indptr[idx]:self.out_indptr[idx + 1]],
+            self.in_indices[self.in_indptr[idx]:self.in_indptr[idx + 1]],
+        ))
+
+
+def _compress(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    eids: np.ndarray,
+    num_nodes: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sort (row, col) pairs into ``(indptr, indices, edge_ids)``, keeping edge order per row."""
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(num_nodes + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=num_nodes), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32), eids[order]
+
+
+def build_csr(
+    node_ids: Iterable[str],
+    edges: Iterable[tuple[str, str]],
+) -> CSRAdjacency:
+    """Build forward and reverse CSR adjacency from node IDs and (source, target) pairs.
+
+    Edges touching unknown nodes are dropped. Each node's successors and
+    predecessors keep the order in which its edges appear.
+    """
+    node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+    num_nodes = len(node_index)
+
+    src, dst, eids = [], [], []
+    for edge_id, (source, target) in enumerate(edges):
+        s = node_index.get(source)
+        t = node_index.get(target)
+        if s is None or t is None:
+            continue
+        src.append(s)
+        dst.append(t)
+        eids.append(edge_id)
+
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    eids = np.asarray(eids, dtype=np.int32)
+    out_indptr, out_indices, out_edge_ids = _compress(src, dst, eids, num_nodes)
+    in_indptr, in_indices, in_edge_ids = _compress(dst, src, eids, num_nodes)
+
+    return CSRAdjacency(
+        out_indptr=out_indptr,
+        out_indices=out_indices,
+        out_edge_ids=out_edge_ids,
+        in_indptr=in_indptr,
+        in_indices=in_indices,
+        in_edge_ids=in_edge_ids,
+        node_index=node_index,
+    )
+
+
+def induced_edge_ids(csr: CSRAdjacency, node_idx: np.ndarray | list[int]) -> np.ndarray:
+    """Get the sorted IDs of edges whose endpoints are both in ``node_idx``."""
+    rows = np.asarray(node_idx, dtype=np.int32)
+    mask = np.zeros(csr.num_nodes, dtype=bool)
+    mask[rows] = True
+
+    # Every edge leaves exactly one source row, so the forward side suffices
+    starts = csr.out_indptr[rows]
+    lengths = csr.out_indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int32)
+
+    # Flat positions of every CSR entry in the selected rows
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    positions = np.arange(total) + offsets
+
+    inside = mask[csr.out_indices[positions]]
+    return np.unique(csr.out_edge_ids[positions[inside]])
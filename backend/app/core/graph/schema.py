@@ -1,9 +1,10 @@
 """
 CodeGraph Backend - Graph Schema Definitions
 """
-from dataclasses import dataclass, field
 from enum import Enum
+from hashlib import blake2b
 from typing import Any
+import sys
 
 
 class NodeType(str, Enum):
@@ -29,66 +30,65 @@ class EdgeType(str, Enum):
     PARAMETER_OF = "parameter_of"  # Parameter belongs to function
 
 
-@dataclass
-class GraphNodeData:
-    """Data stored in a graph node."""
-    id: str
-    type: NodeType
-    name: str
-    qualified_name: str
-    file_path: str
-    start_line: int
-    end_line: int
-    signature: str | None = None
-    docstring: str | None = None
-    source_code: str | None = None
-    metadata: dict[str, Any] = field(default_factory=dict)
-    
-    def to_dict(self) -> dict:
-        """Convert to dictionary for JSON serialization."""
-        return {
-            "id": self.id,
-            "type": self.type.value if isinstance(self.type, NodeType) else self.type,
-            "name": self.name,
-            "qualified_name": self.qualified_name,
-            "file_path": self.file_path,
-            "start_line": self.start_line,
-            "end_line": self.end_line,
-            "signature": self.signature,
-            "docstring": self.docstring,
-            "metadata": self.metadata,
-        }
+def graph_node_data(
+    id: str,
+    type: NodeType,
+    name: str,
+    qualified_name: str,
+    file_path: str,
+    start_line: int,
+    end_line: int,
+    signature: str | None = None,
+    docstring: str | None = None,
+    start_byte: int = 0,  # Byte range of the source in the file, loaded on demand
+    end_byte: int = 0,
+    metadata: dict[str, Any] | None = None,
+) -> dict:
+    """Build the data dict stored in a graph node; metadata is left out when empty."""
+    data = {
+        "id": id,
+        "type": type.value if isinstance(type, NodeType) else type,
+        "name": name,
+        "qualified_name": qualified_name,
+        "file_path": file_path,
+        "start_line": start_line,
+        "end_line": end_line,
+        "signature": signature,
+        "docstring": docstring,
+        "start_byte": start_byte,
+        "end_byte": end_byte,
+    }
+    if metadata:
+        data["metadata"] = metadata
+    return data
 
 
-@dataclass
-class GraphEdgeData:
-    """Data stored in a graph edge."""
-    source: str
-    target: str
-    type: EdgeType
-    weight: float = 1.0
-    metadata: dict[str, Any] = field(default_factory=dict)
-    
-    def to_dict(self) -> dict:
-        """Convert to dictionary for JSON serialization."""
-        return {
-            "source": self.source,
-            "target": self.target,
-            "type": self.type.value if isinstance(self.type, EdgeType) else self.type,
-            "weight": self.weight,
-            "metadata": self.metadata,
-        }
+def graph_edge_data(
+    source: str,
+    target: str,
+    type: EdgeType,
+    weight: float = 1.0,
+    metadata: dict[str, Any] | None = None,
+) -> dict:
+    """Build the data dict stored in a graph edge; metadata is left out when empty."""
+    data = {
+        "source": source,
+        "target": target,
+        "type": type.value if isinstance(type, EdgeType) else type,
+        "weight": weight,
+    }
+    if metadata:
+        data["metadata"] = metadata
+    return data
 
 
 # Node ID generation utilities
 def make_node_id(file_path: str, qualified_name: str) -> str:
     """Generate a unique node ID."""
-    import hashlib
     content = f"{file_path}::{qualified_name}"
-    return hashlib.sha256(content.encode()).hexdigest()[:16]
+    return sys.intern(blake2b(content.encode(), digest_size=8).hexdigest())
 
 
 def make_module_id(file_path: str) -> str:
     """Generate a module node ID from file path."""
-    import hashlib
-    return hashlib.sha256(file_path.encode()).hexdigest()[:16]
+    return sys.intern(blake2b(file_path.encode(), digest_size=8).hexdigest())
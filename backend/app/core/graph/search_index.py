@@ -0,0 +1,81 @@
+"""
+CodeGraph Backend - Token Index for Node Search
+"""
+import re
+
+import networkx as nx
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class SearchIndex:
+    """Inverted token index answering case-insensitive substring queries over nodes.
+
+    Any substring match of a query must contain the query's inner tokens as
+    whole text tokens, and its outer tokens as token prefixes/suffixes, so
+    candidates come from the postings of matching vocabulary entries and
+    are then confirmed against the precomputed searchable text.
+    """
+
+    def __init__(self, graph: nx.DiGraph):
+        self.node_ids: list[str] = []
+        self.data: list[dict] = []
+        self.texts: list[str] = []
+        self.postings: dict[str, list[int]] = {}
+
+        for position, (node_id, attrs) in enumerate(graph.nodes(data=True)):
+            data = attrs.get("data", {})
+            text = " ".join([
+                data.get("name", ""),
+                data.get("qualified_name", ""),
+                data.get("signature", "") or "",
+                data.get("docstring", "") or "",
+            ]).lower()
+            self.node_ids.append(node_id)
+            self.data.append(data)
+            self.texts.append(text)
+            for token in set(_TOKEN_RE.findall(text)):
+                self.postings.setdefault(token, []).append(position)
+
+    def candidates(self, query_lower: str) -> list[int]:
+        """Get node positions, in graph order, whose text may contain the query."""
+        matches = list(_TOKEN_RE.finditer(query_lower))
+        if not matches:
+            return list(range(len(self.node_ids)))
+
+        # Whole tokens first: they are dict lookups and the most selective
+        matches.sort(key=lambda m: (m.start() == 0) + (m.end() == len(query_lower)))
+
+        result: set[int] | None = None
+        for match in matches:
+            token = match.group()
+            left_open = match.start() == 0
+            right_open = match.end() == len(query_lower)
+
+            if not left_open and not right_open:
+                positions = set(self.postings.get(token, ()))
+            else:
+                positions = set()
+                for word, posting in self.postings.items():
+                    if left_open and right_open:
+                        hit = token in word
+                    elif left_open:
+                        hit = word.endswith(token)
+                    else:
+                        hit = word.startswith(token)
+                    if hit:
+                        positions.update(posting)
+
+            result = positions if result is None else result & positions
+            if not result:
+                return []
+
+        return sorted(result)
+
+
+def get_search_index(graph: nx.DiGraph) -> SearchIndex:
+    """Get the search index of a graph, building it on first use."""
+    index = graph.graph.get("_search_index")
+    if index is None:
+        index = graph.graph["_search_index"] = SearchIndex(graph)
+    return index
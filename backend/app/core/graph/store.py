@@ -0,0 +1,182 @@
+"""
+CodeGraph Backend - SQLite-backed Graph Store
+"""
+from pathlib import Path
+from typing import Any, Iterator
+import json
+import sqlite3
+import threading
+
+from cachetools import LRUCache
+import networkx as nx
+
+
+class GraphStore:
+    """Read-only code graph kept on disk in SQLite.
+
+    Exposes the subset of the ``nx.DiGraph`` API the traversal, search and
+    response code use (``nodes``, ``edges``, ``successors``, ...), so a
+    store can stand in for an in-memory graph once it has been built.
+    Recently used nodes and adjacency lists are kept in an LRU cache.
+    """
+
+    def __init__(self, path: str | Path, cache_size: int = 4096):
+        self.path = Path(path)
+        self.graph: dict[str, Any] = {}
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._cache = LRUCache(maxsize=cache_size)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Lazy initialization of the SQLite connection."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS nodes (id TEXT PRIMARY KEY, data TEXT NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS edges ("
+                " src TEXT NOT NULL, dst TEXT NOT NULL, type TEXT, data TEXT NOT NULL,"
+                " PRIMARY KEY (src, dst));"
+                "CREATE INDEX IF NOT EXISTS edges_dst ON edges (dst);"
+            )
+        return self._conn
+
+    def save(self, graph: nx.DiGraph):
+        """Replace the stored graph with the contents of a NetworkX graph."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM edges")
+            self.conn.execute("DELETE FROM nodes")
+            self.conn.executemany(
+                "INSERT INTO nodes (id, data) VALUES (?, ?)",
+                ((node_id, json.dumps(attrs.get("data", {}))) for node_id, attrs in graph.nodes(data=True)),
+            )
+            self.conn.executemany(
+                "INSERT INTO edges (src, dst, type, data) VALUES (?, ?, ?, ?)",
+                (
+                    (u, v, attrs.get("data", {}).get("type"), json.dumps(attrs.get("data", {})))
+                    for u, v, attrs in graph.edges(data=True)
+                ),
+            )
+            self._cache.clear()
+        self.graph.clear()
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _cached(self, key: tuple, load):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = load()
+            self._cache[key] = value
+            return value
+
+    def node_data(self, node_id: str) -> dict | None:
+        """Get a node's data dict, or None if it does not exist."""
+        def load():
+            rows = self._query("SELECT data FROM nodes WHERE id = ?", (node_id,))
+            return json.loads(rows[0][0]) if rows else None
+        return self._cached(("node", node_id), load)
+
+    def edge_data(self, source: str, target: str) -> dict | None:
+        """Get an edge's data dict, or None if it does not exist."""
+        def load():
+            rows = self._query("SELECT data FROM edges WHERE src = ? AND dst = ?", (source, target))
+            return json.loads(rows[0][0]) if rows else None
+        return self._cached(("edge", source, target), load)
+
+    def successors(self, node_id: str) -> Iterator[str]:
+        """Iterate nodes this node has edges to."""
+        return iter(self._cached(
+            ("out", node_id),
+            lambda: [r[0] for r in self._query("SELECT dst FROM edges WHERE src = ? ORDER BY rowid", (node_id,))],
+        ))
+
+    def predecessors(self, node_id: str) -> Iterator[str]:
+        """Iterate nodes with edges to this node."""
+        return iter(self._cached(
+            ("in", node_id),
+            lambda: [r[0] for r in self._query("SELECT src FROM edges WHERE dst = ? ORDER BY rowid", (node_id,))],
+        ))
+
+    def out_degree(self, node_id: str) -> int:
+        return len(list(self.successors(node_id)))
+
+    def in_degree(self, node_id: str) -> int:
+        return len(list(self.predecessors(node_id)))
+
+    def has_edge(self, source: str, target: str) -> bool:
+        return self.edge_data(source, target) is not None
+
+    def number_of_nodes(self) -> int:
+        return self._query("SELECT COUNT(*) FROM nodes")[0][0]
+
+    def number_of_edges(self) -> int:
+        return self._query("SELECT COUNT(*) FROM edges")[0][0]
+
+    def __contains__(self, node_id: object) -> bool:
+        return isinstance(node_id, str) and self.node_data(node_id) is not None
+
+    def __len__(self) -> int:
+        return self.number_of_nodes()
+
+    @property
+    def nodes(self) -> "_NodeView":
+        return _NodeView(self)
+
+    @property
+    def edges(self) -> "_EdgeView":
+        return _EdgeView(self)
+
+
+class _NodeView:
+    """``graph.nodes`` lookalike: iterable, callable with ``data=`` and indexable."""
+
+    def __init__(self, store: GraphStore):
+        self._store = store
+
+    def __call__(self, data: bool = False):
+        rows = self._store._query("SELECT id, data FROM nodes ORDER BY rowid")
+        if data:
+            return [(node_id, {"data": json.loads(raw)}) for node_id, raw in rows]
+        return [node_id for node_id, _ in rows]
+
+    def __iter__(self):
+        return iter(self())
+
+    def __len__(self) -> int:
+        return self._store.number_of_nodes()
+
+    def __getitem__(self, node_id: str) -> dict:
+        data = self._store.node_data(node_id)
+        if data is None:
+            raise KeyError(node_id)
+        return {"data": data}
+
+
+class _EdgeView:
+    """``graph.edges`` lookalike: iterable, callable with ``data=`` and indexable by pair."""
+
+    def __init__(self, store: GraphStore):
+        self._store = store
+
+    def __call__(self, data: bool = False):
+        rows = self._store._query("SELECT src, dst, data FROM edges ORDER BY rowid")
+        if data:
+            return [(u, v, {"data": json.loads(raw)}) for u, v, raw in rows]
+        return [(u, v) for u, v, _ in rows]
+
+    def __iter__(self):
+        return iter(self())
+
+    def __len__(self) -> int:
+        return self._store.number_of_edges()
+
+    def __getitem__(self, pair: tuple[str, str]) -> dict:
+        data = self._store.edge_data(*pair)
+        if data is None:
+            raise KeyError(pair)
+        return {"data": data}
@@ -2,11 +2,23 @@
 CodeGraph Backend - Graph Traversal Algorithms
 """
 from dataclasses import dataclass, field
-from typing import Generator, Any
+from typing import Generator, Any, Iterable
 import networkx as nx
+import numpy as np
 from collections import deque
+from itertools import count, islice
+import heapq
 
+from app.core.graph.bfs_jit import NUMBA_AVAILABLE, directed_bfs
+from app.core.graph.csr import build_csr
 from app.core.graph.schema import NodeType, EdgeType
+from app.core.graph.search_index import get_search_index
+
+try:
+    import igraph
+    IGRAPH_AVAILABLE = True
+except ImportError:
+    IGRAPH_AVAILABLE = False
 
 
 @dataclass
@@ -28,6 +40,74 @@ class TraversalResult:
     paths_found: list[list[str]]
 
 
+@dataclass
+class _TypedCSR:
+    """Successor lists in CSR form with per-entry edge and per-node type codes."""
+    names: list[str]
+    node_index: dict[str, int]
+    indptr: np.ndarray
+    indices: np.ndarray
+    edge_codes: np.ndarray
+    node_codes: np.ndarray
+    edge_type_values: list[str | None]
+    node_type_values: list[str | None]
+    
+    @classmethod
+    def from_graph(cls, graph: nx.DiGraph) -> "_TypedCSR":
+        names = list(graph.nodes)
+        edges = list(graph.edges(data=True))
+        # Successors keep graph order because edges arrive grouped by source
+        csr = build_csr(names, ((u, v) for u, v, _ in edges))
+        
+        node_codes, node_type_values = _codes(
+            graph.nodes[n].get("data", {}).get("type") for n in names
+        )
+        edge_codes, edge_type_values = _codes(
+            attrs.get("data", {}).get("type") for _, _, attrs in edges
+        )
+        return cls(
+            names=names,
+            node_index=csr.node_index,
+            indptr=csr.out_indptr,
+            indices=csr.out_indices,
+            edge_codes=edge_codes[csr.out_edge_ids],
+            node_codes=node_codes,
+            edge_type_values=edge_type_values,
+            node_type_values=node_type_values,
+        )
+
+
+def _codes(values: Iterable[str | None]) -> tuple[np.ndarray, list[str | None]]:
+    """Encode values as int32 codes, returning ``(codes, values by code)``."""
+    table: dict[str | None, int] = {}
+    codes = [table.setdefault(value, len(table)) for value in values]
+    return np.asarray(codes, dtype=np.int32), list(table)
+
+
+def _allowed(values: list[str | None], types: list | None) -> np.ndarray:
+    """Get a mask over type codes of the values allowed by a type filter."""
+    if not types:
+        return np.ones(max(len(values), 1), dtype=np.bool_)
+    wanted = {t.value for t in types}
+    return np.array([value in wanted for value in values] or [False], dtype=np.bool_)
+
+
+def _walk(links: dict[str, str | None], node_id: str) -> list[str]:
+    """Follow links from a node until one points at None."""
+    path = []
+    while node_id is not None:
+        path.append(node_id)
+        node_id = links[node_id]
+    return path
+
+
+def _path_to(parents: dict[str, str | None], node_id: str) -> list[str]:
+    """Rebuild the root-to-node path from parent pointers."""
+    path = _walk(parents, node_id)
+    path.reverse()
+    return path
+
+
 class GraphTraversal:
     """Multi-hop graph traversal algorithms for code navigation."""
     
@@ -45,24 +125,29 @@ class GraphTraversal:
         if start_node not in self.graph:
             return
         
-        visited = {start_node}
-        queue = deque([(start_node, 0, [start_node], None)])
+        if NUMBA_AVAILABLE:
+            yield from self._bfs_compiled(start_node, max_depth, edge_types, node_types)
+            return
+        
+        node_type_set = frozenset(t.value for t in node_types) if node_types else None
+        edge_type_set = frozenset(t.value for t in edge_types) if edge_types else None
+        
+        parents = {start_node: None}
+        queue = deque([(start_node, 0, None)])
         
         while queue:
-            current, depth, path, edge_type = queue.popleft()
+            current, depth, edge_type = queue.popleft()
             node_data = self.graph.nodes[current].get("data", {})
             
             # Filter by node type
-            if node_types:
-                node_type = node_data.get("type")
-                if node_type not in [t.value for t in node_types]:
-                    continue
+            if node_type_set and node_data.get("type") not in node_type_set:
+                continue
             
             yield TraversalStep(
                 node_id=current,
                 node_data=node_data,
                 depth=depth,
-                path=path,
+                path=_path_to(parents, current),
                 edge_type=edge_type,
             )
             
@@ -71,16 +156,62 @@ class GraphTraversal:
             
             # Get neighbors
             for neighbor in self.graph.successors(current):
-                if neighbor not in visited:
+                if neighbor not in parents:
                     edge_data = self.graph.edges[current, neighbor].get("data", {})
                     curr_edge_type = edge_data.get("type")
                     
                     # Filter by edge type
-                    if edge_types and curr_edge_type not in [t.value for t in edge_types]:
+                    if edge_type_set and curr_edge_type not in edge_type_set:
                         continue
                     
-                    visited.add(neighbor)
-                    queue.append((neighbor, depth + 1, path + [neighbor], curr_edge_type))
+                    parents[neighbor] = current
+                    queue.append((neighbor, depth + 1, curr_edge_type))
+    
+    def _bfs_compiled(
+        self,
+        start_node: str,
+        max_depth: int,
+        edge_types: list[EdgeType] | None,
+        node_types: list[NodeType] | None,
+    ) -> Generator[TraversalStep, None, None]:
+        """Run ``bfs`` with the JIT kernel over the graph's typed CSR arrays."""
+        index = self._typed_csr()
+        emitted, depth, parent, via = directed_bfs(
+            index.indptr,
+            index.indices,
+            index.edge_codes,
+            index.node_codes,
+            index.node_index[start_node],
+            max_depth,
+            _allowed(index.edge_type_values, edge_types),
+            _allowed(index.node_type_values, node_types),
+        )
+        
+        names = index.names
+        parent = parent.tolist()
+        for node in emitted.tolist():
+            path = []
+            step = node
+            while step >= 0:
+                path.append(names[step])
+                step = parent[step]
+            path.reverse()
+            
+            code = int(via[node])
+            yield TraversalStep(
+                node_id=names[node],
+                node_data=self.graph.nodes[names[node]].get("data", {}),
+                depth=int(depth[node]),
+                path=path,
+                edge_type=index.edge_type_values[code] if code >= 0 else None,
+            )
+    
+    def _typed_csr(self) -> "_TypedCSR":
+        """Get the graph's successor CSR with type codes, cached on the graph itself."""
+        cached = self.graph.graph.get("_typed_csr")
+        if cached is None:
+            cached = self.graph.graph["_typed_csr"] = _TypedCSR.from_graph(self.graph)
+        return cached
     
     def dfs(
         self,
@@ -92,15 +223,18 @@ class GraphTraversal:
         if start_node not in self.graph:
             return
         
-        visited = set()
-        stack = [(start_node, 0, [start_node], None)]
+        edge_type_set = frozenset(t.value for t in edge_types) if edge_types else None
+        
+        # Entries carry the node they were reached from; it is fixed on visit
+        parents = {}
+        stack = [(start_node, 0, None, None)]
         
         while stack:
-            current, depth, path, edge_type = stack.pop()
+            current, depth, parent, edge_type = stack.pop()
             
-            if current in visited:
+            if current in parents:
                 continue
-            visited.add(current)
+            parents[current] = parent
             
             node_data = self.graph.nodes[current].get("data", {})
             
@@ -108,7 +242,7 @@ class GraphTraversal:
                 node_id=current,
                 node_data=node_data,
                 depth=depth,
-                path=path,
+                path=_path_to(parents, current),
                 edge_type=edge_type,
             )
             
@@ -116,33 +250,91 @@ class GraphTraversal:
                 continue
             
             for neighbor in self.graph.successors(current):
-                if neighbor not in visited:
+                if neighbor not in parents:
                     edge_data = self.graph.edges[current, neighbor].get("data", {})
                     curr_edge_type = edge_data.get("type")
                     
-                    if edge_types and curr_edge_type not in [t.value for t in edge_types]:
+                    if edge_type_set and curr_edge_type not in edge_type_set:
                         continue
                     
-                    stack.append((neighbor, depth + 1, path + [neighbor], curr_edge_type))
+                    stack.append((neighbor, depth + 1, current, curr_edge_type))
     
     def find_paths(
         self,
         source: str,
         target: str,
         max_depth: int = 5,
+        k: int | None = 10,
     ) -> list[list[str]]:
-        """Find all paths between source and target nodes."""
+        """Find up to ``k`` shortest paths of at most ``max_depth`` edges between two nodes.
+        
+        ``k=None`` enumerates every simple path, which can explode on dense
+        call graphs. Without igraph the search only uses ``successors`` and
+        ``predecessors``, so it also runs on a GraphStore.
+        """
         if source not in self.graph or target not in self.graph:
             return []
         
-        paths = []
-        try:
-            for path in nx.all_simple_paths(self.graph, source, target, cutoff=max_depth):
-                paths.append(path)
-        except nx.NetworkXNoPath:
-            pass
+        if IGRAPH_AVAILABLE:
+            ig, index, names = self._igraph()
+            if k is None:
+                found = ig.get_all_simple_paths(
+                    index[source], to=index[target], cutoff=max_depth, mode="out",
+                )
+            else:
+                found = ig.get_k_shortest_paths(index[source], to=index[target], k=k, mode="out")
+            return [[names[v] for v in path] for path in found if path and len(path) - 1 <= max_depth]
+        
+        return list(islice(self._bounded_paths(source, target, max_depth), k))
+    
+    def _bounded_paths(self, source: str, target: str, max_depth: int) -> Generator[list[str], None, None]:
+        """Yield simple paths of at most ``max_depth`` edges, shortest first."""
+        # Edges still needed to reach the target, for nodes that can in time
+        remaining = {target: 0}
+        frontier = [target]
+        for depth in range(1, max_depth + 1):
+            next_frontier = []
+            for node in frontier:
+                for pred in self.graph.predecessors(node):
+                    if pred not in remaining:
+                        remaining[pred] = depth
+                        next_frontier.append(pred)
+            frontier = next_frontier
+        if source not in remaining:
+            return
         
-        return paths
+        # Best-first on the length a path can finish at; every queued path can
+        # still reach the target within max_depth, so nothing is expanded in vain
+        tiebreak = count()
+        heap = [(remaining[source], next(tiebreak), [source])]
+        while heap:
+            _, _, path = heapq.heappop(heap)
+            current = path[-1]
+            if current == target:
+                yield path
+                continue
+            
+            for neighbor in self.graph.successors(current):
+                to_go = remaining.get(neighbor)
+                if to_go is None or neighbor in path:
+                    continue
+                length = len(path) + to_go
+                if length <= max_depth:
+                    heapq.heappush(heap, (length, next(tiebreak), path + [neighbor]))
+    
+    def _igraph(self) -> tuple["igraph.Graph", dict[str, int], list[str]]:
+        """Get an igraph copy of the graph structure, cached on the graph itself."""
+        cached = self.graph.graph.get("_igraph")
+        if cached is None:
+            names = list(self.graph.nodes)
+            index = {node_id: i for i, node_id in enumerate(names)}
+            ig = igraph.Graph(
+                n=len(names),
+                edges=[(index[u], index[v]) for u, v in self.graph.edges],
+                directed=True,
+            )
+            cached = self.graph.graph["_igraph"] = (ig, index, names)
+        return cached
     
     def find_callers(self, node_id: str, max_depth: int = 3) -> list[TraversalStep]:
         """Find all nodes that call a given function."""
@@ -150,35 +342,34 @@ class GraphTraversal:
             return []
         
         callers = []
-        reverse_graph = self.graph.reverse()
         
-        visited = {node_id}
-        queue = deque([(node_id, 0, [node_id])])
+        # Each caller points at the node it calls, back toward node_id
+        callees_of = {node_id: None}
+        queue = deque([(node_id, 0)])
         
         while queue:
-            current, depth, path = queue.popleft()
+            current, depth = queue.popleft()
             
             if depth >= max_depth:
                 continue
             
-            for predecessor in reverse_graph.successors(current):
-                if predecessor in visited:
+            for predecessor in self.graph.predecessors(current):
+                if predecessor in callees_of:
                     continue
                 
                 edge_data = self.graph.edges[predecessor, current].get("data", {})
                 if edge_data.get("type") == EdgeType.CALLS.value:
-                    visited.add(predecessor)
-                    new_path = [predecessor] + path
+                    callees_of[predecessor] = current
                     
                     callers.append(TraversalStep(
                         node_id=predecessor,
                         node_data=self.graph.nodes[predecessor].get("data", {}),
                         depth=depth + 1,
-                        path=new_path,
+                        path=_walk(callees_of, predecessor),
                         edge_type="calls",
                     ))
                     
-                    queue.append((predecessor, depth + 1, new_path))
+                    queue.append((predecessor, depth + 1))
         
         return callers
     
@@ -202,29 +393,32 @@ class GraphTraversal:
             return []
         
         flow = []
-        visited = set()
+        parents = {}
+        stack = [(entry_point, 0, None)]
         
-        def trace(node_id: str, depth: int, path: list[str]):
-            if len(flow) >= max_steps or node_id in visited:
-                return
+        while stack and len(flow) < max_steps:
+            node_id, depth, parent = stack.pop()
             
-            visited.add(node_id)
+            if node_id in parents:
+                continue
+            parents[node_id] = parent
             node_data = self.graph.nodes[node_id].get("data", {})
             
             flow.append(TraversalStep(
                 node_id=node_id,
                 node_data=node_data,
                 depth=depth,
-                path=path,
+                path=_path_to(parents, node_id),
             ))
             
-            # Follow CALLS edges
-            for neighbor in self.graph.successors(node_id):
-                edge_data = self.graph.edges[node_id, neighbor].get("data", {})
-                if edge_data.get("type") == EdgeType.CALLS.value:
-                    trace(neighbor, depth + 1, path + [neighbor])
+            # Follow CALLS edges, pushed in reverse so the first is traced first
+            callees = [
+                neighbor for neighbor in self.graph.successors(node_id)
+                if self.graph.edges[node_id, neighbor].get("data", {}).get("type") == EdgeType.CALLS.value
+            ]
+            for neighbor in reversed(callees):
+                stack.append((neighbor, depth + 1, node_id))
         
-        trace(entry_point, 0, [entry_point])
         return flow
     
     def get_node_context(
@@ -275,29 +469,23 @@ class GraphTraversal:
         """Search nodes by name or content."""
         results = []
         query_lower = query.lower()
+        index = get_search_index(self.graph)
+        type_values = [t.value for t in node_types] if node_types else None
         
-        for node_id, attrs in self.graph.nodes(data=True):
+        for position in index.candidates(query_lower):
             if len(results) >= limit:
                 break
             
-            data = attrs.get("data", {})
+            data = index.data[position]
             
             # Filter by node type
-            if node_types:
-                if data.get("type") not in [t.value for t in node_types]:
-                    continue
+            if type_values and data.get("type") not in type_values:
+                continue
             
             # Search in name, qualified_name, signature, docstring
-            searchable = " ".join([
-                data.get("name", ""),
-                data.get("qualified_name", ""),
-                data.get("signature", "") or "",
-                data.get("docstring", "") or "",
-            ]).lower()
-            
-            if query_lower in searchable:
+            if query_lower in index.texts[position]:
                 results.append({
-                    "node_id": node_id,
+                    "node_id": index.node_ids[position],
                     "data": data,
                     "score": 1.0 if query_lower == data.get("name", "").lower() else 0.5,
                 })
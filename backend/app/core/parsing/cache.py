@@ -0,0 +1,78 @@
+"""
+CodeGraph Backend - Persistent Parse Cache
+"""
+from pathlib import Path
+import hashlib
+import logging
+import pickle
+import sqlite3
+import threading
+import zlib
+
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# How long a write waits for another connection's lock before failing
+_BUSY_TIMEOUT_MS = 10_000
+
+
+def content_digest(*parts: bytes) -> bytes:
+    """Hash byte strings into a 16-byte cache key; not for security use."""
+    # BLAKE3 is SIMD-accelerated; BLAKE2b is the fastest stdlib fallback
+    hasher = blake3.blake3() if BLAKE3_AVAILABLE else hashlib.blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(part)
+    return hasher.digest()[:16]
+
+
+class ParseCache:
+    """SQLite-backed store of parsed nodes per file, keyed by content hash."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Lazy initialization of the SQLite connection."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            # Readers in parse workers never block the writer, and a writer
+            # from another process waits for the lock instead of failing
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files "
+                "(path TEXT PRIMARY KEY, hash BLOB NOT NULL, nodes BLOB NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, path: str, digest: bytes) -> list | None:
+        """Get the cached nodes of a file, or None unless its hash matches."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT hash, nodes FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        if row is None or row[0] != digest:
+            return None
+        return pickle.loads(zlib.decompress(row[1]))
+
+    def put_many(self, items: list[tuple[str, bytes, list]]):
+        """Store (path, hash, nodes) entries, replacing older ones."""
+        rows = [
+            (path, digest, zlib.compress(pickle.dumps(nodes, protocol=5), 1))
+            for path, digest, nodes in items
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files (path, hash, nodes) VALUES (?, ?, ?)",
+                rows,
+            )
@@ -4,6 +4,8 @@ CodeGraph Backend - Language Configuration for Tree-sitter
 from dataclasses import dataclass, field
 from typing import Callable
 from pathlib import Path
+import os
+import re
 
 
 @dataclass
@@ -19,10 +21,24 @@ class LanguageConfig:
     import_types: list[str] = field(default_factory=list)
     variable_types: list[str] = field(default_factory=list)
     
+    # Tree-sitter query capturing called names as @callee
+    call_query: str = ""
+    
     # Field names for extracting information
     name_field: str = "name"
     body_field: str = "body"
     parameters_field: str = "parameters"
+    
+    # Tree-sitter node type -> parsed node type, derived from the lists above
+    type_map: dict[str, str] = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        # Built lowest precedence first, so function_types wins on overlap
+        self.type_map = (
+            {t: "import" for t in self.import_types}
+            | {t: "class" for t in self.class_types}
+            | {t: "function" for t in self.function_types}
+        )
 
 
 # Language configurations
@@ -34,6 +50,12 @@ PYTHON_CONFIG = LanguageConfig(
     class_types=["class_definition"],
     import_types=["import_statement", "import_from_statement"],
     variable_types=["assignment", "annotated_assignment"],
+    call_query="""
+        (call function: [
+            (identifier) @callee
+            (attribute attribute: (identifier) @callee)
+        ])
+    """,
     name_field="name",
     body_field="body",
     parameters_field="parameters",
@@ -52,6 +74,12 @@ JAVASCRIPT_CONFIG = LanguageConfig(
     class_types=["class_declaration", "class_expression"],
     import_types=["import_statement"],
     variable_types=["variable_declaration", "lexical_declaration"],
+    call_query="""
+        (call_expression function: [
+            (identifier) @callee
+            (member_expression property: (property_identifier) @callee)
+        ])
+    """,
     name_field="name",
     body_field="body",
     parameters_field="parameters",
@@ -71,6 +99,12 @@ TYPESCRIPT_CONFIG = LanguageConfig(
     class_types=["class_declaration", "abstract_class_declaration"],
     import_types=["import_statement"],
     variable_types=["variable_declaration", "lexical_declaration"],
+    call_query="""
+        (call_expression function: [
+            (identifier) @callee
+            (member_expression property: (property_identifier) @callee)
+        ])
+    """,
     name_field="name",
     body_field="body",
     parameters_field="parameters",
@@ -82,14 +116,19 @@ LANGUAGE_CONFIGS: dict[str, LanguageConfig] = {}
 
 for config in [PYTHON_CONFIG, JAVASCRIPT_CONFIG, TYPESCRIPT_CONFIG]:
     for ext in config.extensions:
-        LANGUAGE_CONFIGS[ext] = config
+        LANGUAGE_CONFIGS[ext.lower()] = config
+
+
+def get_language_config_by_name(name: str) -> LanguageConfig | None:
+    """Get language configuration from a bare file name, without building a Path."""
+    dot = name.rfind(".")
+    # A leading dot marks a hidden file, not an extension (as with Path.suffix)
+    return LANGUAGE_CONFIGS.get(name[dot:].lower()) if dot > 0 else None
 
 
 def get_language_config(file_path: str | Path) -> LanguageConfig | None:
     """Get language configuration for a file."""
-    path = Path(file_path)
-    ext = path.suffix.lower()
-    return LANGUAGE_CONFIGS.get(ext)
+    return get_language_config_by_name(os.path.basename(file_path))
 
 
 def is_supported_file(file_path: str | Path) -> bool:
@@ -97,6 +136,11 @@ def is_supported_file(file_path: str | Path) -> bool:
     return get_language_config(file_path) is not None
 
 
+def is_supported_ext(name: str) -> bool:
+    """Check if a bare file name has a supported extension."""
+    return get_language_config_by_name(name) is not None
+
+
 # Files and directories to ignore during parsing
 IGNORE_PATTERNS = [
     "__pycache__",
@@ -116,14 +160,18 @@ IGNORE_PATTERNS = [
     "*.bundle.js",
 ]
 
+# IGNORE_PATTERNS split into exact names and one regex over all "*" suffixes
+_IGNORE_EXACT = frozenset(p for p in IGNORE_PATTERNS if not p.startswith("*"))
+_IGNORE_SUFFIX_RE = re.compile(
+    "(?:" + "|".join(re.escape(p[1:]) for p in IGNORE_PATTERNS if p.startswith("*")) + r")\Z"
+)
+
 
 def should_ignore(path: Path) -> bool:
     """Check if a path should be ignored."""
-    name = path.name
-    for pattern in IGNORE_PATTERNS:
-        if pattern.startswith("*"):
-            if name.endswith(pattern[1:]):
-                return True
-        elif name == pattern:
-            return True
-    return False
+    return should_ignore_name(path.name)
+
+
+def should_ignore_name(name: str) -> bool:
+    """Check if a file or directory name should be ignored."""
+    return name in _IGNORE_EXACT or _IGNORE_SUFFIX_RE.search(name) is not None
@@ -1,10 +1,20 @@
 """
 CodeGraph Backend - Tree-sitter AST Parser
 """
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Generator, Any
+from typing import ContextManager, Generator, Any
 import logging
+import mmap
+import os
+import pickle
+import re
+import sqlite3
+import zlib
 
 try:
     import tree_sitter
@@ -15,11 +25,13 @@ try:
 except ImportError:
     TREE_SITTER_AVAILABLE = False
 
+from app.config import settings
+from app.core.parsing.cache import ParseCache, content_digest
 from app.core.parsing.languages import (
     LanguageConfig,
     get_language_config,
-    is_supported_file,
-    should_ignore,
+    is_supported_ext,
+    should_ignore_name,
     PYTHON_CONFIG,
     JAVASCRIPT_CONFIG,
     TYPESCRIPT_CONFIG,
@@ -27,8 +39,29 @@ from app.core.parsing.languages import (
 
 logger = logging.getLogger(__name__)
 
+# Bumped when parser output changes, invalidating cached parses
+_PARSE_CACHE_VERSION = b"3"
 
-@dataclass
+# Cached files written per transaction while parsing a directory
+_CACHE_WRITE_BATCH = 256
+
+# Fallback Python line classifier: a def, a class or a top-level import
+_PY_FALLBACK_RE = re.compile(
+    r"^(?:\s*(?:(?:async\s+)?def\s+(?P<function>\w+)\s*\(|class\s+(?P<class>\w+))"
+    r"|(?:from\s+\S+\s+)?import\s+)"
+)
+
+# Files at least this large are parsed from a memory map instead of a copy
+_MMAP_MIN_BYTES = 1 << 16
+
+# Body node types whose first statement may be a docstring
+_BLOCK_NODE_TYPES = frozenset({"block", "statement_block"})
+
+# Child node types holding a definition's name
+_NAME_NODE_TYPES = frozenset({"identifier", "property_identifier", "name"})
+
+
+@dataclass(slots=True)
 class ParsedNode:
     """A parsed code node from the AST."""
     node_type: str  # function, class, method, import, variable
@@ -39,15 +72,25 @@ class ParsedNode:
     end_line: int
     start_column: int
     end_column: int
+    start_byte: int = 0
+    end_byte: int = 0
     signature: str | None = None
     docstring: str | None = None
     source_code: str | None = None
     parent_name: str | None = None
-    children: list[str] = None
-    
-    def __post_init__(self):
-        if self.children is None:
-            self.children = []
+    children: list[str] = field(default_factory=list)
+    calls: list[str] = field(default_factory=list)  # Names called within this node, in source order
+
+
+@dataclass
+class TSEdit:
+    """A text edit, in the byte and (row, column) coordinates Tree-sitter uses."""
+    start_byte: int
+    old_end_byte: int
+    new_end_byte: int
+    start_point: tuple[int, int]
+    old_end_point: tuple[int, int]
+    new_end_point: tuple[int, int]
 
 
 class TreeSitterParser:
@@ -56,6 +99,11 @@ class TreeSitterParser:
     def __init__(self):
         self._parsers: dict[str, Any] = {}
         self._languages: dict[str, Any] = {}
+        self._call_queries: dict[str, Any] = {}
+        self._definition_queries: dict[str, Any] = {}
+        self._cache = ParseCache(settings.parse_cache_path) if settings.parse_cache_path else None
+        # Last tree per file and the language it was parsed as, least recently used first
+        self._tree_cache: OrderedDict[str, tuple[str, Any]] = OrderedDict()
         self._init_languages()
     
     def _init_languages(self):
@@ -84,130 +132,297 @@ class TreeSitterParser:
             for lang_name, language in self._languages.items():
                 parser = tree_sitter.Parser(language)
                 self._parsers[lang_name] = parser
+            
+            # Compile definition and call-site queries once per language
+            for config in [PYTHON_CONFIG, JAVASCRIPT_CONFIG, TYPESCRIPT_CONFIG]:
+                language = self._languages.get(config.tree_sitter_name)
+                if language is None:
+                    continue
+                self._definition_queries[config.tree_sitter_name] = language.query(
+                    _definition_query(language, config)
+                )
+                if config.call_query:
+                    self._call_queries[config.tree_sitter_name] = language.query(config.call_query)
                 
         except Exception as e:
             logger.error(f"Failed to initialize Tree-sitter: {e}")
     
     def parse_file(self, file_path: Path, content: str | None = None) -> list[ParsedNode]:
         """Parse a single file and extract code nodes."""
-        if content is None:
-            try:
-                content = file_path.read_text(encoding="utf-8")
-            except Exception as e:
-                logger.error(f"Failed to read {file_path}: {e}")
-                return []
-        
+        nodes, entry = self._parse_cached(file_path, content)
+        if entry is not None:
+            self._cache_put([entry])
+        return nodes
+    
+    def _parse_cached(
+        self,
+        file_path: Path,
+        content: str | None = None,
+    ) -> tuple[list[ParsedNode], tuple[str, bytes, list[ParsedNode]] | None]:
+        """Parse a file unless its content is cached, returning any new cache entry."""
         config = get_language_config(file_path)
         if not config:
-            return []
+            return [], None
         
-        if not TREE_SITTER_AVAILABLE:
-            return self._fallback_parse(file_path, content, config)
+        try:
+            source = _read_source(file_path) if content is None else nullcontext(content.encode("utf-8"))
+            with source as raw:
+                return self._parse_source(file_path, raw, config)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read {file_path}: {e}")
+            return [], None
+    
+    def _parse_source(
+        self,
+        file_path: Path,
+        raw: bytes | mmap.mmap,
+        config: LanguageConfig,
+    ) -> tuple[list[ParsedNode], tuple[str, bytes, list[ParsedNode]] | None]:
+        if self._cache is None:
+            return self._parse_content(file_path, raw, config), None
+        
+        digest = self._digest(raw)
+        key = str(file_path)
+        try:
+            cached = self._cache.get(key, digest)
+        except (sqlite3.Error, OSError) as e:
+            self._disable_cache(e)
+            return self._parse_content(file_path, raw, config), None
+        except (pickle.UnpicklingError, zlib.error, AttributeError, EOFError):
+            cached = None  # Unreadable entry, parsed and replaced below
+        if cached is not None:
+            return cached, None
+        
+        nodes = self._parse_content(file_path, raw, config)
+        return nodes, (key, digest, nodes)
+    
+    def _digest(self, raw: bytes | mmap.mmap) -> bytes:
+        """Hash file bytes into a parse cache key."""
+        # Tree-sitter and fallback output differ, so the backend is hashed too
+        backend = b"tree-sitter" if self._parsers else b"fallback"
+        return content_digest(_PARSE_CACHE_VERSION, b"\0", backend, b"\0", raw)
+    
+    def _parse_content(
+        self,
+        file_path: Path,
+        source: bytes | mmap.mmap,
+        config: LanguageConfig,
+        old_tree: Any = None,
+        keep_tree: bool = False,
+    ) -> list[ParsedNode]:
+        """Parse UTF-8 file bytes with Tree-sitter or the fallback parser.
         
+        Tree-sitter reads the bytes as they are, so only the source of
+        extracted nodes is ever decoded. ``keep_tree`` holds on to the tree
+        for the next incremental re-parse of the file.
+        """
         parser = self._parsers.get(config.tree_sitter_name)
-        if not parser:
+        if not TREE_SITTER_AVAILABLE or not parser:
+            try:
+                content = source[:].decode("utf-8")
+            except UnicodeDecodeError as e:
+                logger.error(f"Failed to read {file_path}: {e}")
+                return []
             return self._fallback_parse(file_path, content, config)
         
         try:
-            tree = parser.parse(content.encode("utf-8"))
-            return self._extract_nodes(tree.root_node, file_path, content, config)
+            tree = parser.parse(source, old_tree) if old_tree is not None else parser.parse(source)
+            if keep_tree:
+                self._remember_tree(file_path, config.tree_sitter_name, tree)
+            return self._extract_nodes(tree.root_node, file_path, source, config)
         except Exception as e:
             logger.error(f"Failed to parse {file_path}: {e}")
             return []
     
+    def _tree_key(self, file_path: Path) -> str:
+        return str(Path(file_path).absolute())
+    
+    def _remember_tree(self, file_path: Path, language: str, tree: Any):
+        key = self._tree_key(file_path)
+        self._tree_cache[key] = (language, tree)
+        self._tree_cache.move_to_end(key)
+        while len(self._tree_cache) > settings.parse_tree_cache_size:
+            self._tree_cache.popitem(last=False)
+    
+    def invalidate(self, file_path: Path):
+        """Forget the cached tree of a file, e.g. when a watcher sees it replaced."""
+        self._tree_cache.pop(self._tree_key(file_path), None)
+    
+    def parse_file_incremental(
+        self,
+        file_path: Path,
+        new_content: str,
+        edits: list[TSEdit],
+    ) -> list[ParsedNode]:
+        """Re-parse a file after edits, reusing the unchanged parts of its last tree.
+        
+        Does a full parse when there is no tree for the file or it was parsed
+        as another language. Either way the new tree is kept for the next
+        call; bulk parsing never fills the tree cache.
+        """
+        config = get_language_config(file_path)
+        if not config:
+            return []
+        
+        cached = self._tree_cache.pop(self._tree_key(file_path), None)
+        old_tree = None
+        if cached is not None and cached[0] == config.tree_sitter_name:
+            old_tree = cached[1]
+            for edit in edits:
+                old_tree.edit(
+                    start_byte=edit.start_byte,
+                    old_end_byte=edit.old_end_byte,
+                    new_end_byte=edit.new_end_byte,
+                    start_point=edit.start_point,
+                    old_end_point=edit.old_end_point,
+                    new_end_point=edit.new_end_point,
+                )
+        
+        source = new_content.encode("utf-8")
+        nodes = self._parse_content(file_path, source, config, old_tree, keep_tree=True)
+        if self._cache is not None:
+            self._cache_put([(str(file_path), self._digest(source), nodes)])
+        return nodes
+    
+    def _cache_put(self, entries: list[tuple[str, bytes, list[ParsedNode]]]):
+        """Write parsed files to the cache in one transaction."""
+        if self._cache is None or not entries:
+            return
+        try:
+            self._cache.put_many(entries)
+        except (sqlite3.Error, OSError) as e:
+            self._disable_cache(e)
+    
+    def _disable_cache(self, error: Exception):
+        logger.warning(f"Parse cache unavailable, parsing without it: {error}")
+        self._cache = None
+    
     def _extract_nodes(
         self,
         root_node: Any,
         file_path: Path,
-        content: str,
+        source_bytes: bytes | mmap.mmap,
         config: LanguageConfig,
         parent_name: str | None = None,
     ) -> list[ParsedNode]:
-        """Extract relevant nodes from AST."""
+        """Extract relevant nodes from AST with the language's definition query."""
         nodes = []
-        lines = content.split("\n")
+        query = self._definition_queries.get(config.tree_sitter_name)
+        if query is None:
+            return nodes
         
-        def visit(node: Any, current_parent: str | None = None):
-            node_type = node.type
+        # Named classes enclosing the current capture, as (end_byte, qualified_name)
+        classes: list[tuple[int, str]] = []
+        
+        # Captures come in document order, tagged with the parsed node type
+        for node, parsed_type in query.captures(root_node):
+            while classes and classes[-1][0] <= node.start_byte:
+                classes.pop()
+            current_parent = classes[-1][1] if classes else parent_name
+            
+            # Extract name
+            name = self._get_node_name(node, config)
+            if not name:
+                continue
+            qualified_name = f"{current_parent}.{name}" if current_parent else name
             
-            # Check if this is a relevant node type
-            parsed_type = None
-            if node_type in config.function_types:
-                parsed_type = "function"
-            elif node_type in config.class_types:
-                parsed_type = "class"
-            elif node_type in config.import_types:
-                parsed_type = "import"
+            # Get source code: the full lines the node spans, sliced from the file bytes
+            start_line = node.start_point[0]
+            end_line = node.end_point[0]
+            line_start = source_bytes.rfind(b"\n", 0, node.start_byte) + 1
+            line_end = source_bytes.find(b"\n", node.end_byte)
+            source = source_bytes[line_start:line_end if line_end >= 0 else None].decode("utf-8")
             
-            if parsed_type:
-                # Extract name
-                name = self._get_node_name(node, config)
-                if name:
-                    qualified_name = f"{current_parent}.{name}" if current_parent else name
-                    
-                    # Get source code
-                    start_line = node.start_point[0]
-                    end_line = node.end_point[0]
-                    source = "\n".join(lines[start_line:end_line + 1])
-                    
-                    # Get signature and docstring
-                    signature = self._get_signature(node, parsed_type, source)
-                    docstring = self._get_docstring(node, config)
-                    
-                    parsed_node = ParsedNode(
-                        node_type=parsed_type,
-                        name=name,
-                        qualified_name=qualified_name,
-                        file_path=str(file_path),
-                        start_line=start_line + 1,  # 1-indexed
-                        end_line=end_line + 1,
-                        start_column=node.start_point[1],
-                        end_column=node.end_point[1],
-                        signature=signature,
-                        docstring=docstring,
-                        source_code=source,
-                        parent_name=current_parent,
-                    )
-                    nodes.append(parsed_node)
-                    
-                    # Use this as parent for nested definitions
-                    if parsed_type == "class":
-                        current_parent = qualified_name
+            # Get signature and docstring
+            signature = self._get_signature(node, parsed_type, source)
+            docstring = self._get_docstring(node, config, source_bytes)
             
-            # Visit children
-            for child in node.children:
-                visit(child, current_parent)
+            nodes.append(ParsedNode(
+                node_type=parsed_type,
+                name=name,
+                qualified_name=qualified_name,
+                file_path=str(file_path),
+                start_line=start_line + 1,  # 1-indexed
+                end_line=end_line + 1,
+                start_column=node.start_point[1],
+                end_column=node.end_point[1],
+                start_byte=node.start_byte,
+                end_byte=node.end_byte,
+                signature=signature,
+                docstring=docstring,
+                source_code=source,
+                parent_name=current_parent,
+            ))
+            
+            # Use this as parent for nested definitions
+            if parsed_type == "class":
+                classes.append((node.end_byte, qualified_name))
         
-        visit(root_node)
+        self._assign_calls(root_node, config, [n for n in nodes if n.node_type != "import"])
         return nodes
     
     def _get_node_name(self, node: Any, config: LanguageConfig) -> str | None:
         """Extract name from a node."""
         for child in node.children:
-            if child.type in ["identifier", "property_identifier", "name"]:
+            if child.type in _NAME_NODE_TYPES:
                 return child.text.decode("utf-8") if isinstance(child.text, bytes) else child.text
         return None
     
     def _get_signature(self, node: Any, node_type: str, source: str) -> str:
         """Extract function/class signature."""
         # Get first line as signature
-        first_line = source.split("\n")[0].strip()
-        return first_line
+        return source.partition("\n")[0].strip()
     
-    def _get_docstring(self, node: Any, config: LanguageConfig) -> str | None:
-        """Extract docstring if present."""
-        # Look for string literal as first statement in body
-        for child in node.children:
-            if child.type in ["block", "body", "statement_block"]:
-                for stmt in child.children:
-                    if stmt.type in ["expression_statement", "string"]:
-                        for sub in stmt.children if hasattr(stmt, 'children') else [stmt]:
-                            if sub.type == "string":
-                                text = sub.text.decode("utf-8") if isinstance(sub.text, bytes) else sub.text
-                                # Clean up quotes
-                                return text.strip('"""\'\'\'').strip()
-                break
-        return None
+    def _assign_calls(self, root_node: Any, config: LanguageConfig, definitions: list[ParsedNode]):
+        """Give each definition the distinct names called directly within it.
+        
+        The call query runs once over the whole tree. Definitions arrive in
+        document order and nest, so a stack of the open ones tracks the
+        innermost definition around each call site.
+        """
+        query = self._call_queries.get(config.tree_sitter_name)
+        if query is None or not definitions:
+            return
+        
+        calls: list[dict[str, None]] = [{} for _ in definitions]
+        open_defs: list[int] = []
+        next_def = 0
+        # Chained calls such as f().g() capture the outer callee first
+        callees = sorted((callee for callee, _ in query.captures(root_node)), key=lambda c: c.start_byte)
+        for callee in callees:
+            pos = callee.start_byte
+            while next_def < len(definitions) and definitions[next_def].start_byte <= pos:
+                start = definitions[next_def].start_byte
+                while open_defs and definitions[open_defs[-1]].end_byte <= start:
+                    open_defs.pop()
+                open_defs.append(next_def)
+                next_def += 1
+            while open_defs and definitions[open_defs[-1]].end_byte <= pos:
+                open_defs.pop()
+            if open_defs:
+                text = callee.text.decode("utf-8") if isinstance(callee.text, bytes) else callee.text
+                calls[open_defs[-1]][text] = None
+        
+        for definition, names in zip(definitions, calls):
+            definition.calls = list(names)
+    
+    def _get_docstring(self, node: Any, config: LanguageConfig, source_bytes: bytes | mmap.mmap) -> str | None:
+        """Extract the string literal opening a definition's body, if present."""
+        body = node.child_by_field_name(config.body_field)
+        if body is None or body.type not in _BLOCK_NODE_TYPES or not body.named_child_count:
+            return None
+        
+        # Only the first statement counts, ignoring comments before it
+        stmt = body.named_child(0)
+        while stmt is not None and stmt.type == "comment":
+            stmt = stmt.next_named_sibling
+        if stmt is None or stmt.type != "expression_statement" or not stmt.named_child_count:
+            return None
+        
+        literal = stmt.named_child(0)
+        if literal.type != "string":
+            return None
+        return _strip_quotes(source_bytes[literal.start_byte:literal.end_byte].decode("utf-8"))
     
     def _fallback_parse(
         self,
@@ -216,61 +431,163 @@ class TreeSitterParser:
         config: LanguageConfig
     ) -> list[ParsedNode]:
         """Simple regex-based fallback parser for when Tree-sitter isn't available."""
-        import re
         nodes = []
-        lines = content.split("\n")
         
         # Simple patterns for Python
         if config.name == "python":
-            patterns = {
-                "function": r"^\s*(async\s+)?def\s+(\w+)\s*\(",
-                "class": r"^\s*class\s+(\w+)",
-                "import": r"^(?:from\s+\S+\s+)?import\s+",
-            }
-            
-            for i, line in enumerate(lines):
-                for node_type, pattern in patterns.items():
-                    match = re.match(pattern, line)
-                    if match:
-                        if node_type == "function":
-                            name = match.group(2)
-                        elif node_type == "class":
-                            name = match.group(1)
-                        else:
-                            name = line.strip()
-                        
-                        nodes.append(ParsedNode(
-                            node_type=node_type,
-                            name=name,
-                            qualified_name=name,
-                            file_path=str(file_path),
-                            start_line=i + 1,
-                            end_line=i + 1,
-                            start_column=0,
-                            end_column=len(line),
-                            signature=line.strip(),
-                        ))
+            for i, line in enumerate(content.split("\n")):
+                match = _PY_FALLBACK_RE.match(line)
+                if not match:
+                    continue
+                
+                if match["function"]:
+                    node_type, name = "function", match["function"]
+                elif match["class"]:
+                    node_type, name = "class", match["class"]
+                else:
+                    node_type, name = "import", line.strip()
+                
+                nodes.append(ParsedNode(
+                    node_type=node_type,
+                    name=name,
+                    qualified_name=name,
+                    file_path=str(file_path),
+                    start_line=i + 1,
+                    end_line=i + 1,
+                    start_column=0,
+                    end_column=len(line),
+                    signature=line.strip(),
+                ))
         
         return nodes
     
-    def parse_directory(
+    def iter_files(
         self,
         directory: Path,
         recursive: bool = True
-    ) -> Generator[ParsedNode, None, None]:
-        """Parse all supported files in a directory."""
+    ) -> Generator[Path, None, None]:
+        """Yield all supported, non-ignored files in a directory."""
         if not directory.is_dir():
             return
         
-        for item in directory.iterdir():
-            if should_ignore(item):
-                continue
-            
-            if item.is_file() and is_supported_file(item):
-                for node in self.parse_file(item):
-                    yield node
-            elif item.is_dir() and recursive:
-                yield from self.parse_directory(item, recursive=True)
+        # Open directory scans, innermost last, so files come out in walk order
+        scans = [os.scandir(directory)]
+        try:
+            while scans:
+                entry = next(scans[-1], None)
+                if entry is None:
+                    scans.pop().close()
+                    continue
+                
+                if should_ignore_name(entry.name):
+                    continue
+                
+                if entry.is_file() and is_supported_ext(entry.name):
+                    yield Path(entry.path)
+                elif recursive and entry.is_dir():
+                    scans.append(os.scandir(entry.path))
+        finally:
+            for scan in scans:
+                scan.close()
+    
+    def parse_files(self, files: list[Path]) -> Generator[list[ParsedNode], None, None]:
+        """Parse files in order, across processes when there are enough of them.
+        
+        Pool workers only read the parse cache and hand their new entries
+        back, so every cache write happens here, in batches.
+        """
+        pending = []
+        try:
+            for nodes, entry in self._parse_entries(files):
+                if entry is not None:
+                    pending.append(entry)
+                    if len(pending) >= _CACHE_WRITE_BATCH:
+                        self._cache_put(pending)
+                        pending = []
+                yield nodes
+        finally:
+            self._cache_put(pending)
+    
+    def _parse_entries(
+        self,
+        files: list[Path],
+    ) -> Generator[tuple[list[ParsedNode], tuple[str, bytes, list[ParsedNode]] | None], None, None]:
+        """Parse files in order, yielding each one's nodes and any new cache entry."""
+        done = 0
+        workers = min(settings.parse_workers or os.cpu_count() or 1, len(files))
+        
+        if workers > 1 and len(files) >= settings.parse_parallel_min_files:
+            executor = None
+            try:
+                executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker_parser)
+                for result in executor.map(parse_file_in_worker, files, chunksize=16):
+                    yield result
+                    done += 1
+                return
+            except (AssertionError, OSError, BrokenProcessPool) as e:
+                # e.g. daemonic Celery workers may not start child processes
+                logger.warning(f"Parallel parsing unavailable, parsing serially: {e}")
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+        
+        for path in files[done:]:
+            yield self._parse_cached(path)
+    
+    def parse_directory(
+        self,
+        directory: Path,
+        recursive: bool = True
+    ) -> Generator[ParsedNode, None, None]:
+        """Parse all supported files in a directory."""
+        for nodes in self.parse_files(list(self.iter_files(directory, recursive))):
+            yield from nodes
+
+
+def _strip_quotes(literal: str) -> str:
+    """Get the text of a string literal without its prefix and quotes."""
+    text = literal.lstrip("rRuUbBfF")
+    for quote in ('"""', "'''", '"', "'", "`"):
+        if text.startswith(quote) and text.endswith(quote) and len(text) >= 2 * len(quote):
+            text = text[len(quote):-len(quote)]
+            break
+    return text.strip()
+
+
+def _read_source(file_path: Path) -> ContextManager[bytes | mmap.mmap]:
+    """Open a file's bytes, memory-mapped when it is large enough to pay off."""
+    # Keep line endings as-is so byte offsets match the file
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_MIN_BYTES:
+            return nullcontext(f.read())
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _definition_query(language: Any, config: LanguageConfig) -> str:
+    """Build a query capturing every definition node as @function, @class or @import."""
+    return "\n".join(
+        f"({node_type}) @{parsed_type}"
+        for node_type, parsed_type in config.type_map.items()
+        # Configs list some types not every grammar version has
+        if language.id_for_node_kind(node_type, True) is not None
+    )
+
+
+# Per-process parser for pool workers
+_worker_parser: TreeSitterParser | None = None
+
+
+def init_worker_parser():
+    """Process pool initializer giving each worker its own parser."""
+    global _worker_parser
+    _worker_parser = TreeSitterParser()
+
+
+def parse_file_in_worker(
+    file_path: Path,
+) -> tuple[list[ParsedNode], tuple[str, bytes, list[ParsedNode]] | None]:
+    """Parse a file with the worker's parser, returning any new cache entry unwritten."""
+    return _worker_parser._parse_cached(file_path)
 
 
 # Singleton parser instance
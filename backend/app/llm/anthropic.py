@@ -1,6 +1,7 @@
 """
 CodeGraph Backend - Anthropic LLM Provider
 """
+from functools import lru_cache
 from typing import AsyncGenerator
 import logging
 
@@ -16,12 +17,24 @@ from app.llm.base import (
     MessageRole,
     LLMResponse,
     StreamChunk,
+    coalesce_deltas,
 )
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _claude_tokenizer():
+    """Load the tokenizer bundled with the anthropic SDK, or None if unavailable."""
+    try:
+        # Loading it is local, but only exposed through a client instance
+        return anthropic.Anthropic(api_key="unused").get_tokenizer()
+    except Exception as e:
+        logger.warning(f"Anthropic tokenizer unavailable, estimating token counts: {e}")
+        return None
+
+
 class AnthropicProvider(BaseLLMProvider):
     """Anthropic Claude LLM provider."""
     
@@ -38,8 +51,9 @@ class AnthropicProvider(BaseLLMProvider):
         
         if not ANTHROPIC_AVAILABLE:
             raise RuntimeError("anthropic package not installed")
-        
-        self._client = anthropic.AsyncAnthropic(api_key=self.api_key)
+    
+    def _create_client(self, http_client):
+        return anthropic.AsyncAnthropic(api_key=self.api_key, http_client=http_client)
     
     @property
     def default_model(self) -> str:
@@ -61,16 +75,20 @@ class AnthropicProvider(BaseLLMProvider):
         formatted = []
         
         for msg in messages:
-            if msg.role == MessageRole.SYSTEM:
+            if msg.role is MessageRole.SYSTEM:
                 system_message = msg.content
             else:
-                formatted.append({
-                    "role": msg.role.value,
-                    "content": msg.content,
-                })
+                formatted.append(msg.as_dict)
         
         return system_message, formatted
     
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the SDK's bundled tokenizer, falling back to the length estimate."""
+        tokenizer = _claude_tokenizer()
+        if tokenizer is None:
+            return super().count_tokens(text)
+        return len(tokenizer.encode(text).ids)
+    
     async def generate(
         self,
         prompt: str,
@@ -125,9 +143,10 @@ class AnthropicProvider(BaseLLMProvider):
         messages: list[Message],
         max_tokens: int = 2000,
         temperature: float = 0.7,
+        batch_ms: float | None = None,
         **kwargs
     ) -> AsyncGenerator[StreamChunk, None]:
-        """Stream a chat completion."""
+        """Stream a chat completion, merging deltas that arrive within batch_ms."""
         system_message, formatted = self.format_messages(messages)
         
         create_kwargs = {
@@ -141,7 +160,7 @@ class AnthropicProvider(BaseLLMProvider):
             create_kwargs["system"] = system_message
         
         async with self._client.messages.stream(**create_kwargs) as stream:
-            async for text in stream.text_stream:
+            async for text in coalesce_deltas(stream.text_stream, batch_ms):
                 yield StreamChunk(content=text, is_final=False)
         
         yield StreamChunk(content="", is_final=True)
@@ -2,9 +2,32 @@
 CodeGraph Backend - Abstract LLM Provider Base
 """
 from abc import ABC, abstractmethod
+import asyncio
 from dataclasses import dataclass, field
-from typing import AsyncGenerator, Any
+from functools import lru_cache
+from typing import AsyncGenerator, AsyncIterator, Any
 from enum import Enum
+from weakref import WeakKeyDictionary
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 (lets httpx speak HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+from app.config import settings
 
 
 class MessageRole(str, Enum):
@@ -15,13 +38,25 @@ class MessageRole(str, Enum):
     TOOL = "tool"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Message:
     """A chat message."""
     role: MessageRole
     content: str
     name: str | None = None
     tool_call_id: str | None = None
+    _dict: dict[str, str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Accept plain role strings such as "user"
+        if not isinstance(self.role, MessageRole):
+            object.__setattr__(self, "role", MessageRole(self.role))
+        object.__setattr__(self, "_dict", {"role": self.role.value, "content": self.content})
+    
+    @property
+    def as_dict(self) -> dict[str, str]:
+        """The message as a provider API dict, built once; callers must not modify it."""
+        return self._dict
 
 
 @dataclass
@@ -55,6 +90,20 @@ class BaseLLMProvider(ABC):
         self.api_key = api_key
         self.model = model or self.default_model
         self.kwargs = kwargs
+        self._clients: WeakKeyDictionary[asyncio.AbstractEventLoop, Any] = WeakKeyDictionary()
+    
+    @property
+    def _client(self) -> Any:
+        """The provider SDK client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = self._create_client(get_http_client())
+        return client
+    
+    def _create_client(self, http_client: "httpx.AsyncClient") -> Any:
+        """Create the provider SDK client on top of a pooled HTTP client."""
+        raise NotImplementedError
     
     @property
     @abstractmethod
@@ -95,18 +144,20 @@ class BaseLLMProvider(ABC):
         messages: list[Message],
         max_tokens: int = 2000,
         temperature: float = 0.7,
+        batch_ms: float | None = None,
         **kwargs
     ) -> AsyncGenerator[StreamChunk, None]:
-        """Stream a chat completion. Default implementation calls chat and yields full response."""
+        """Stream a chat completion. Default implementation calls chat and yields full response.
+        
+        Providers that stream merge deltas arriving within ``batch_ms``
+        (default ``settings.llm_stream_batch_ms``, 0 = every delta).
+        """
         response = await self.chat(messages, max_tokens, temperature, **kwargs)
         yield StreamChunk(content=response.content, is_final=True)
     
     def format_messages(self, messages: list[Message]) -> list[dict]:
         """Format messages for the provider's API."""
-        return [
-            {"role": msg.role.value, "content": msg.content}
-            for msg in messages
-        ]
+        return [msg.as_dict for msg in messages]
     
     def count_tokens(self, text: str) -> int:
         """Estimate token count. Override for accurate counting."""
@@ -115,3 +166,103 @@ class BaseLLMProvider(ABC):
     
     def __repr__(self):
         return f"{self.__class__.__name__}(model={self.model})"
+
+
+# HTTP clients shared by all provider SDK clients, one per event loop since
+# pooled connections cannot move between loops
+_http_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = WeakKeyDictionary()
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Get the running loop's pooled HTTP client, so every provider reuses the same TLS connections."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None:
+        # Pool and protocol settings live on the transport, which also retries failed connects
+        client = _http_clients[loop] = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                retries=1,
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_keepalive_connections,
+                ),
+            ),
+        )
+    return client
+
+
+async def close_http_client():
+    """Close the running loop's HTTP client and its pooled connections, if it has one."""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+@lru_cache(maxsize=16)
+def get_tiktoken_encoding(model: str | None = None) -> "tiktoken.Encoding | None":
+    """Get the tiktoken encoding of an OpenAI model, cl100k_base for other models."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+# Buffered stream text flushed early once it reaches this many characters
+_STREAM_FLUSH_CHARS = 256
+
+_STREAM_END = object()
+
+
+async def _next_delta(deltas: AsyncIterator[str]):
+    try:
+        return await anext(deltas)
+    except StopAsyncIteration:
+        return _STREAM_END
+
+
+async def coalesce_deltas(
+    deltas: AsyncIterator[str],
+    batch_ms: float | None = None,
+) -> AsyncGenerator[str, None]:
+    """Merge stream deltas that arrive within batch_ms of the first buffered one."""
+    if batch_ms is None:
+        batch_ms = settings.llm_stream_batch_ms
+    if batch_ms <= 0:
+        async for delta in deltas:
+            yield delta
+        return
+    
+    loop = asyncio.get_running_loop()
+    buffer: list[str] = []
+    size = 0
+    deadline = None
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(_next_delta(deltas))
+            timeout = None if deadline is None else max(deadline - loop.time(), 0)
+            done, _ = await asyncio.wait((pending,), timeout=timeout)
+            
+            if done:
+                delta, pending = pending.result(), None
+                if delta is _STREAM_END:
+                    break
+                buffer.append(delta)
+                size += len(delta)
+                if deadline is None:
+                    deadline = loop.time() + batch_ms / 1000
+            
+            # Flush on the deadline even if no further delta has arrived
+            if buffer and (size >= _STREAM_FLUSH_CHARS or loop.time() >= deadline):
+                yield "".join(buffer)
+                buffer, size, deadline = [], 0, None
+        
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
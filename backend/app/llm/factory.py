@@ -1,6 +1,8 @@
 """
 CodeGraph Backend - LLM Provider Factory
 """
+from functools import cache, lru_cache
+
 from app.llm.base import BaseLLMProvider
 from app.config import settings
 
@@ -10,21 +12,40 @@ def get_provider(
     model: str | None = None,
     **kwargs
 ) -> BaseLLMProvider:
-    """Factory function to get an LLM provider instance."""
-    
+    """Factory function to get an LLM provider instance, reused per configuration."""
     provider_name = provider_name or settings.default_llm_provider
-    
+    options = tuple(sorted(kwargs.items()))
+    try:
+        hash(options)
+    except TypeError:
+        # Unhashable options (e.g. a headers dict) cannot key the cache
+        return _provider_cls(provider_name)(model=model, **kwargs)
+    return _create_provider(provider_name, model, options)
+
+
+@lru_cache(maxsize=32)
+def _create_provider(
+    provider_name: str,
+    model: str | None,
+    options: tuple[tuple[str, object], ...],
+) -> BaseLLMProvider:
+    return _provider_cls(provider_name)(model=model, **dict(options))
+
+
+@cache
+def _provider_cls(provider_name: str) -> type[BaseLLMProvider]:
+    """Import a provider class once; its SDK is only loaded on first use."""
     if provider_name == "openai":
         from app.llm.openai import OpenAIProvider
-        return OpenAIProvider(model=model, **kwargs)
+        return OpenAIProvider
     
     elif provider_name == "anthropic":
         from app.llm.anthropic import AnthropicProvider
-        return AnthropicProvider(model=model, **kwargs)
+        return AnthropicProvider
     
     elif provider_name == "groq":
         from app.llm.groq import GroqProvider
-        return GroqProvider(model=model, **kwargs)
+        return GroqProvider
     
     else:
         raise ValueError(f"Unknown provider: {provider_name}")
@@ -32,7 +53,7 @@ def get_provider(
 
 def list_providers() -> list[str]:
     """List available LLM providers based on configured API keys."""
-    return settings.get_available_providers()
+    return list(settings.available_providers)
 
 
 def get_default_provider() -> BaseLLMProvider:
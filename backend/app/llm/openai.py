@@ -15,6 +15,8 @@ from app.llm.base import (
     Message,
     LLMResponse,
     StreamChunk,
+    coalesce_deltas,
+    get_tiktoken_encoding,
 )
 from app.config import settings
 
@@ -37,8 +39,9 @@ class OpenAIProvider(BaseLLMProvider):
         
         if not OPENAI_AVAILABLE:
             raise RuntimeError("openai package not installed")
-        
-        self._client = AsyncOpenAI(api_key=self.api_key)
+    
+    def _create_client(self, http_client):
+        return AsyncOpenAI(api_key=self.api_key, http_client=http_client)
     
     @property
     def default_model(self) -> str:
@@ -55,6 +58,13 @@ class OpenAIProvider(BaseLLMProvider):
             "gpt-3.5-turbo-16k",
         ]
     
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with tiktoken, falling back to the length estimate."""
+        encoding = get_tiktoken_encoding(self.model)
+        if encoding is None:
+            return super().count_tokens(text)
+        return len(encoding.encode(text, disallowed_special=()))
+    
     async def generate(
         self,
         prompt: str,
@@ -103,9 +113,10 @@ class OpenAIProvider(BaseLLMProvider):
         messages: list[Message],
         max_tokens: int = 2000,
         temperature: float = 0.7,
+        batch_ms: float | None = None,
         **kwargs
     ) -> AsyncGenerator[StreamChunk, None]:
-        """Stream a chat completion."""
+        """Stream a chat completion, merging deltas that arrive within batch_ms."""
         formatted = self.format_messages(messages)
         
         stream = await self._client.chat.completions.create(
@@ -117,9 +128,12 @@ class OpenAIProvider(BaseLLMProvider):
             **kwargs
         )
         
-        async for chunk in stream:
-            if chunk.choices and chunk.choices[0].delta.content:
-                yield StreamChunk(
-                    content=chunk.choices[0].delta.content,
-                    is_final=chunk.choices[0].finish_reason is not None,
-                )
+        deltas = (
+            chunk.choices[0].delta.content
+            async for chunk in stream
+            if chunk.choices and chunk.choices[0].delta.content
+        )
+        async for content in coalesce_deltas(deltas, batch_ms):
+            yield StreamChunk(content=content, is_final=False)
+        
+        yield StreamChunk(content="", is_final=True)
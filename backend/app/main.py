@@ -4,9 +4,19 @@ CodeGraph Backend - FastAPI Application Entry Point
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+try:
+    import orjson  # noqa: F401 - required by ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from app.config import settings
 from app.api.routes import health, repositories, queries, graph
+from app.core.embeddings.encoder import get_encoder
+from app.core.embeddings.vectorstore import get_vectorstore
+from app.llm.base import close_http_client
 
 
 @asynccontextmanager
@@ -14,10 +24,25 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager for startup/shutdown events."""
     # Startup
     print(f"Starting {settings.app_name}")
-    print(f"Available LLM providers: {settings.get_available_providers()}")
+    print(f"Available LLM providers: {list(settings.available_providers)}")
+    
+    # Load the embedding model now rather than on the first query
+    try:
+        get_encoder().warmup()
+        print(f"Embedding model ready: {settings.embedding_model}")
+    except Exception as e:
+        print(f"Embedding model not loaded: {e}")
+    
+    # Open the vector store so indexing and queries share one client
+    try:
+        get_vectorstore().client
+    except Exception as e:
+        print(f"Vector store not opened: {e}")
+    
     yield
     # Shutdown
     print(f"Shutting down {settings.app_name}")
+    await close_http_client()
 
 
 app = FastAPI(
@@ -25,6 +50,8 @@ app = FastAPI(
     description="AI-powered code understanding system with graph-based navigation",
     version="0.1.0",
     lifespan=lifespan,
+    # Rust-backed encoding for every route that does not build its own body
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse,
 )
 
 # CORS middleware
@@ -17,7 +17,13 @@ from app.models.schemas import (
     GraphEdge,
     GraphData,
     GraphQuery,
+    GraphBatchQuery,
     WSMessage,
+    from_orm_trusted,
+    REPO_LIST_ADAPTER,
+    GRAPH_DATA_LIST_ADAPTER,
+    GRAPH_NODE_LIST_ADAPTER,
+    GRAPH_EDGE_LIST_ADAPTER,
 )
 
 __all__ = [
@@ -42,5 +48,12 @@ __all__ = [
     "GraphEdge",
     "GraphData",
     "GraphQuery",
+    "GraphBatchQuery",
     "WSMessage",
+    # Helpers
+    "from_orm_trusted",
+    "REPO_LIST_ADAPTER",
+    "GRAPH_DATA_LIST_ADAPTER",
+    "GRAPH_NODE_LIST_ADAPTER",
+    "GRAPH_EDGE_LIST_ADAPTER",
 ]
@@ -0,0 +1,138 @@
+"""
+CodeGraph Backend - msgspec Response Schemas
+
+Mirrors of the large list responses in schemas.py, encoded with msgspec
+instead of Pydantic. The Pydantic models stay the documented response
+models for OpenAPI; these are only used to build and encode the body.
+"""
+from datetime import datetime
+from typing import Any, Callable, Iterator
+import json
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+from app.models.schemas import (
+    EdgeType,
+    NodeType,
+    RepositoryStatus,
+    GRAPH_EDGE_LIST_ADAPTER,
+    GRAPH_NODE_LIST_ADAPTER,
+)
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+if MSGSPEC_AVAILABLE:
+    _encoder = msgspec.json.Encoder()
+    _EMPTY_OBJECT = msgspec.Raw(b"{}")
+    
+    
+    def raw_json(value: dict[str, Any] | None) -> msgspec.Raw:
+        """Encode metadata once so responses splice it in without walking it again."""
+        return msgspec.Raw(_encoder.encode(value)) if value else _EMPTY_OBJECT
+    
+    
+    class GraphNodeMsg(msgspec.Struct, gc=False, frozen=True):
+        """msgspec mirror of GraphNode."""
+        id: str
+        type: NodeType
+        name: str
+        file_path: str
+        start_line: int
+        end_line: int
+        signature: str | None = None
+        docstring: str | None = None
+        metadata: msgspec.Raw = _EMPTY_OBJECT
+
+
+    class GraphEdgeMsg(msgspec.Struct, gc=False, frozen=True):
+        """msgspec mirror of GraphEdge."""
+        source: str
+        target: str
+        type: EdgeType
+        metadata: msgspec.Raw = _EMPTY_OBJECT
+
+
+    class GraphDataMsg(msgspec.Struct, gc=False, frozen=True):
+        """msgspec mirror of GraphData."""
+        nodes: list[GraphNodeMsg]
+        edges: list[GraphEdgeMsg]
+        stats: dict[str, int] = {}
+
+
+    class RepositoryMsg(msgspec.Struct, gc=False, frozen=True):
+        """msgspec mirror of RepositoryResponse."""
+        id: str
+        url: str
+        name: str
+        branch: str
+        status: RepositoryStatus
+        created_at: datetime
+        file_count: int | None = None
+        node_count: int | None = None
+        indexed_at: datetime | None = None
+        error_message: str | None = None
+
+
+    class RepositoryListMsg(msgspec.Struct, gc=False, frozen=True):
+        """msgspec mirror of RepositoryList."""
+        repositories: list[RepositoryMsg]
+        total: int
+
+
+def encode_json(obj: Any, adapter: TypeAdapter | None = None) -> bytes:
+    """Encode a response body built from the structs above.
+    
+    Without msgspec the body is a Pydantic model, or a list dumped through
+    ``adapter``, and is serialized by pydantic-core directly instead of
+    FastAPI's dump-validate-serialize round trip.
+    """
+    if MSGSPEC_AVAILABLE:
+        return _encoder.encode(obj)
+    if adapter is not None:
+        return adapter.dump_json(obj)
+    return obj.model_dump_json().encode()
+
+
+def json_response(obj: Any, adapter: TypeAdapter | None = None) -> Response:
+    """Wrap a response body, encoded with ``encode_json``, in a JSON Response."""
+    return Response(content=encode_json(obj, adapter), media_type="application/json")
+
+
+def stream_graph_response(data: Any, chunk_size: int = 1024) -> StreamingResponse:
+    """Stream a GraphData body, encoding ``chunk_size`` nodes or edges at a time.
+    
+    The first bytes go out before the whole graph is encoded, and only one
+    chunk's JSON is held in memory at once.
+    """
+    if MSGSPEC_AVAILABLE:
+        encode_nodes = encode_edges = _encoder.encode
+    else:
+        encode_nodes = GRAPH_NODE_LIST_ADAPTER.dump_json
+        encode_edges = GRAPH_EDGE_LIST_ADAPTER.dump_json
+    
+    def body() -> Iterator[bytes]:
+        yield b'{"nodes":'
+        yield from _iter_array(data.nodes, encode_nodes, chunk_size)
+        yield b',"edges":'
+        yield from _iter_array(data.edges, encode_edges, chunk_size)
+        yield b',"stats":' + json.dumps(data.stats, separators=(",", ":")).encode() + b"}"
+    
+    # Starlette runs a sync iterator on its thread pool, off the event loop
+    return StreamingResponse(body(), media_type="application/json")
+
+
+def _iter_array(items: list, encode: Callable[[list], bytes], chunk_size: int) -> Iterator[bytes]:
+    """Yield a JSON array of ``items`` piece by piece."""
+    yield b"["
+    for start in range(0, len(items), chunk_size):
+        # Each encoded slice is itself an array; drop its brackets
+        chunk = encode(items[start:start + chunk_size])[1:-1]
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]"
@@ -3,8 +3,14 @@ CodeGraph Backend - Pydantic Schemas for API
 """
 from datetime import datetime
 from enum import Enum
-from typing import Any
-from pydantic import BaseModel, Field, HttpUrl
+from typing import Any, TypeVar
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, TypeAdapter
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Small, frequently built models that are never changed after construction;
+# nesting an instance in another model reuses it instead of re-validating it
+_STATIC_MODEL_CONFIG = ConfigDict(frozen=True, revalidate_instances="never")
 
 
 # =============================================================================
@@ -104,6 +110,8 @@ class Citation(BaseModel):
     content: str = Field(..., description="Code content")
     node_type: NodeType | None = None
     node_name: str | None = None
+    
+    model_config = _STATIC_MODEL_CONFIG
 
 
 class ReasoningStep(BaseModel):
@@ -112,6 +120,8 @@ class ReasoningStep(BaseModel):
     action: str = Field(..., description="What the agent did")
     node_visited: str | None = None
     observation: str | None = None
+    
+    model_config = _STATIC_MODEL_CONFIG
 
 
 class QueryResponse(BaseModel):
@@ -139,6 +149,8 @@ class GraphNode(BaseModel):
     signature: str | None = None
     docstring: str | None = None
     metadata: dict[str, Any] = Field(default_factory=dict)
+    
+    model_config = _STATIC_MODEL_CONFIG
 
 
 class GraphEdge(BaseModel):
@@ -147,6 +159,8 @@ class GraphEdge(BaseModel):
     target: str
     type: EdgeType
     metadata: dict[str, Any] = Field(default_factory=dict)
+    
+    model_config = _STATIC_MODEL_CONFIG
 
 
 class GraphData(BaseModel):
@@ -163,6 +177,31 @@ class GraphQuery(BaseModel):
     node_types: list[NodeType] | None = None
     edge_types: list[EdgeType] | None = None
     max_depth: int = Field(default=3, ge=1, le=10)
+    max_nodes: int = Field(default=500, ge=1, description="Stop traversal after this many nodes")
+
+
+class GraphBatchQuery(BaseModel):
+    """Several BFS traversals over one repository graph."""
+    start_nodes: list[str] = Field(..., min_length=1, max_length=256)
+    max_depth: int = Field(default=1, ge=1, le=10)
+    max_nodes: int = Field(default=500, ge=1, description="Stop each traversal after this many nodes")
+
+
+# =============================================================================
+# Trusted Conversions
+# =============================================================================
+
+def from_orm_trusted(cls: type[ModelT], obj: Any) -> ModelT:
+    """Build a response model from a row or dict this service produced, skipping validation.
+    
+    Trust boundary: data is validated when it enters the service (e.g. as
+    RepositoryCreate or QueryRequest), so re-validating it on the way out
+    only costs time. Never use this for request input.
+    """
+    data = obj if isinstance(obj, dict) else {
+        key: value for key, value in vars(obj).items() if key != "_sa_instance_state"
+    }
+    return cls.model_construct(**data)
 
 
 # =============================================================================
@@ -173,3 +212,14 @@ class WSMessage(BaseModel):
     """WebSocket message format."""
     type: str  # "progress", "result", "error"
     data: dict[str, Any]
+
+
+# =============================================================================
+# Cached Adapters
+# =============================================================================
+
+# Built once at import; constructing a TypeAdapter per call rebuilds its core schema
+REPO_LIST_ADAPTER = TypeAdapter(list[RepositoryResponse])
+GRAPH_DATA_LIST_ADAPTER = TypeAdapter(list[GraphData])
+GRAPH_NODE_LIST_ADAPTER = TypeAdapter(list[GraphNode])
+GRAPH_EDGE_LIST_ADAPTER = TypeAdapter(list[GraphEdge])
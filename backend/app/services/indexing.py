@@ -2,8 +2,10 @@
 CodeGraph Backend - Indexing Service
 """
 from pathlib import Path
+import asyncio
 import logging
 
+from app.config import settings
 from app.core.parsing.tree_sitter import get_parser
 from app.core.graph.builder import get_graph_builder
 from app.core.embeddings.vectorstore import get_vectorstore
@@ -11,6 +13,8 @@ from app.core.embeddings.encoder import get_encoder
 
 logger = logging.getLogger(__name__)
 
+_EMBEDDED_TYPES = frozenset({"function", "method", "class"})
+
 
 class IndexingService:
     """Service for indexing repositories into graphs and vector stores."""
@@ -32,24 +36,20 @@ class IndexingService:
         # Build the code graph
         graph = self.graph_builder.build_graph(repo_id, local_path)
         
-        # Count files and nodes
-        file_count = len(set(
-            data.get("data", {}).get("file_path", "")
-            for _, data in graph.nodes(data=True)
-            if data.get("data", {}).get("type") == "module"
-        ))
+        # One pass over the nodes feeds both the file count and the embeddings
+        module_files, documents, ids, metadatas = self._scan_nodes(graph)
         
         node_count = graph.number_of_nodes()
         edge_count = graph.number_of_edges()
         
         # Optionally build vector embeddings
         try:
-            await self._build_embeddings(repo_id, graph)
+            await self._build_embeddings(repo_id, documents, ids, metadatas)
         except Exception as e:
             logger.warning(f"Could not build embeddings: {e}")
         
         stats = {
-            "file_count": file_count,
+            "file_count": len(module_files),
             "node_count": node_count,
             "edge_count": edge_count,
         }
@@ -57,8 +57,56 @@ class IndexingService:
         logger.info(f"Indexed {repo_id}: {stats}")
         return stats
     
-    async def _build_embeddings(self, repo_id: str, graph):
+    def _scan_nodes(self, graph) -> tuple[set[str], list[str], list[str], list[dict]]:
+        """Collect module file paths and embedding documents, ids and metadata in one pass."""
+        module_files: set[str] = set()
+        documents: list[str] = []
+        metadatas: list[dict] = []
+        ids: list[str] = []
+        add_file = module_files.add
+        add_document, add_metadata, add_id = documents.append, metadatas.append, ids.append
+        embedded_types = _EMBEDDED_TYPES
+        
+        for node_id, attrs in graph.nodes(data=True):
+            get = attrs.get("data", {}).get
+            node_type = get("type")
+            if node_type == "module":
+                add_file(get("file_path", ""))
+                continue
+            
+            # Only functions, methods and classes are embedded
+            if node_type not in embedded_types:
+                continue
+            
+            name = get("name", "")
+            doc_text = f"{name}\n{get('signature', '')}\n{get('docstring', '')}"
+            if not doc_text.strip():
+                continue
+            
+            add_document(doc_text)
+            add_id(node_id)
+            add_metadata({
+                "node_id": node_id,
+                "type": node_type,
+                "name": name,
+                "file_path": get("file_path", ""),
+                "start_line": get("start_line", 0),
+                "end_line": get("end_line", 0),
+            })
+        
+        return module_files, documents, ids, metadatas
+    
+    async def _build_embeddings(
+        self,
+        repo_id: str,
+        documents: list[str],
+        ids: list[str],
+        metadatas: list[dict],
+    ):
         """Build vector embeddings for code nodes."""
+        if not documents:
+            return
+        
         try:
             vectorstore = get_vectorstore()
             encoder = get_encoder()
@@ -66,43 +114,28 @@ class IndexingService:
             logger.info(f"Skipping embeddings: {e}")
             return
         
-        documents = []
-        embeddings = []
-        metadatas = []
-        ids = []
-        
-        for node_id, attrs in graph.nodes(data=True):
-            data = attrs.get("data", {})
-            
-            # Skip modules, focus on functions and classes
-            if data.get("type") in ["function", "method", "class"]:
-                # Create document text
-                doc_text = f"{data.get('name', '')}\n{data.get('signature', '')}\n{data.get('docstring', '')}"
-                
-                if doc_text.strip():
-                    documents.append(doc_text)
-                    ids.append(node_id)
-                    metadatas.append({
-                        "node_id": node_id,
-                        "type": data.get("type", ""),
-                        "name": data.get("name", ""),
-                        "file_path": data.get("file_path", ""),
-                        "start_line": data.get("start_line", 0),
-                        "end_line": data.get("end_line", 0),
-                    })
-        
-        if documents:
-            # Batch encode
-            logger.info(f"Encoding {len(documents)} documents...")
-            embeddings = encoder.encode(documents, show_progress=True)
-            
-            # Store in vector database
-            vectorstore.add_documents(
+        # Encode and store off the event loop, one chunk at a time; each chunk
+        # is encoded while the previous one is written to the vector database
+        total = len(documents)
+        logger.info(f"Encoding {total} documents...")
+        chunk_size = settings.embedding_chunk_size or (
+            settings.chroma_batch_size * settings.chroma_write_concurrency
+        )
+        pending_write = None
+        for start in range(0, total, chunk_size):
+            end = min(start + chunk_size, total)
+            embeddings = await asyncio.to_thread(encoder.encode_cached, documents[start:end])
+            if pending_write is not None:
+                await pending_write
+            pending_write = asyncio.create_task(asyncio.to_thread(
+                vectorstore.add_documents,
                 repo_id=repo_id,
-                documents=documents,
+                documents=documents[start:end],
                 embeddings=embeddings,
-                metadatas=metadatas,
-                ids=ids,
-            )
-            
-            logger.info(f"Stored {len(documents)} embeddings for {repo_id}")
+                metadatas=metadatas[start:end],
+                ids=ids[start:end],
+            ))
+            logger.info(f"Encoded {end}/{total} documents for {repo_id}")
+        await pending_write
+        
+        logger.info(f"Stored {total} embeddings for {repo_id}")
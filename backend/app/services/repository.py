@@ -3,6 +3,7 @@ CodeGraph Backend - Repository Service
 """
 from pathlib import Path
 import logging
+import os
 import shutil
 import asyncio
 
@@ -13,9 +14,33 @@ except ImportError:
     GIT_AVAILABLE = False
 
 from app.config import settings
+from app.core.parsing.languages import LANGUAGE_CONFIGS
 
 logger = logging.getLogger(__name__)
 
+# Directory names never worth walking into; hidden ones (.git, .venv,
+# .tox, ...) are skipped separately by their leading dot
+_SKIP_DIRS = frozenset({"node_modules", "__pycache__", "venv", "dist", "build"})
+
+
+async def _git(*args: str):
+    """Run a git command, raising RuntimeError with its stderr if it fails."""
+    proc = await asyncio.create_subprocess_exec(
+        "git", *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},  # fail instead of prompting
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode:
+        raise RuntimeError(f"git {args[0]} failed: {stderr.decode(errors='replace').strip()}")
+
+
+def _suffix(name: str) -> str:
+    """File name extension, with the same rules as ``Path.suffix``."""
+    i = name.rfind(".")
+    return name[i:] if 0 < i < len(name) - 1 else ""
+
 
 class RepositoryService:
     """Service for managing git repositories."""
@@ -32,9 +57,6 @@ class RepositoryService:
     ) -> Path:
         """Clone a repository and return the local path."""
         
-        if not GIT_AVAILABLE:
-            raise RuntimeError("GitPython not installed")
-        
         # Generate a unique directory name from URL
         repo_name = url.rstrip("/").split("/")[-1].replace(".git", "")
         import uuid
@@ -43,6 +65,18 @@ class RepositoryService:
         
         logger.info(f"Cloning {url} to {local_path}")
         
+        if shutil.which("git"):
+            try:
+                await self._partial_clone(url, local_path, branch, depth)
+                logger.info(f"Successfully cloned {repo_name}")
+                return local_path
+            except RuntimeError as e:
+                logger.warning(f"Partial clone failed, retrying with GitPython: {e}")
+                shutil.rmtree(local_path, ignore_errors=True)
+        
+        if not GIT_AVAILABLE:
+            raise RuntimeError("GitPython not installed")
+        
         # Clone in a thread pool to not block async
         loop = asyncio.get_event_loop()
         await loop.run_in_executor(
@@ -59,6 +93,28 @@ class RepositoryService:
         logger.info(f"Successfully cloned {repo_name}")
         return local_path
     
+    async def _partial_clone(self, url: str, local_path: Path, branch: str, depth: int):
+        """Shallow blobless clone, optionally checking out only the files the parser indexes.
+        
+        ``--filter=blob:none`` defers every file download to checkout; with
+        ``clone_source_only`` a sparse checkout then limits that to supported
+        source files.
+        """
+        await _git(
+            "clone",
+            f"--depth={depth}",
+            "--single-branch",
+            "--branch", branch,
+            "--filter=blob:none",
+            "--no-checkout",
+            url,
+            str(local_path),
+        )
+        if settings.clone_source_only:
+            patterns = [f"*{ext}" for ext in LANGUAGE_CONFIGS]
+            await _git("-C", str(local_path), "sparse-checkout", "set", "--no-cone", *patterns)
+        await _git("-C", str(local_path), "checkout", branch)
+    
     async def delete(self, local_path: Path):
         """Delete a cloned repository."""
         if local_path.exists():
@@ -67,20 +123,31 @@ class RepositoryService:
     
     def get_file_list(self, local_path: Path, extensions: list[str] | None = None) -> list[Path]:
         """Get list of files in repository, optionally filtered by extension."""
+        wanted = frozenset(extensions) if extensions else None
         files = []
         
-        for item in local_path.rglob("*"):
-            if item.is_file():
-                # Skip hidden files and common non-code directories
-                parts = item.relative_to(local_path).parts
-                if any(p.startswith(".") or p in ["node_modules", "__pycache__", "venv"] for p in parts):
-                    continue
-                
-                if extensions:
-                    if item.suffix.lower() in extensions:
-                        files.append(item)
-                else:
-                    files.append(item)
+        # Walk with scandir so skipped directories are never descended into
+        # and names are filtered before any Path is built
+        stack = [str(local_path)]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError as e:
+                logger.warning(f"Could not list {e.filename}: {e}")
+                continue
+            
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    # Skip hidden files and common non-code directories
+                    if name.startswith(".") or name in _SKIP_DIRS:
+                        continue
+                    
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        if wanted is None or _suffix(name).lower() in wanted:
+                            files.append(Path(entry.path))
         
         return files
     
@@ -92,13 +159,28 @@ class RepositoryService:
             logger.warning(f"Could not read {file_path}: {e}")
             return None
     
-    def get_file_info(self, file_path: Path) -> dict:
-        """Get information about a file."""
-        content = self.read_file(file_path)
-        return {
+    def get_file_info(self, file_path: Path, st: os.stat_result | None = None) -> dict:
+        """Get information about a file.
+        
+        Pass ``st`` when the caller already has the file's stat, e.g. from a
+        scandir entry; otherwise the file is stat'ed once here.
+        """
+        info = {
             "path": str(file_path),
             "name": file_path.name,
             "extension": file_path.suffix,
-            "size": file_path.stat().st_size if file_path.exists() else 0,
-            "lines": len(content.split("\n")) if content else 0,
+            "size": 0,
+            "lines": 0,
         }
+        if st is None:
+            try:
+                st = os.stat(file_path)
+            except (FileNotFoundError, NotADirectoryError):
+                return info
+        
+        info["size"] = st.st_size
+        if st.st_size:
+            content = self.read_file(file_path)
+            if content:
+                info["lines"] = content.count("\n") + 1  # same as len(split("\n"))
+        return info
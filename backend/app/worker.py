@@ -2,10 +2,16 @@
 CodeGraph Backend - Celery Worker for Background Tasks
 """
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from pathlib import Path
+import asyncio
 import logging
 
 from app.config import settings
+from app.core.embeddings.encoder import get_encoder
+from app.core.embeddings.vectorstore import get_vectorstore
+from app.llm.base import close_http_client
+from app.models.database import dispose_engine
 from app.services.repository import RepositoryService
 from app.services.indexing import IndexingService
 
@@ -31,6 +37,51 @@ celery_app.conf.update(
 )
 
 
+# One event loop per worker process, reused by every task it runs
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Get the worker process's event loop, creating it on first use."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def _run(coro):
+    """Run a coroutine to completion on the worker process's event loop."""
+    return _get_loop().run_until_complete(coro)
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Set up per-process state: event loop, database pool, embedding model and vector store."""
+    _get_loop()
+    
+    # Connections pooled before the fork belong to the parent
+    dispose_engine()
+    
+    try:
+        get_encoder().warmup()
+    except Exception as e:
+        logger.warning(f"Embedding model not loaded: {e}")
+    
+    try:
+        get_vectorstore().client
+    except Exception as e:
+        logger.warning(f"Vector store not opened: {e}")
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Close the HTTP connections the process's event loop pooled for LLM calls."""
+    if _loop is not None and not _loop.is_closed():
+        _loop.run_until_complete(close_http_client())
+        _loop.close()
+
+
 @celery_app.task(bind=True, name="tasks.clone_repository")
 def clone_repository(self, repo_id: str, url: str, branch: str = "main"):
     """Clone a git repository in the background."""
@@ -42,11 +93,7 @@ def clone_repository(self, repo_id: str, url: str, branch: str = "main"):
         
         # Clone the repository
         repo_service = RepositoryService()
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        local_path = loop.run_until_complete(
+        local_path = _run(
             repo_service.clone(url, branch)
         )
         
@@ -73,11 +120,7 @@ def index_repository(self, repo_id: str, local_path: str):
         
         # Index the repository
         indexing_service = IndexingService()
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        stats = loop.run_until_complete(
+        stats = _run(
             indexing_service.index_repository(repo_id, Path(local_path))
         )
         
@@ -106,11 +149,7 @@ def process_repository(self, repo_id: str, url: str, branch: str = "main"):
         self.update_state(state="CLONING", meta={"progress": 10})
         
         repo_service = RepositoryService()
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        local_path = loop.run_until_complete(
+        local_path = _run(
             repo_service.clone(url, branch)
         )
         
@@ -118,7 +157,7 @@ def process_repository(self, repo_id: str, url: str, branch: str = "main"):
         self.update_state(state="INDEXING", meta={"progress": 50})
         
         indexing_service = IndexingService()
-        stats = loop.run_until_complete(
+        stats = _run(
             indexing_service.index_repository(repo_id, local_path)
         )
         
@@ -143,11 +182,7 @@ def delete_repository(repo_id: str, local_path: str):
     
     try:
         repo_service = RepositoryService()
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        loop.run_until_complete(
+        _run(
             repo_service.delete(Path(local_path))
         )
         
@@ -0,0 +1,56 @@
+"""
+Shared fixtures: a small code graph and its loaded API form
+"""
+import asyncio
+
+import networkx as nx
+import pytest
+
+from app.config import settings
+from app.core.graph.builder import GraphBuilder, LoadedGraph
+
+
+def make_code_graph(names: str = "abcdef") -> nx.DiGraph:
+    """A chain of functions calling each other, plus a class containing the first."""
+    graph = nx.DiGraph()
+    graph.add_node("cls", data={"type": "class", "name": "Cls", "file_path": "m.py", "start_line": 1, "end_line": 50})
+    for i, name in enumerate(names):
+        graph.add_node(name, data={
+            "type": "function",
+            "name": name,
+            "file_path": "m.py",
+            "start_line": i * 5 + 2,
+            "end_line": i * 5 + 5,
+            "metadata": {"index": i},
+        })
+    for source, target in zip(names, names[1:]):
+        graph.add_edge(source, target, data={"type": "calls"})
+    if names:
+        graph.add_edge("cls", names[0], data={"type": "contains"})
+    return graph
+
+
+def load_graph(graph: nx.DiGraph, repo_id: str = "repo") -> LoadedGraph:
+    """Convert a graph to the LoadedGraph the graph routes serve."""
+    builder = GraphBuilder()
+    builder._graphs[repo_id] = graph
+    return asyncio.run(builder.load_graph(repo_id))
+
+
+@pytest.fixture
+def code_graph() -> nx.DiGraph:
+    return make_code_graph()
+
+
+@pytest.fixture
+def loaded_graph(code_graph) -> LoadedGraph:
+    return load_graph(code_graph)
+
+
+@pytest.fixture
+def builder(tmp_path, monkeypatch) -> GraphBuilder:
+    """A graph builder that keeps graphs in memory and skips the parse cache."""
+    monkeypatch.setattr(settings, "graph_persist_enabled", False)
+    monkeypatch.setattr(settings, "graph_store_enabled", False)
+    monkeypatch.setattr(settings, "parse_cache_path", "")
+    return GraphBuilder()
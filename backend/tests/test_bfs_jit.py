@@ -0,0 +1,71 @@
+"""
+Tests for the CSR BFS kernels against NetworkX
+"""
+import networkx as nx
+import numpy as np
+import pytest
+
+from app.core.graph.bfs_jit import (
+    _bfs_python,
+    _multi_source_python,
+    bfs_csr,
+    lane_members,
+    multi_source_bfs,
+)
+from app.core.graph.csr import build_csr
+
+
+def _random_graph(seed: int) -> nx.DiGraph:
+    graph = nx.gnp_random_graph(60, 0.04, directed=True, seed=seed)
+    return nx.relabel_nodes(graph, {i: f"n{i}" for i in graph})
+
+
+def _csr(graph: nx.DiGraph):
+    return build_csr(list(graph.nodes), list(graph.edges))
+
+
+@pytest.mark.parametrize("bfs", [bfs_csr, _bfs_python])
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("max_depth", [1, 2, 4])
+def test_bfs_matches_networkx(bfs, seed, max_depth):
+    graph = _random_graph(seed)
+    csr = _csr(graph)
+    names = list(graph.nodes)
+    undirected = graph.to_undirected(as_view=True)
+    
+    for node_id in names[::7]:
+        src = csr.node_index[node_id]
+        order, depth, truncated = bfs(*csr.arrays, src, max_depth, csr.num_nodes)
+        expected = nx.single_source_shortest_path_length(undirected, node_id, cutoff=max_depth)
+        
+        assert not truncated
+        assert order[0] == src
+        assert {names[i] for i in order.tolist()} == set(expected)
+        assert all(depth[csr.node_index[n]] == d for n, d in expected.items())
+
+
+@pytest.mark.parametrize("bfs", [bfs_csr, _bfs_python])
+def test_bfs_truncates_at_max_nodes(bfs):
+    graph = nx.relabel_nodes(nx.path_graph(20, create_using=nx.DiGraph), str)
+    csr = _csr(graph)
+    
+    order, depth, truncated = bfs(*csr.arrays, csr.node_index["0"], 10, 5)
+    
+    assert truncated
+    assert len(order) == 5
+    # The cap keeps the nodes nearest the source
+    assert sorted(depth[order].tolist()) == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("multi_source", [multi_source_bfs, _multi_source_python])
+def test_multi_source_lanes_match_single_source(multi_source):
+    graph = _random_graph(7)
+    csr = _csr(graph)
+    # More than 64 sources, so lanes span two bitset words
+    sources = np.arange(70, dtype=np.int32) % csr.num_nodes
+    
+    visited = multi_source(*csr.arrays, sources, 3)
+    
+    for lane, src in enumerate(sources.tolist()):
+        order, _, _ = bfs_csr(*csr.arrays, src, 3, csr.num_nodes)
+        assert lane_members(visited, lane).tolist() == sorted(order.tolist())
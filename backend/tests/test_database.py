@@ -0,0 +1,43 @@
+"""
+Tests for the time-ordered row ID generator
+"""
+import time
+import uuid
+
+from app.models.database import generate_ids, generate_uuid
+
+
+def test_ids_are_canonical_uuid7_strings():
+    for value in generate_ids(100) + [generate_uuid()]:
+        parsed = uuid.UUID(value)
+        
+        assert len(value) == 36 and str(parsed) == value
+        assert parsed.version == 7
+        assert parsed.variant == uuid.RFC_4122
+        assert (parsed.int >> 62) & 0b11 == 0b10
+
+
+def test_ids_carry_their_creation_time():
+    before = time.time_ns() // 1_000_000
+    ids = generate_ids(5000)
+    after = time.time_ns() // 1_000_000
+    
+    stamps = [uuid.UUID(value).int >> 80 for value in ids]
+    # Beyond 4096 IDs a batch borrows the next millisecond
+    assert before <= stamps[0] and stamps[-1] <= after + 1
+    assert stamps[4095] + 1 == stamps[4096]
+
+
+def test_a_batch_is_unique_and_sorted_across_the_sequence_rollover():
+    ids = generate_ids(10_000)
+    
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+
+def test_later_calls_sort_after_earlier_ones():
+    first = generate_uuid()
+    time.sleep(0.002)
+    
+    assert generate_uuid() > first
+    assert generate_ids(0) == []
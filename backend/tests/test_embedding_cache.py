@@ -0,0 +1,77 @@
+"""
+Tests for the content-hash embedding cache
+"""
+import numpy as np
+import pytest
+
+from app.core.embeddings.cache import EmbeddingCache, content_key
+from app.core.embeddings.encoder import EmbeddingEncoder
+
+
+def _embed(text: str) -> np.ndarray:
+    return np.array([len(text), sum(map(ord, text))], dtype=np.float32)
+
+
+class FakeModelEncoder(EmbeddingEncoder):
+    """Encoder with a deterministic stand-in for the sentence-transformers model."""
+    
+    def __init__(self, cache: EmbeddingCache, model_name: str = "model-a"):
+        super().__init__(model_name)
+        self._cache = cache
+        self.encoded: list[list[str]] = []
+    
+    def encode(self, texts, batch_size=32, show_progress=False):
+        self.encoded.append(list(texts))
+        return np.stack([_embed(text) for text in texts])
+
+
+@pytest.fixture
+def cache(tmp_path) -> EmbeddingCache:
+    return EmbeddingCache(tmp_path / "embeddings_cache.sqlite3")
+
+
+def test_get_many_returns_only_hits(cache):
+    hit, miss = content_key("model-a", "def f(): pass"), content_key("model-a", "x = 1")
+    cache.put_many([(hit, _embed("def f(): pass"))])
+    
+    found = cache.get_many([hit, miss, hit])
+    
+    assert list(found) == [hit]
+    assert found[hit].dtype == np.float32
+    np.testing.assert_array_equal(found[hit], _embed("def f(): pass"))
+
+
+def test_content_key_isolates_model_names():
+    key = content_key("model-a", "text")
+    
+    assert len(key) == 16
+    assert key == content_key("model-a", "text")
+    assert key != content_key("model-b", "text")
+    # The separator keeps model and text from running into each other
+    assert content_key("ab", "c") != content_key("a", "bc")
+
+
+def test_encode_cached_keeps_input_order_across_hits_and_misses(cache):
+    encoder = FakeModelEncoder(cache)
+    encoder.encode_cached(["b", "d"])
+    encoder.encoded.clear()
+    
+    texts = ["a", "b", "c", "a", "d", "e"]
+    embeddings = encoder.encode_cached(texts)
+    
+    # Only misses are encoded, each distinct text once
+    assert encoder.encoded == [["a", "c", "e"]]
+    np.testing.assert_array_equal(embeddings, np.stack([_embed(t) for t in texts]))
+    
+    encoder.encoded.clear()
+    np.testing.assert_array_equal(encoder.encode_cached(texts), embeddings)
+    assert encoder.encoded == []
+
+
+def test_encode_cached_does_not_share_entries_between_models(cache):
+    FakeModelEncoder(cache, "model-a").encode_cached(["shared"])
+    other = FakeModelEncoder(cache, "model-b")
+    
+    other.encode_cached(["shared"])
+    
+    assert other.encoded == [["shared"]]
@@ -0,0 +1,37 @@
+"""
+Tests for the encoded and streamed graph response bodies
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.models.fast_schemas import encode_json, stream_graph_response
+from tests.conftest import load_graph, make_code_graph
+
+
+def _stream_body(response) -> bytes:
+    async def collect():
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 4, 1024])
+def test_streamed_graph_matches_encoded_graph(loaded_graph, chunk_size):
+    response = stream_graph_response(loaded_graph.data, chunk_size)
+    body = json.loads(_stream_body(response))
+    
+    assert response.media_type == "application/json"
+    assert list(body) == ["nodes", "edges", "stats"]
+    assert body == json.loads(encode_json(loaded_graph.data))
+    assert len(body["nodes"]) == 7
+    assert body["nodes"][1]["metadata"] == {"index": 0}
+    assert body["edges"][0] == {"source": "cls", "target": "a", "type": "contains", "metadata": {}}
+
+
+def test_streamed_empty_graph():
+    loaded = load_graph(make_code_graph(""))
+    body = json.loads(_stream_body(stream_graph_response(loaded.data, 2)))
+    
+    assert body["edges"] == []
+    assert [n["name"] for n in body["nodes"]] == ["Cls"]
@@ -0,0 +1,71 @@
+"""
+Tests for graph construction from parsed files
+"""
+import pytest
+
+from app.core.graph import builder as builder_module
+
+SOURCE = '''def helper():
+    """Help."""
+    return 1
+
+
+def main():
+    return helper()
+'''
+
+
+def test_node_and_edge_data_are_plain_dicts(builder, tmp_path):
+    (tmp_path / "m.py").write_text(SOURCE)
+    graph = builder.build_graph("repo", tmp_path)
+    by_name = {data["name"]: data for _, data in graph.nodes(data="data")}
+    
+    assert by_name["helper"] == {
+        "id": by_name["helper"]["id"],
+        "type": "function",
+        "name": "helper",
+        "qualified_name": "helper",
+        "file_path": "m.py",
+        "start_line": 1,
+        "end_line": 3,
+        "signature": "def helper():",
+        "docstring": "Help.",
+        "start_byte": 0,
+        "end_byte": SOURCE.index("\n\n"),
+    }
+    assert by_name["m"]["type"] == "module"
+    
+    calls = graph.edges[by_name["main"]["id"], by_name["helper"]["id"]]["data"]
+    assert calls == {
+        "source": by_name["main"]["id"],
+        "target": by_name["helper"]["id"],
+        "type": "calls",
+        "weight": 1.0,
+    }
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"\n",
+    b"x",
+    b"a\nb",
+    b"a\nb\n",
+    b"a\r\nb\r\n\r\n",
+    b"\n\n\n",
+])
+def test_count_lines_matches_reading_lines(builder, tmp_path, content):
+    path = tmp_path / "m.py"
+    path.write_bytes(content)
+    
+    with open(path, encoding="utf-8") as f:
+        expected = sum(1 for _ in f)
+    assert builder._count_lines(str(path)) == expected
+
+
+def test_count_lines_across_scan_blocks(builder, tmp_path, monkeypatch):
+    monkeypatch.setattr(builder_module, "_LINE_COUNT_BLOCK", 4)
+    path = tmp_path / "m.py"
+    path.write_bytes(b"one\ntwo\n\nthree\nfour")
+    
+    assert builder._count_lines(str(path)) == 5
+    assert builder._count_lines(str(tmp_path / "missing.py")) == 0
@@ -0,0 +1,113 @@
+"""
+Tests for the graph routes' query cache and batch traversal
+"""
+import asyncio
+import json
+import threading
+
+from fastapi import FastAPI
+import pytest
+
+from app.api.routes import graph as routes
+from app.models.schemas import GraphBatchQuery, GraphQuery
+from tests.conftest import load_graph, make_code_graph
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    routes._graphs.clear()
+    routes._query_cache.clear()
+    yield
+    routes._graphs.clear()
+    routes._query_cache.clear()
+
+
+def _query(repository_id: str = "repo", **kwargs) -> GraphQuery:
+    return GraphQuery(repository_id=repository_id, **kwargs)
+
+
+def test_query_results_are_cached_per_graph_generation(loaded_graph):
+    query = _query(start_node="a", max_depth=2)
+    
+    first = routes._run_graph_query(loaded_graph, query)
+    assert routes._run_graph_query(loaded_graph, query) is first
+    
+    # A re-indexed graph gets a new generation, so it never sees old results
+    reloaded = load_graph(make_code_graph("abcdefg"))
+    assert reloaded.generation != loaded_graph.generation
+    assert routes._run_graph_query(reloaded, query) is not first
+    
+    names = {n["name"] for n in json.loads(first)["nodes"]}
+    assert names == {"Cls", "a", "b", "c"}
+
+
+def test_invalidate_graph_drops_only_that_repository(loaded_graph):
+    other = load_graph(make_code_graph("xyz"), "other")
+    routes._graphs.update(repo=loaded_graph, other=other)
+    routes._run_graph_query(loaded_graph, _query())
+    routes._run_graph_query(other, _query("other"))
+    
+    routes.invalidate_graph("repo")
+    
+    assert "repo" not in routes._graphs
+    assert [key[0] for key in routes._query_cache.keys()] == ["other"]
+
+
+def test_invalidation_racing_queries(loaded_graph):
+    errors = []
+    stop = threading.Event()
+    
+    def query_loop(depth: int):
+        try:
+            for i in range(300):
+                body = routes._run_graph_query(loaded_graph, _query(start_node="a", max_depth=depth, max_nodes=i + 1))
+                assert json.loads(body)["stats"]["node_count"] <= i + 1
+        except Exception as e:
+            errors.append(e)
+    
+    def invalidate_loop():
+        while not stop.is_set():
+            routes.invalidate_graph("repo")
+    
+    invalidator = threading.Thread(target=invalidate_loop)
+    workers = [threading.Thread(target=query_loop, args=(depth,)) for depth in range(1, 5)]
+    invalidator.start()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    stop.set()
+    invalidator.join()
+    
+    assert errors == []
+
+
+def test_neighbors_rejects_non_positive_max_nodes():
+    app = FastAPI()
+    app.include_router(routes.router)
+    operation = app.openapi()["paths"]["/{repository_id}/neighbors/{node_id}"]["get"]
+    
+    max_nodes = next(p for p in operation["parameters"] if p["name"] == "max_nodes")
+    assert max_nodes["schema"]["minimum"] == 1
+
+
+def test_query_route_uses_loaded_graph(loaded_graph):
+    routes._graphs["repo"] = loaded_graph
+    
+    response = asyncio.run(routes.query_graph(_query(node_types=["function"], edge_types=["calls"])))
+    body = json.loads(response.body)
+    
+    assert response.media_type == "application/json"
+    assert [n["name"] for n in body["nodes"]] == list("abcdef")
+    assert body["stats"] == {"node_count": 6, "edge_count": 5}
+
+
+def test_batch_bfs_caps_each_lane(loaded_graph):
+    routes._graphs["repo"] = loaded_graph
+    query = GraphBatchQuery(start_nodes=["a", "missing", "f"], max_depth=10, max_nodes=3)
+    
+    body = json.loads(asyncio.run(routes.batch_bfs("repo", query)).body)
+    
+    assert [lane["stats"]["node_count"] for lane in body] == [3, 0, 3]
+    assert [lane["stats"]["truncated"] for lane in body] == [1, 0, 1]
+    assert {n["name"] for n in body[2]["nodes"]} == {"d", "e", "f"}
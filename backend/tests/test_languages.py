@@ -0,0 +1,71 @@
+"""
+Tests for language detection and ignore patterns
+"""
+from pathlib import Path
+
+import pytest
+
+from app.core.parsing.languages import (
+    IGNORE_PATTERNS,
+    LANGUAGE_CONFIGS,
+    get_language_config,
+    get_language_config_by_name,
+    is_supported_ext,
+    should_ignore,
+    should_ignore_name,
+)
+
+FILE_NAMES = [
+    "a.py", "A.PY", "m.Py", ".py", "..py", "a.", "a", "", ".hidden.ts", "x.min.js", "a.tsx",
+    "a.JSX", "a.pyi", "archive.tar.gz", "a.py.bak", "noext.", "a b.ts",
+]
+
+IGNORE_NAMES = [
+    "node_modules", "__pycache__", ".git", ".venv", "venv", "env", ".env", "dist", "build",
+    ".next", "coverage", ".pytest_cache", ".mypy_cache",
+    "a.min.js", "min.js", ".min.js", "x.bundle.js", "bundle.js", "a.min.js.map", "a.min.jsx",
+    "app.js", "a.MIN.JS", "git", ".gitignore", "venv2", "my_venv", "build.py", "dist.ts",
+    "environment", "node_modules.js", "", "a.min.js\n",
+]
+
+
+def _original_should_ignore(name: str) -> bool:
+    """The per-pattern loop should_ignore ran before the frozenset and regex."""
+    for pattern in IGNORE_PATTERNS:
+        if pattern.startswith("*"):
+            if name.endswith(pattern[1:]):
+                return True
+        elif name == pattern:
+            return True
+    return False
+
+
+@pytest.mark.parametrize("name", IGNORE_NAMES)
+def test_should_ignore_name_matches_the_pattern_loop(name):
+    assert should_ignore_name(name) == _original_should_ignore(name)
+
+
+def test_should_ignore_uses_the_last_path_component():
+    assert should_ignore(Path("repo/node_modules"))
+    assert should_ignore(Path("repo/static/app.min.js"))
+    assert not should_ignore(Path("node_modules/pkg/index.js"))
+
+
+@pytest.mark.parametrize("name", FILE_NAMES)
+def test_name_lookup_matches_path_suffix(name):
+    expected = LANGUAGE_CONFIGS.get(Path(name).suffix.lower())
+    
+    assert get_language_config_by_name(name) is expected
+    assert is_supported_ext(name) == (expected is not None)
+
+
+@pytest.mark.parametrize("name", FILE_NAMES)
+def test_path_lookup_matches_path_suffix(name):
+    path = Path("repo/src") / name
+    
+    assert get_language_config(path) is LANGUAGE_CONFIGS.get(path.suffix.lower())
+    assert get_language_config(str(path)) is get_language_config(path)
+
+
+def test_extension_keys_are_lowercase():
+    assert all(ext == ext.lower() for ext in LANGUAGE_CONFIGS)
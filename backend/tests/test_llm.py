@@ -0,0 +1,247 @@
+"""
+Tests for the shared LLM provider plumbing
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.llm import base, factory
+from app.llm.base import (
+    BaseLLMProvider,
+    LLMResponse,
+    Message,
+    MessageRole,
+    close_http_client,
+    coalesce_deltas,
+    get_http_client,
+    get_tiktoken_encoding,
+)
+from app.llm.anthropic import AnthropicProvider
+from app.llm.openai import OpenAIProvider
+
+
+class FakeAsyncClient:
+    """httpx.AsyncClient stand-in that records being closed."""
+    
+    def __init__(self, transport):
+        self.transport = transport
+        self.closed = False
+    
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeProvider(BaseLLMProvider):
+    """Provider whose SDK client is just the HTTP client it was built on."""
+    
+    provider_name = "fake"
+    
+    def _create_client(self, http_client):
+        return SimpleNamespace(http_client=http_client)
+    
+    @property
+    def default_model(self) -> str:
+        return "fake-model"
+    
+    @property
+    def available_models(self) -> list[str]:
+        return ["fake-model"]
+    
+    async def generate(self, prompt, max_tokens=2000, temperature=0.7, **kwargs):
+        return LLMResponse(content=prompt, model=self.model)
+    
+    async def chat(self, messages, max_tokens=2000, temperature=0.7, **kwargs):
+        return LLMResponse(content=messages[-1].content, model=self.model)
+
+
+@pytest.fixture
+def fake_httpx(monkeypatch):
+    monkeypatch.setattr(base, "httpx", SimpleNamespace(
+        AsyncClient=FakeAsyncClient,
+        AsyncHTTPTransport=lambda **kwargs: kwargs,
+        Limits=lambda **kwargs: kwargs,
+    ), raising=False)
+    monkeypatch.setattr(base, "_http_clients", base.WeakKeyDictionary())
+
+
+def test_providers_share_one_http_client_per_loop(fake_httpx):
+    first, second = FakeProvider(), FakeProvider(model="other")
+    
+    async def clients():
+        return get_http_client(), first._client, second._client, first._client
+    
+    shared, a, b, a_again = asyncio.run(clients())
+    
+    assert a.http_client is shared and b.http_client is shared
+    assert a_again is a
+    assert shared.transport["retries"] == 1
+    # A new event loop gets its own pool
+    assert asyncio.run(clients())[0] is not shared
+
+
+def test_close_http_client_closes_and_forgets_the_loop_client(fake_httpx):
+    async def close_and_reopen():
+        client = get_http_client()
+        await close_http_client()
+        # Closing twice, or with no client, is a no-op
+        await close_http_client()
+        return client, get_http_client()
+    
+    closed, reopened = asyncio.run(close_and_reopen())
+    
+    assert closed.closed
+    assert reopened is not closed and not reopened.closed
+
+
+
+@pytest.fixture
+def fake_factory(monkeypatch):
+    monkeypatch.setattr(factory, "_provider_cls", lambda name: FakeProvider)
+    factory._create_provider.cache_clear()
+    yield
+    factory._create_provider.cache_clear()
+
+
+def test_get_provider_reuses_instances_per_configuration(fake_factory):
+    provider = factory.get_provider("fake", "m", timeout=30, retries=2)
+    
+    assert factory.get_provider("fake", "m", retries=2, timeout=30) is provider
+    assert factory.get_provider("fake", "other", timeout=30, retries=2) is not provider
+    assert provider.kwargs == {"timeout": 30, "retries": 2}
+
+
+def test_get_provider_builds_unhashable_configurations_uncached(fake_factory):
+    first = factory.get_provider("fake", "m", headers={"x-trace": "1"})
+    second = factory.get_provider("fake", "m", headers={"x-trace": "1"})
+    
+    assert first is not second
+    assert first.kwargs == {"headers": {"x-trace": "1"}}
+
+
+def _openai_provider(model: str) -> OpenAIProvider:
+    # Skips __init__, which needs the openai SDK; count_tokens does not
+    provider = object.__new__(OpenAIProvider)
+    provider.model = model
+    return provider
+
+
+def test_count_tokens_estimates_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(base, "TIKTOKEN_AVAILABLE", False)
+    get_tiktoken_encoding.cache_clear()
+    try:
+        assert get_tiktoken_encoding("gpt-4") is None
+        assert _openai_provider("gpt-4").count_tokens("x" * 41) == 10
+        assert FakeProvider().count_tokens("x" * 41) == 10
+    finally:
+        get_tiktoken_encoding.cache_clear()
+
+
+def test_count_tokens_matches_tiktoken():
+    tiktoken = pytest.importorskip("tiktoken")
+    text = "def parse(path):\n    return <|endoftext|> tree.walk(path)  # ünïcode"
+    
+    expected = tiktoken.encoding_for_model("gpt-4").encode(text, disallowed_special=())
+    assert _openai_provider("gpt-4").count_tokens(text) == len(expected)
+    # Models tiktoken does not know fall back to cl100k_base
+    fallback = tiktoken.get_encoding("cl100k_base").encode(text, disallowed_special=())
+    assert _openai_provider("not-a-model").count_tokens(text) == len(fallback)
+
+
+
+def test_message_dict_is_built_once():
+    message = Message("user", "hi")
+    
+    assert message.role is MessageRole.USER
+    assert message.as_dict == {"role": "user", "content": "hi"}
+    assert message.as_dict is message.as_dict
+    assert message == Message(MessageRole.USER, "hi")
+    assert "_dict" not in repr(message)
+
+
+def test_format_messages_reuses_message_dicts():
+    messages = [Message("system", "be brief"), Message("user", "hi"), Message("assistant", "hello")]
+    
+    formatted = FakeProvider().format_messages(messages)
+    system, anthropic_formatted = object.__new__(AnthropicProvider).format_messages(messages)
+    
+    assert all(d is m.as_dict for d, m in zip(formatted, messages))
+    assert system == "be brief"
+    assert anthropic_formatted == [messages[1].as_dict, messages[2].as_dict]
+    assert all(d is m.as_dict for d, m in zip(anthropic_formatted, messages[1:]))
+
+
+
+async def _deltas(*items):
+    """Yield string deltas, sleeping wherever a float (seconds) appears."""
+    for item in items:
+        if isinstance(item, float):
+            await asyncio.sleep(item)
+        else:
+            yield item
+
+
+def _coalesce(*items, batch_ms) -> list[str]:
+    async def collect():
+        return [chunk async for chunk in coalesce_deltas(_deltas(*items), batch_ms)]
+    return asyncio.run(collect())
+
+
+def test_coalesce_merges_deltas_within_the_window():
+    assert _coalesce("a", "b", "c", 0.2, "d", "e", batch_ms=50) == ["abc", "de"]
+
+
+def test_coalesce_flushes_on_the_deadline_while_the_stream_stalls():
+    async def collect():
+        chunks = []
+        async for chunk in coalesce_deltas(_deltas("a", 0.3, "b"), 20):
+            chunks.append((chunk, loop.time() - start))
+        return chunks
+    
+    loop = asyncio.new_event_loop()
+    try:
+        start = loop.time()
+        (first, first_at), (second, _) = loop.run_until_complete(collect())
+    finally:
+        loop.close()
+    
+    assert (first, second) == ("a", "b")
+    assert first_at < 0.2
+
+
+def test_coalesce_flushes_large_buffers_early():
+    chunks = _coalesce("x" * 200, "y" * 100, "z", batch_ms=10_000)
+    
+    assert chunks == ["x" * 200 + "y" * 100, "z"]
+
+
+def test_coalesce_without_a_window_passes_every_delta_through():
+    assert _coalesce("a", "b", "c", batch_ms=0) == ["a", "b", "c"]
+
+
+def test_coalesce_never_yields_an_empty_chunk():
+    assert _coalesce(batch_ms=50) == []
+    assert _coalesce(0.05, batch_ms=10) == []
+    # The last buffered deltas are flushed when the stream ends
+    assert _coalesce("a", "b", batch_ms=10_000) == ["ab"]
+
+
+def test_stream_chat_ends_with_one_empty_final_chunk(monkeypatch):
+    def chunk(content):
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+    
+    async def create(**kwargs):
+        return _deltas(chunk("Hel"), chunk(None), chunk("lo"), 0.1, chunk("!"), chunk(""))
+    
+    provider = _openai_provider("gpt-4")
+    monkeypatch.setattr(OpenAIProvider, "_client", SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+    ))
+    
+    async def collect():
+        return [
+            (c.content, c.is_final)
+            async for c in provider.stream_chat([Message("user", "hi")], batch_ms=50)
+        ]
+    
+    assert asyncio.run(collect()) == [("Hello", False), ("!", False), ("", True)]
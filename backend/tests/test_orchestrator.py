@@ -0,0 +1,41 @@
+"""
+Tests for the agent's citations
+"""
+from app.core.agents.orchestrator import CodeGraphAgent
+from app.core.graph.traversal import GraphTraversal
+
+SOURCE = '''def helper():
+    """Help."""
+    return 1
+
+
+def main():
+    return helper()
+'''
+
+
+def _agent(builder) -> CodeGraphAgent:
+    # No LLM is needed to cite nodes
+    agent = CodeGraphAgent.__new__(CodeGraphAgent)
+    agent.graph_builder = builder
+    return agent
+
+
+def test_citation_content_is_read_from_the_node_source(builder, tmp_path):
+    (tmp_path / "m.py").write_text(SOURCE)
+    graph = builder.build_graph("repo", tmp_path)
+    node_id = GraphTraversal(graph).search_nodes("helper", limit=1)[0]["node_id"]
+    
+    citation = _agent(builder)._make_citation("repo", node_id, graph.nodes[node_id]["data"])
+    
+    assert citation.content == 'def helper():\n    """Help."""\n    return 1'
+    assert (citation.node_name, citation.start_line, citation.end_line) == ("helper", 1, 3)
+    assert citation.node_type.value == "function"
+
+
+def test_citation_falls_back_to_the_signature(builder):
+    node_data = {"type": "function", "name": "gone", "file_path": "m.py", "signature": "def gone():"}
+    
+    citation = _agent(builder)._make_citation("unknown", "gone", node_data)
+    
+    assert citation.content == "def gone():"
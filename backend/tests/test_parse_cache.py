@@ -0,0 +1,78 @@
+"""
+Tests for the content-hash parse cache
+"""
+import pytest
+
+from app.config import settings
+from app.core.parsing.cache import ParseCache, content_digest
+from app.core.parsing.tree_sitter import ParsedNode, TreeSitterParser
+
+SOURCE = "def f():\n    g()\n"
+
+
+@pytest.fixture
+def cached_parser(tmp_path, monkeypatch) -> TreeSitterParser:
+    monkeypatch.setattr(settings, "parse_cache_path", str(tmp_path / "cache" / "parse.sqlite3"))
+    return TreeSitterParser()
+
+
+def _node(name: str) -> ParsedNode:
+    return ParsedNode("function", name, name, "m.py", 1, 2, 0, 5, calls=["g"])
+
+
+def test_get_requires_a_matching_digest(tmp_path):
+    cache = ParseCache(tmp_path / "parse.sqlite3")
+    cache.put_many([("m.py", b"digest-1", [_node("f")])])
+    
+    assert cache.get("m.py", b"digest-1") == [_node("f")]
+    assert cache.get("m.py", b"digest-2") is None
+    assert cache.get("other.py", b"digest-1") is None
+    
+    cache.put_many([("m.py", b"digest-2", [_node("h")])])
+    assert cache.get("m.py", b"digest-1") is None
+    assert cache.get("m.py", b"digest-2") == [_node("h")]
+
+
+def test_content_digest():
+    assert len(content_digest(b"a", b"b")) == 16
+    assert content_digest(b"a", b"b") == content_digest(b"ab")
+    assert content_digest(b"a") != content_digest(b"b")
+
+
+def test_unchanged_files_are_served_from_the_cache(cached_parser, tmp_path, monkeypatch):
+    path = tmp_path / "m.py"
+    path.write_text(SOURCE)
+    first = cached_parser.parse_file(path)
+    
+    def no_parse(*args, **kwargs):
+        raise AssertionError("parsed again")
+    monkeypatch.setattr(cached_parser, "_parse_content", no_parse)
+    
+    # A fresh parser reads the same cache file
+    assert cached_parser.parse_file(path) == first
+    fresh = TreeSitterParser()
+    monkeypatch.setattr(fresh, "_parse_content", no_parse)
+    assert fresh.parse_file(path) == first
+    assert [(n.qualified_name, n.calls) for n in first] == [("f", ["g"])]
+
+
+def test_changed_files_are_parsed_again(cached_parser, tmp_path):
+    path = tmp_path / "m.py"
+    path.write_text(SOURCE)
+    cached_parser.parse_file(path)
+    
+    path.write_text("def renamed():\n    pass\n")
+    
+    assert [n.qualified_name for n in cached_parser.parse_file(path)] == ["renamed"]
+
+
+def test_unusable_cache_is_disabled(tmp_path, monkeypatch):
+    # The cache path is a directory, so SQLite cannot open it
+    (tmp_path / "parse.sqlite3").mkdir()
+    monkeypatch.setattr(settings, "parse_cache_path", str(tmp_path / "parse.sqlite3"))
+    parser = TreeSitterParser()
+    path = tmp_path / "m.py"
+    path.write_text(SOURCE)
+    
+    assert [n.qualified_name for n in parser.parse_file(path)] == ["f"]
+    assert parser._cache is None
@@ -0,0 +1,146 @@
+"""
+Tests for the repository file walk and file info
+"""
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.services import repository
+from app.services.repository import _SKIP_DIRS, RepositoryService, _suffix
+
+TREE = [
+    "main.py", "README.md", "Makefile", "pkg/__init__.py", "pkg/core.PY", "pkg/sub/deep.ts",
+    "pkg/sub/view.tsx", "web/app.js", "web/app.min.js", "web/.eslintrc.js", ".hidden.py",
+    ".github/workflows/ci.py", "node_modules/lib/index.js", "pkg/__pycache__/core.pyc",
+    "venv/lib/site.py", "dist/bundle.js", "build/out.py", "src/build.py", "src/venv",
+    "notes.", "archive.tar.gz",
+]
+
+
+@pytest.fixture
+def repo(tmp_path) -> Path:
+    root = tmp_path / "repo"
+    for relative in TREE:
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x = 1\n")
+    (root / "empty_dir").mkdir()
+    return root
+
+
+@pytest.fixture
+def service(tmp_path) -> RepositoryService:
+    return RepositoryService(repos_dir=str(tmp_path / "repos"))
+
+
+def _original_file_list(local_path: Path, extensions: list[str] | None = None) -> list[Path]:
+    """The rglob walk get_file_list did before scandir, with today's skipped names."""
+    files = []
+    for item in local_path.rglob("*"):
+        if item.is_file():
+            parts = item.relative_to(local_path).parts
+            if any(p.startswith(".") or p in _SKIP_DIRS for p in parts):
+                continue
+            if not extensions or item.suffix.lower() in extensions:
+                files.append(item)
+    return files
+
+
+@pytest.mark.parametrize("extensions", [None, [], [".py"], [".py", ".ts", ".tsx", ".js"], [".md"]])
+def test_get_file_list_matches_the_rglob_walk(service, repo, extensions):
+    files = service.get_file_list(repo, extensions)
+    
+    assert sorted(files) == sorted(_original_file_list(repo, extensions))
+    assert all(isinstance(path, Path) for path in files)
+
+
+def test_get_file_list_skips_hidden_and_vendored_paths(service, repo):
+    relative = {path.relative_to(repo).as_posix() for path in service.get_file_list(repo)}
+    
+    assert "pkg/core.PY" in relative and "src/build.py" in relative
+    assert not any(p.startswith((".", "node_modules/", "venv/", "dist/", "build/")) for p in relative)
+    assert "web/.eslintrc.js" not in relative and "src/venv" not in relative
+
+
+def test_get_file_list_does_not_follow_directory_symlinks(service, repo, tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "linked.py").write_text("x = 1\n")
+    (repo / "link").symlink_to(outside, target_is_directory=True)
+    
+    assert sorted(service.get_file_list(repo)) == sorted(_original_file_list(repo))
+    assert not any(path.name == "linked.py" for path in service.get_file_list(repo))
+
+
+def test_get_file_list_of_a_missing_directory_is_empty(service, tmp_path):
+    assert service.get_file_list(tmp_path / "missing") == []
+
+
+@pytest.mark.parametrize("name", ["a.py", "a.tar.gz", ".py", "a.", "a", "..py", "a..b", ""])
+def test_suffix_matches_path_suffix(name):
+    assert _suffix(name) == Path(name).suffix
+
+
+
+def _original_file_info(file_path: Path) -> dict:
+    """What get_file_info returned before it counted newlines and stat'ed once."""
+    try:
+        content = file_path.read_text(encoding="utf-8")
+    except Exception:
+        content = None
+    return {
+        "path": str(file_path),
+        "name": file_path.name,
+        "extension": file_path.suffix,
+        "size": file_path.stat().st_size if file_path.exists() else 0,
+        "lines": len(content.split("\n")) if content else 0,
+    }
+
+
+@pytest.mark.parametrize("raw", [
+    b"", b"a", b"a\n", b"a\nb", b"\n", b"\n\n", b"a\r\nb\r\n", b"a\rb", b"\xff\xfe\x00", "é\n".encode(),
+])
+def test_get_file_info_matches_the_original_line_count(service, tmp_path, raw):
+    path = tmp_path / "f.py"
+    path.write_bytes(raw)
+    
+    assert service.get_file_info(path) == _original_file_info(path)
+    # A stat from the directory walk gives the same answer
+    [entry] = [e for e in os.scandir(tmp_path) if e.name == "f.py"]
+    assert service.get_file_info(path, entry.stat()) == _original_file_info(path)
+
+
+def test_get_file_info_of_missing_files_and_directories(service, tmp_path):
+    assert service.get_file_info(tmp_path / "missing.py") == _original_file_info(tmp_path / "missing.py")
+    assert service.get_file_info(tmp_path)["lines"] == 0
+
+
+
+def _partial_clone_commands(service, monkeypatch) -> list[tuple[str, ...]]:
+    commands = []
+    
+    async def record(*args):
+        commands.append(args)
+    monkeypatch.setattr(repository, "_git", record)
+    asyncio.run(service._partial_clone("https://example.com/r.git", Path("/tmp/r"), "main", 1))
+    return commands
+
+
+def test_partial_clone_checks_out_the_whole_tree_by_default(service, monkeypatch):
+    commands = _partial_clone_commands(service, monkeypatch)
+    
+    clone, checkout = commands
+    assert clone[0] == "clone" and "--filter=blob:none" in clone
+    assert checkout == ("-C", "/tmp/r", "checkout", "main")
+
+
+def test_partial_clone_can_check_out_source_files_only(service, monkeypatch):
+    monkeypatch.setattr(settings, "clone_source_only", True)
+    
+    _, sparse, _ = _partial_clone_commands(service, monkeypatch)
+    
+    assert sparse[2:5] == ("sparse-checkout", "set", "--no-cone")
+    assert "*.py" in sparse and "*.ts" in sparse
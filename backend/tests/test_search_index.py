@@ -0,0 +1,89 @@
+"""
+Tests for node search through the inverted token index
+"""
+import random
+
+import networkx as nx
+import pytest
+
+from app.core.graph.schema import NodeType
+from app.core.graph.traversal import GraphTraversal
+
+WORDS = ["parse", "file", "graph", "build", "node", "get", "set", "cache", "x", "id"]
+
+
+def _linear_search(graph: nx.DiGraph, query: str, node_types=None, limit: int = 20) -> list[dict]:
+    """The substring scan search_nodes did before it had an index."""
+    results = []
+    query_lower = query.lower()
+    for node_id, attrs in graph.nodes(data=True):
+        if len(results) >= limit:
+            break
+        data = attrs.get("data", {})
+        if node_types and data.get("type") not in [t.value for t in node_types]:
+            continue
+        searchable = " ".join([
+            data.get("name", ""),
+            data.get("qualified_name", ""),
+            data.get("signature", "") or "",
+            data.get("docstring", "") or "",
+        ]).lower()
+        if query_lower in searchable:
+            results.append({
+                "node_id": node_id,
+                "data": data,
+                "score": 1.0 if query_lower == data.get("name", "").lower() else 0.5,
+            })
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results
+
+
+def _random_graph(seed: int) -> nx.DiGraph:
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    for i in range(200):
+        name = "_".join(rng.choices(WORDS, k=rng.randint(1, 3)))
+        if rng.random() < 0.3:
+            name = name.title().replace("_", "")
+        data = {
+            "type": rng.choice(["function", "class", "method"]),
+            "name": name,
+            "qualified_name": f"Mod{i % 7}.{name}",
+            "signature": f"def {name}(self, {rng.choice(WORDS)}):" if rng.random() < 0.8 else None,
+        }
+        if rng.random() < 0.5:
+            data["docstring"] = " ".join(rng.choices(WORDS, k=rng.randint(1, 6))) + "."
+        graph.add_node(f"n{i}", data=data)
+    return graph
+
+
+def _queries(graph: nx.DiGraph, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    queries = ["", " ", "_", ".", "(", "zzz", "Parse_File", "get_", "_node", "e_c", "self, x"]
+    texts = [
+        f"{d['name']} {d['qualified_name']} {d.get('signature') or ''}" for _, d in graph.nodes(data="data")
+    ]
+    for _ in range(200):
+        text = rng.choice(texts)
+        start = rng.randrange(len(text))
+        queries.append(text[start:start + rng.randint(1, 12)])
+    return queries
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_search_matches_linear_scan(seed):
+    graph = _random_graph(seed)
+    traversal = GraphTraversal(graph)
+    
+    for query in _queries(graph, seed):
+        for limit in (1, 5, 20, 1000):
+            assert traversal.search_nodes(query, limit=limit) == _linear_search(graph, query, limit=limit), query
+
+
+def test_search_with_type_filter_matches_linear_scan():
+    graph = _random_graph(3)
+    traversal = GraphTraversal(graph)
+    types = [NodeType.CLASS, NodeType.METHOD]
+    
+    for query in _queries(graph, 3):
+        assert traversal.search_nodes(query, types, limit=7) == _linear_search(graph, query, types, limit=7), query
@@ -0,0 +1,73 @@
+"""
+Tests for graph traversal over NetworkX graphs and the SQLite GraphStore
+"""
+import networkx as nx
+import pytest
+
+from app.core.graph.store import GraphStore
+from app.core.graph.traversal import GraphTraversal
+
+
+def _by_node_id(entries: list[dict]) -> list[dict]:
+    return sorted(entries, key=lambda entry: entry["node_id"])
+
+
+@pytest.fixture
+def graph() -> nx.DiGraph:
+    graph = nx.DiGraph()
+    for node_id in "abcde":
+        graph.add_node(node_id, data={"name": node_id, "type": "function"})
+    for source, target in [("a", "b"), ("b", "c"), ("a", "c"), ("c", "d"), ("b", "d"), ("d", "a")]:
+        graph.add_edge(source, target, data={"type": "calls"})
+    return graph
+
+
+@pytest.fixture
+def store(graph, tmp_path) -> GraphStore:
+    store = GraphStore(tmp_path / "graph.sqlite3")
+    store.save(graph)
+    return store
+
+
+def test_find_paths_shortest_first(graph):
+    paths = GraphTraversal(graph).find_paths("a", "d", max_depth=3)
+    
+    assert [len(p) for p in paths] == sorted(len(p) for p in paths)
+    assert sorted(map(tuple, paths)) == sorted(map(tuple, nx.all_simple_paths(graph, "a", "d", cutoff=3)))
+
+
+def test_find_paths_limits(graph):
+    traversal = GraphTraversal(graph)
+    
+    assert traversal.find_paths("a", "d", max_depth=2, k=1) == [["a", "b", "d"]]
+    assert traversal.find_paths("a", "d", max_depth=1) == []
+    assert traversal.find_paths("a", "e") == []
+    assert traversal.find_paths("a", "missing") == []
+
+
+def test_find_paths_on_graph_store(graph, store):
+    expected = GraphTraversal(graph).find_paths("a", "d", max_depth=3, k=None)
+    
+    assert GraphTraversal(store).find_paths("a", "d", max_depth=3, k=None) == expected
+    assert GraphTraversal(store).find_paths("b", "a", max_depth=2) == [["b", "d", "a"]]
+
+
+def test_bfs_on_graph_store_matches_networkx(graph, store):
+    def steps(traversal):
+        return [(s.node_id, s.depth, s.path) for s in traversal.bfs("a", max_depth=2)]
+    
+    assert steps(GraphTraversal(store)) == steps(GraphTraversal(graph))
+    assert {node_id for node_id, _, _ in steps(GraphTraversal(store))} == {"a", "b", "c", "d"}
+
+
+def test_callers_and_context_on_graph_store(graph, store):
+    callers = GraphTraversal(store).find_callers("d", max_depth=1)
+    context = GraphTraversal(store).get_node_context("d")
+    
+    assert sorted(step.node_id for step in callers) == ["b", "c"]
+    expected = GraphTraversal(graph).get_node_context("d")
+    
+    # The store lists neighbors in edge storage order, grouped by source
+    assert context["node"] == expected["node"]
+    assert _by_node_id(context["predecessors"]) == _by_node_id(expected["predecessors"])
+    assert _by_node_id(context["successors"]) == _by_node_id(expected["successors"])
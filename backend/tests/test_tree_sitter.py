@@ -0,0 +1,392 @@
+"""
+Tests for the Tree-sitter parser, against the output of the original per-node parser
+"""
+from concurrent.futures.process import BrokenProcessPool
+import re
+
+import pytest
+
+from app.config import settings
+from app.core.parsing import tree_sitter as tree_sitter_module
+from app.core.parsing.tree_sitter import TSEdit, TreeSitterParser
+
+PY_SOURCE = '''"""Module docstring."""
+import os
+from pathlib import Path
+
+
+def top(a, b=1):
+    """Top-level function."""
+    helper(a)
+    return os.path.join(a, b)
+
+
+async def fetch():
+    # comment before the docstring
+    \'\'\'Fetch things.\'\'\'
+    await get()
+
+
+class Outer(Base):
+    """Outer class.
+
+    Spans lines.
+    """
+    attr = build()
+
+    def method(self):
+        r"""Raw docstring."""
+        self.other()
+        top(1)
+
+    class Inner:
+        def deep(self):
+            return deep_call()
+
+    def after_inner(self):
+        pass
+
+
+def no_doc():
+    x = "not a docstring"
+    return x
+'''
+
+JS_SOURCE = '''import { format } from "./format";
+
+function greet(name) {
+  return format(name);
+}
+
+class Greeter {
+  hello() {
+    greet("x");
+    this.log();
+  }
+}
+
+const arrow = () => run();
+'''
+
+TS_SOURCE = '''import { Thing } from "./thing";
+
+interface Shape {
+  area(): number;
+}
+
+function makeShape(size: number): Shape {
+  return build(size);
+}
+
+class Square implements Shape {
+  area(): number {
+    return compute(this.size);
+  }
+}
+'''
+
+# (type, qualified name, parent, start line, end line, start column, end column, signature),
+# as the original recursive visitor extracted them
+PY_DEFINITIONS = [
+    ("function", "top", None, 6, 9, 0, 29, "def top(a, b=1):"),
+    ("function", "fetch", None, 12, 15, 0, 15, "async def fetch():"),
+    ("class", "Outer", None, 18, 35, 0, 12, "class Outer(Base):"),
+    ("function", "Outer.method", "Outer", 25, 28, 4, 14, "def method(self):"),
+    ("class", "Outer.Inner", "Outer", 30, 32, 4, 30, "class Inner:"),
+    ("function", "Outer.Inner.deep", "Outer.Inner", 31, 32, 8, 30, "def deep(self):"),
+    # Back in Outer once Inner's byte range has ended
+    ("function", "Outer.after_inner", "Outer", 34, 35, 4, 12, "def after_inner(self):"),
+    ("function", "no_doc", None, 38, 40, 0, 12, "def no_doc():"),
+]
+JS_DEFINITIONS = [
+    ("function", "greet", None, 3, 5, 0, 1, "function greet(name) {"),
+    ("class", "Greeter", None, 7, 12, 0, 1, "class Greeter {"),
+]
+TS_DEFINITIONS = [
+    ("function", "makeShape", None, 7, 9, 0, 1, "function makeShape(size: number): Shape {"),
+    ("function", "area", None, 12, 14, 2, 3, "area(): number {"),
+]
+
+
+@pytest.fixture
+def parser(monkeypatch) -> TreeSitterParser:
+    monkeypatch.setattr(settings, "parse_cache_path", "")
+    return TreeSitterParser()
+
+
+def _parse(parser: TreeSitterParser, tmp_path, name: str, source: str):
+    path = tmp_path / name
+    path.write_text(source)
+    return parser.parse_file(path)
+
+
+def _definitions(nodes) -> list[tuple]:
+    return [
+        (n.node_type, n.qualified_name, n.parent_name, n.start_line, n.end_line,
+         n.start_column, n.end_column, n.signature)
+        for n in nodes
+    ]
+
+
+@pytest.mark.parametrize("name, source, expected", [
+    ("m.py", PY_SOURCE, PY_DEFINITIONS),
+    ("m.js", JS_SOURCE, JS_DEFINITIONS),
+    ("m.ts", TS_SOURCE, TS_DEFINITIONS),
+])
+def test_definitions_match_original_parser(parser, tmp_path, name, source, expected):
+    nodes = _parse(parser, tmp_path, name, source)
+    
+    assert _definitions(nodes) == expected
+    for node in nodes:
+        # Source spans the full lines of the definition
+        lines = source.split("\n")[node.start_line - 1:node.end_line]
+        assert node.source_code == "\n".join(lines)
+        assert source.encode()[node.start_byte:node.end_byte].decode() in node.source_code
+
+
+def test_calls_belong_to_the_innermost_definition(parser, tmp_path):
+    calls = {n.qualified_name: n.calls for n in _parse(parser, tmp_path, "m.py", PY_SOURCE)}
+    
+    assert calls == {
+        "top": ["helper", "join"],
+        "fetch": ["get"],
+        # Methods' calls are their own, not the class's
+        "Outer": ["build"],
+        "Outer.method": ["other", "top"],
+        "Outer.Inner": [],
+        "Outer.Inner.deep": ["deep_call"],
+        "Outer.after_inner": [],
+        "no_doc": [],
+    }
+    js_calls = {n.qualified_name: n.calls for n in _parse(parser, tmp_path, "m.js", JS_SOURCE)}
+    assert js_calls == {"greet": ["format"], "Greeter": ["greet", "log"]}
+
+
+def test_chained_calls_are_listed_in_source_order(parser, tmp_path):
+    nodes = _parse(parser, tmp_path, "m.py", "def f():\n    a(1).b().c(d())\n    a()\n")
+    
+    assert [n.calls for n in nodes] == [["a", "b", "c", "d"]]
+
+
+def test_docstrings_match_original_parser(parser, tmp_path):
+    docstrings = {n.qualified_name: n.docstring for n in _parse(parser, tmp_path, "m.py", PY_SOURCE)}
+    
+    assert docstrings == {
+        "top": "Top-level function.",
+        # Comments before the first statement are skipped
+        "fetch": "Fetch things.",
+        "Outer": "Outer class.\n\n    Spans lines.",
+        # The original kept the string prefix: 'r"""Raw docstring.'
+        "Outer.method": "Raw docstring.",
+        "Outer.Inner": None,
+        "Outer.Inner.deep": None,
+        "Outer.after_inner": None,
+        "no_doc": None,
+    }
+    assert [n.docstring for n in _parse(parser, tmp_path, "m.js", JS_SOURCE)] == [None, None]
+
+
+@pytest.mark.parametrize("body, expected", [
+    ("'single'", "single"),
+    ('"""  padded  """', "padded"),
+    ("b'bytes'", "bytes"),
+    ("f'{x}'", "{x}"),
+    # Only the first statement counts, however long the body is
+    ("x = 1\n    'late'", None),
+    ("pass\n" + "    'late'\n" * 2000, None),
+    ("'a' 'b'", None),
+])
+def test_docstring_is_the_first_statement_only(parser, tmp_path, body, expected):
+    nodes = _parse(parser, tmp_path, "m.py", f"def f():\n    {body}\n")
+    
+    assert nodes[0].docstring == expected
+
+
+class RecordingParser:
+    """Wraps a Tree-sitter parser, recording whether each parse reused a tree."""
+    
+    def __init__(self, parser):
+        self.parser = parser
+        self.reused: list[bool] = []
+    
+    def parse(self, source, old_tree=None):
+        self.reused.append(old_tree is not None)
+        return self.parser.parse(source, old_tree) if old_tree is not None else self.parser.parse(source)
+
+
+def _point(source: bytes, offset: int) -> tuple[int, int]:
+    row = source.count(b"\n", 0, offset)
+    return row, offset - (source.rfind(b"\n", 0, offset) + 1)
+
+
+def _insert(source: str, anchor: str, text: str) -> tuple[str, TSEdit]:
+    """Insert text before anchor, returning the new source and the matching edit."""
+    old = source.encode()
+    offset = old.index(anchor.encode())
+    new = old[:offset] + text.encode() + old[offset:]
+    end = offset + len(text.encode())
+    edit = TSEdit(
+        start_byte=offset,
+        old_end_byte=offset,
+        new_end_byte=end,
+        start_point=_point(old, offset),
+        old_end_point=_point(old, offset),
+        new_end_point=_point(new, end),
+    )
+    return new.decode(), edit
+
+
+def test_incremental_reparse_matches_full_parse(parser, tmp_path):
+    recording = parser._parsers["python"] = RecordingParser(parser._parsers["python"])
+    path = tmp_path / "m.py"
+    path.write_text(PY_SOURCE)
+    
+    # No tree yet: a full parse, whose tree is kept
+    assert _definitions(parser.parse_file_incremental(path, PY_SOURCE, [])) == PY_DEFINITIONS
+    
+    edited, edit = _insert(PY_SOURCE, "    def after_inner", "    def added(self):\n        extra()\n\n")
+    nodes = parser.parse_file_incremental(path, edited, [edit])
+    
+    assert recording.reused == [False, True]
+    full = _parse(TreeSitterParser(), tmp_path, "full.py", edited)
+    assert _definitions(nodes) == _definitions(full)
+    assert [n.calls for n in nodes] == [n.calls for n in full]
+    assert "Outer.added" in [n.qualified_name for n in nodes]
+
+
+def test_bulk_parsing_keeps_no_trees(parser, tmp_path):
+    path = tmp_path / "m.py"
+    path.write_text(PY_SOURCE)
+    
+    parser.parse_file(path)
+    assert parser._tree_cache == {}
+    
+    parser.parse_file_incremental(path, PY_SOURCE, [])
+    parser.invalidate(path)
+    assert parser._tree_cache == {}
+
+
+def _write_files(tmp_path, count: int) -> list:
+    files = []
+    for i in range(count):
+        path = tmp_path / f"m{i}.py"
+        path.write_text(f"def f{i}():\n    g{i}()\n")
+        files.append(path)
+    return files
+
+
+def _names(results) -> list[list[str]]:
+    return [[n.qualified_name for n in nodes] for nodes in results]
+
+
+class BreakingExecutor:
+    """Process pool stand-in that parses some files, then breaks like a killed worker."""
+    
+    instances: list["BreakingExecutor"] = []
+    
+    def __init__(self, max_workers, initializer):
+        self.shut_down = False
+        initializer()
+        BreakingExecutor.instances.append(self)
+    
+    def map(self, fn, files, chunksize):
+        for path in files[:3]:
+            yield fn(path)
+        raise BrokenProcessPool("worker died")
+    
+    def shutdown(self, cancel_futures):
+        self.shut_down = True
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    monkeypatch.setattr(settings, "parse_workers", 2)
+    monkeypatch.setattr(settings, "parse_parallel_min_files", 1)
+
+
+def test_process_pool_matches_serial_parse(parser, tmp_path, parallel, caplog):
+    files = _write_files(tmp_path, 40)
+    
+    assert _names(parser.parse_files(files)) == [[f"f{i}"] for i in range(40)]
+    assert "parsing serially" not in caplog.text
+
+
+def test_pool_that_cannot_start_falls_back_to_serial(parser, tmp_path, parallel, monkeypatch):
+    def no_pool(**kwargs):
+        raise OSError("no child processes here")
+    monkeypatch.setattr(tree_sitter_module, "ProcessPoolExecutor", no_pool)
+    files = _write_files(tmp_path, 5)
+    
+    assert _names(parser.parse_files(files)) == [[f"f{i}"] for i in range(5)]
+
+
+def test_broken_pool_resumes_serially_after_the_last_result(parser, tmp_path, parallel, monkeypatch):
+    BreakingExecutor.instances.clear()
+    monkeypatch.setattr(tree_sitter_module, "ProcessPoolExecutor", BreakingExecutor)
+    files = _write_files(tmp_path, 6)
+    
+    # Each file exactly once, in order, though the pool broke after three
+    assert _names(parser.parse_files(files)) == [[f"f{i}"] for i in range(6)]
+    assert [executor.shut_down for executor in BreakingExecutor.instances] == [True]
+
+
+def test_only_the_parent_writes_worker_cache_entries(tmp_path, parallel, monkeypatch):
+    monkeypatch.setattr(settings, "parse_cache_path", str(tmp_path / "parse.sqlite3"))
+    monkeypatch.setattr(tree_sitter_module, "ProcessPoolExecutor", BreakingExecutor)
+    writers = []
+    cache_put = TreeSitterParser._cache_put
+    
+    def recording_cache_put(self, entries):
+        writers.append((self, len(entries)))
+        cache_put(self, entries)
+    monkeypatch.setattr(TreeSitterParser, "_cache_put", recording_cache_put)
+    parser = TreeSitterParser()
+    files = _write_files(tmp_path, 6)
+    
+    list(parser.parse_files(files))
+    
+    # Entries from the three pooled files and the three serial ones, written together
+    assert [(writer is parser, count) for writer, count in writers if count] == [(True, 6)]
+    assert all(parser._cache.get(str(path), parser._digest(path.read_bytes())) for path in files)
+
+
+def _original_fallback(content: str) -> list[tuple]:
+    """The per-pattern line matching the fallback parser did before one combined regex."""
+    patterns = {
+        "function": r"^\s*(async\s+)?def\s+(\w+)\s*\(",
+        "class": r"^\s*class\s+(\w+)",
+        "import": r"^(?:from\s+\S+\s+)?import\s+",
+    }
+    nodes = []
+    for i, line in enumerate(content.split("\n")):
+        for node_type, pattern in patterns.items():
+            match = re.match(pattern, line)
+            if match:
+                name = match.group(2) if node_type == "function" else (
+                    match.group(1) if node_type == "class" else line.strip()
+                )
+                nodes.append((node_type, name, i + 1, len(line), line.strip()))
+    return nodes
+
+
+FALLBACK_SOURCE = PY_SOURCE + '''
+  async   def  spaced (x):
+def broken
+classy = 1
+class NoBases:
+    import sys
+from . import sibling
+from x import (a,
+    b)
+importlib.reload(x)
+'''
+
+
+def test_fallback_parser_matches_original(parser, tmp_path):
+    parser._parsers.clear()
+    nodes = _parse(parser, tmp_path, "m.py", FALLBACK_SOURCE)
+    
+    assert [
+        (n.node_type, n.name, n.start_line, n.end_column, n.signature) for n in nodes
+    ] == _original_fallback(FALLBACK_SOURCE)
+    assert {n.node_type for n in nodes} == {"function", "class", "import"}